@@ -54,6 +54,8 @@ print_usage() {
     echo "  --initial-capital=N     Initial capital in ETH (default: 10.0)"
     echo "  --days=N                Number of days to backtest (default: 90)"
     echo "  --compare-all           Compare all strategies"
+    echo "  --sweep=FILE            Sweep a JSON parameter grid for the specified strategy"
+    echo "  --workers=N             Worker processes for --compare-all and --sweep (default: CPU count)"
     echo "  --generate-config       Generate a default config for the specified strategy"
     echo ""
     echo "Options for 'security' command:"
@@ -143,6 +143,7 @@ class AIIntegration:
         logger.info("Stopping AI Integration service")
         self.running = False
         self.thread.join(timeout=5.0)
+        self.trade_selection.close()
         logger.info("AI Integration service stopped")
     
     def _processing_loop(self):
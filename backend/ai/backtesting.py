@@ -9,11 +9,11 @@ import os
 import time
 from datetime import datetime, timedelta
 import joblib
-from dataclasses import dataclass
-from tqdm import tqdm
+from dataclasses import dataclass, field
 from feature_extractor import FeatureExtractor, FeatureSet
 from model_training import ModelTrainer
 from network_adaptation import NetworkAdaptation
+from dataset_store import load_dataset
 
 # Configure logging
 logging.basicConfig(
@@ -59,7 +59,28 @@ class BacktestResult:
     max_loss_usd: float
     sharpe_ratio: float
     win_rate: float
-    trades: List[TradeResult]
+    # One row per executed trade, with the TradeResult fields as columns
+    trade_frame: pd.DataFrame = field(default_factory=pd.DataFrame, repr=False)
+    _trades: Optional[List[TradeResult]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def trades(self) -> List[TradeResult]:
+        """Executed trades as TradeResult records, built on first access"""
+        if self._trades is None:
+            frame = self.trade_frame
+            if frame.empty:
+                self._trades = []
+            else:
+                columns = [frame[name].tolist() for name in (
+                    "timestamp", "network", "token_in", "token_out", "amount_in", "amount_out",
+                    "expected_profit_usd", "actual_profit_usd", "gas_cost_usd", "net_profit_usd",
+                    "execution_time_ms", "success"
+                )]
+                self._trades = [
+                    TradeResult(*values, error=None if values[-1] else "Transaction failed")
+                    for values in zip(*columns)
+                ]
+        return self._trades
 
 class ArbitrageBacktester:
     """Backtests arbitrage strategies against historical data"""
@@ -87,21 +108,37 @@ class ArbitrageBacktester:
         self.network_model_id = self.model_trainer.get_best_model("network")
         self.timing_model_id = self.model_trainer.get_best_model("execution_timing")
         
+        # Deserialize the selected models now rather than on the first backtest row
+        self.model_trainer.warm_up([
+            model_id for model_id in (self.profit_model_id, self.gas_model_id,
+                                      self.network_model_id, self.timing_model_id)
+            if model_id
+        ])
+        
         logger.info(f"Initialized backtester with models: profit={self.profit_model_id}, gas={self.gas_model_id}, network={self.network_model_id}, timing={self.timing_model_id}")
     
-    def load_historical_data(self, file_path: Optional[str] = None) -> pd.DataFrame:
+    def load_historical_data(self, file_path: Optional[str] = None,
+                             start_time: Optional[datetime] = None,
+                             end_time: Optional[datetime] = None) -> pd.DataFrame:
         """
         Load historical arbitrage opportunity data
         
         Args:
-            file_path: Path to historical data file (optional)
+            file_path: Path to historical data file (optional); a CSV file,
+                a Parquet file or a partitioned Parquet dataset directory
+            start_time: Earliest opportunity to load from a Parquet dataset
+            end_time: Latest opportunity to load from a Parquet dataset
             
         Returns:
             DataFrame with historical data
         """
         if file_path and os.path.exists(file_path):
             # Load from specified file
-            df = pd.read_csv(file_path)
+            if os.path.isdir(file_path) or file_path.endswith(".parquet"):
+                # Columnar dataset - only the partitions in the time range are read
+                df = load_dataset(file_path, start_time, end_time)
+            else:
+                df = pd.read_csv(file_path)
             logger.info(f"Loaded {len(df)} historical opportunities from {file_path}")
             return df
         
@@ -250,10 +287,9 @@ class ArbitrageBacktester:
             data[f"network_{network}"] = (data["network"] == network).astype(int)
         
         # Token pair one-hot encoding
-        token_pairs = [f"{row.token_in}_{row.token_out}" for _, row in data.iterrows()]
-        unique_pairs = list(set(token_pairs))
-        for pair in unique_pairs:
-            data[f"pair_{pair}"] = [(row.token_in + "_" + row.token_out) == pair for _, row in data.iterrows()]
+        token_pairs = data["token_in"].astype(str) + "_" + data["token_out"].astype(str)
+        for pair in sorted(token_pairs.unique()):
+            data[f"pair_{pair}"] = token_pairs == pair
         
         # Select features
         feature_columns = [
@@ -288,6 +324,10 @@ class ArbitrageBacktester:
         """
         Backtest arbitrage strategy on historical data
         
+        The whole dataset is evaluated at once: each model runs a single
+        prediction over the full feature matrix, and the execution decision,
+        P&L and daily returns are computed as array operations.
+        
         Args:
             data: DataFrame with historical opportunities
             use_ai: Whether to use AI models for decision making
@@ -297,127 +337,81 @@ class ArbitrageBacktester:
         """
         logger.info(f"Starting backtest on {len(data)} opportunities")
         
-        # Prepare features if using AI
-        if use_ai and (self.profit_model_id or self.gas_model_id or self.network_model_id or self.timing_model_id):
+        timestamps = pd.to_datetime(data["timestamp"]).reset_index(drop=True)
+        expected_profit = data["expected_profit_usd"].to_numpy(dtype=float)
+        gas_cost = data["gas_cost_usd"].to_numpy(dtype=float)
+        
+        # Decision making
+        if use_ai and (self.profit_model_id or self.gas_model_id or self.timing_model_id):
             features = self.prepare_features(data)
             logger.info(f"Prepared {features.X.shape[1]} features for AI models")
-        
-        # Results tracking
-        trades = []
-        total_profit = 0.0
-        total_gas = 0.0
-        successful_trades = 0
-        failed_trades = 0
-        
-        # Track profit/loss for Sharpe ratio calculation
-        daily_returns = {}
-        
-        # Process each opportunity
-        for i, row in tqdm(data.iterrows(), total=len(data), desc="Backtesting"):
-            timestamp = pd.to_datetime(row["timestamp"]) if isinstance(row["timestamp"], str) else row["timestamp"]
             
-            # Decision making
-            execute_trade = True
-            expected_profit = row["expected_profit_usd"]
-            gas_cost = row["gas_cost_usd"]
+            # Predict profit if model available
+            if self.profit_model_id:
+                expected_profit = np.ravel(self.model_trainer.predict(self.profit_model_id, features.X)).astype(float)
             
-            if use_ai:
-                # Extract features for this opportunity
-                opportunity_features = features.X[i].reshape(1, -1)
-                
-                # Predict profit if model available
-                if self.profit_model_id:
-                    predicted_profit = self.model_trainer.predict(self.profit_model_id, opportunity_features)[0]
-                    expected_profit = predicted_profit
-                
-                # Predict gas cost if model available
-                if self.gas_model_id:
-                    predicted_gas = self.model_trainer.predict(self.gas_model_id, opportunity_features)[0]
-                    gas_cost = predicted_gas
-                
-                # Decide whether to execute based on profit and gas
-                net_profit = expected_profit - gas_cost
-                
-                # Use timing model if available
-                if self.timing_model_id:
-                    timing_score = self.model_trainer.predict(self.timing_model_id, opportunity_features)[0]
-                    execute_trade = timing_score > 0.5 and net_profit > 0
-                else:
-                    execute_trade = net_profit > 0
+            # Predict gas cost if model available
+            if self.gas_model_id:
+                gas_cost = np.ravel(self.model_trainer.predict(self.gas_model_id, features.X)).astype(float)
             
+            # Decide whether to execute based on profit and gas, gated by the timing model if available
+            execute = expected_profit - gas_cost > 0
+            if self.timing_model_id:
+                timing_score = np.ravel(self.model_trainer.predict(self.timing_model_id, features.X))
+                execute &= timing_score > 0.5
+        elif use_ai:
+            execute = expected_profit - gas_cost > 0
+        else:
             # Simple strategy without AI: execute if expected profit > gas cost
-            else:
-                execute_trade = row["expected_profit_usd"] > row["gas_cost_usd"]
-            
-            # Skip trades we decide not to execute
-            if not execute_trade:
-                continue
-            
-            # Simulate trade execution
-            success = row["success"]  # In real backtest, this would be determined by the simulation
-            
-            if success:
-                actual_profit = expected_profit
-                net_profit = actual_profit - gas_cost
-                successful_trades += 1
-            else:
-                actual_profit = 0
-                net_profit = -gas_cost
-                failed_trades += 1
-            
-            # Track daily returns for Sharpe ratio
-            day_key = timestamp.strftime("%Y-%m-%d")
-            if day_key not in daily_returns:
-                daily_returns[day_key] = 0
-            daily_returns[day_key] += net_profit
-            
-            # Update totals
-            total_profit += actual_profit
-            total_gas += gas_cost
-            
-            # Record trade result
-            trade_result = TradeResult(
-                timestamp=timestamp,
-                network=row["network"],
-                token_in=row["token_in"],
-                token_out=row["token_out"],
-                amount_in=row["amount_in"],
-                amount_out=row["amount_in"] * (1 + row["price_diff_pct"]/100),
-                expected_profit_usd=expected_profit,
-                actual_profit_usd=actual_profit,
-                gas_cost_usd=gas_cost,
-                net_profit_usd=net_profit,
-                execution_time_ms=row["execution_time_ms"],
-                success=success,
-                error=None if success else "Transaction failed"
-            )
-            
-            trades.append(trade_result)
+            execute = expected_profit > gas_cost
+        
+        # Simulate trade execution for the opportunities we decide to take
+        executed = data.loc[execute]
+        expected_profit = expected_profit[execute]
+        gas_cost = gas_cost[execute]
+        success = executed["success"].to_numpy(dtype=bool)  # In real backtest, this would be determined by the simulation
+        
+        actual_profit = np.where(success, expected_profit, 0.0)
+        net_profits = actual_profit - gas_cost
+        
+        trade_frame = pd.DataFrame({
+            "timestamp": timestamps[execute].to_numpy(),
+            "network": executed["network"].to_numpy(),
+            "token_in": executed["token_in"].to_numpy(),
+            "token_out": executed["token_out"].to_numpy(),
+            "amount_in": executed["amount_in"].to_numpy(dtype=float),
+            "amount_out": executed["amount_in"].to_numpy(dtype=float) * (1 + executed["price_diff_pct"].to_numpy(dtype=float) / 100),
+            "expected_profit_usd": expected_profit,
+            "actual_profit_usd": actual_profit,
+            "gas_cost_usd": gas_cost,
+            "net_profit_usd": net_profits,
+            "execution_time_ms": executed["execution_time_ms"].to_numpy(dtype=float),
+            "success": success
+        })
         
         # Calculate metrics
-        total_trades = successful_trades + failed_trades
+        successful_trades = int(success.sum())
+        total_trades = len(trade_frame)
+        failed_trades = total_trades - successful_trades
+        total_profit = float(actual_profit.sum())
+        total_gas = float(gas_cost.sum())
         net_profit = total_profit - total_gas
         
         # Calculate Sharpe ratio (if we have daily returns)
-        daily_return_values = list(daily_returns.values())
+        daily_return_values = trade_frame.groupby(trade_frame["timestamp"].dt.normalize())["net_profit_usd"].sum().to_numpy()
         sharpe_ratio = 0.0
-        if daily_return_values:
+        if len(daily_return_values):
             mean_return = np.mean(daily_return_values)
             std_return = np.std(daily_return_values) if len(daily_return_values) > 1 else 1.0
-            sharpe_ratio = mean_return / std_return if std_return > 0 else 0.0
+            sharpe_ratio = float(mean_return / std_return) if std_return > 0 else 0.0
         
         # Calculate win rate
         win_rate = successful_trades / total_trades if total_trades > 0 else 0.0
         
-        # Calculate max profit and loss
-        profits = [t.net_profit_usd for t in trades]
-        max_profit = max(profits) if profits else 0.0
-        max_loss = min(profits) if profits else 0.0
-        
-        # Create result object
+        # Create result object (trade records are only built if result.trades is read)
         result = BacktestResult(
-            start_time=min([t.timestamp for t in trades]) if trades else datetime.now(),
-            end_time=max([t.timestamp for t in trades]) if trades else datetime.now(),
+            start_time=trade_frame["timestamp"].min() if total_trades else datetime.now(),
+            end_time=trade_frame["timestamp"].max() if total_trades else datetime.now(),
             total_trades=total_trades,
             successful_trades=successful_trades,
             failed_trades=failed_trades,
@@ -425,11 +419,11 @@ class ArbitrageBacktester:
             total_gas_cost_usd=total_gas,
             net_profit_usd=net_profit,
             avg_profit_per_trade_usd=net_profit / total_trades if total_trades > 0 else 0.0,
-            max_profit_usd=max_profit,
-            max_loss_usd=max_loss,
+            max_profit_usd=float(net_profits.max()) if total_trades else 0.0,
+            max_loss_usd=float(net_profits.min()) if total_trades else 0.0,
             sharpe_ratio=sharpe_ratio,
             win_rate=win_rate,
-            trades=trades
+            trade_frame=trade_frame
         )
         
         logger.info(f"Backtest completed: {total_trades} trades, {successful_trades} successful, ${net_profit:.2f} net profit")
@@ -510,16 +504,8 @@ class ArbitrageBacktester:
         # 1. Profit over time
         plt.subplot(3, 2, 1)
         
-        # Convert trades to DataFrame for easier plotting
-        trades_df = pd.DataFrame([
-            {
-                "timestamp": trade.timestamp,
-                "net_profit_usd": trade.net_profit_usd,
-                "success": trade.success,
-                "network": trade.network
-            }
-            for trade in result.trades
-        ])
+        trades_df = result.trade_frame[["timestamp", "net_profit_usd", "success", "network"]].copy() \
+            if not result.trade_frame.empty else pd.DataFrame()
         
         if not trades_df.empty:
             trades_df = trades_df.sort_values("timestamp")
@@ -14,16 +14,18 @@ import argparse
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 # Add parent directory to path to allow imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 try:
     from backtesting.backtester import Backtester, BacktestConfig, BacktestResult
+    from backtesting.sweep import SweepRunner, expand_grid
 except ImportError:
     # Try relative import for when running from parent directory
     from backtester import Backtester, BacktestConfig, BacktestResult
+    from sweep import SweepRunner, expand_grid
 
 # Configure logging
 logging.basicConfig(
@@ -119,22 +121,21 @@ def save_default_config(strategy: str) -> str:
     logger.info(f"Default configuration saved to {config_file}")
     return config_file
 
-def compare_strategies(configs: List[Dict[str, Any]], start_date: datetime, end_date: datetime) -> None:
-    """Run backtests for multiple strategies and compare results."""
-    results = []
-    
+def compare_strategies(configs: List[Dict[str, Any]], start_date: datetime, end_date: datetime,
+                       max_workers: Optional[int] = None, seed: int = 42) -> None:
+    """Run backtests for multiple strategies in parallel and compare results."""
     for config_dict in configs:
         # Update date range
         config_dict["start_date"] = start_date.isoformat()
         config_dict["end_date"] = end_date.isoformat()
-        
-        # Create config object
-        config = BacktestConfig.from_dict(config_dict)
-        
-        # Run backtest
-        backtester = Backtester(config)
-        result = backtester.run_backtest()
-        results.append(result)
+    
+    # Run backtests across worker processes, sharing one set of historical data
+    runner = SweepRunner(configs, max_workers=max_workers, seed=seed)
+    results = [None] * len(configs)
+    for index, result in runner.iter_results():
+        results[index] = result
+        print(f"Finished {result.strategy_name}: {result.total_trades} trades, "
+              f"P/L {result.total_profit_loss:.4f} ETH")
     
     # Generate comparison report
     generate_comparison_report(results)
@@ -263,6 +264,12 @@ def main():
                       help="Compare all strategies")
     parser.add_argument("--days", type=int, default=90,
                       help="Number of days to backtest (for comparison mode)")
+    parser.add_argument("--sweep", type=str,
+                      help="Path to a JSON parameter grid to sweep for the specified strategy")
+    parser.add_argument("--workers", type=int,
+                      help="Number of worker processes for comparison and sweep modes (defaults to CPU count)")
+    parser.add_argument("--seed", type=int, default=42,
+                      help="Random seed for comparison and sweep modes")
     
     # Report options
     parser.add_argument("--output-dir", type=str,
@@ -292,7 +299,18 @@ def main():
             configs.append(config_dict)
         
         # Run comparison
-        compare_strategies(configs, start_date, end_date)
+        compare_strategies(configs, start_date, end_date, max_workers=args.workers, seed=args.seed)
+        return
+    
+    # Handle sweep mode
+    if args.sweep:
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=args.days)
+        grid = load_config_file(args.sweep)
+        configs = expand_grid(create_default_config(args.strategy), grid)
+        
+        print(f"Sweeping {len(configs)} configurations of {args.strategy} from {start_date.date()} to {end_date.date()}")
+        compare_strategies(configs, start_date, end_date, max_workers=args.workers, seed=args.seed)
         return
     
     # Load config or use command line arguments
@@ -18,7 +18,7 @@ import numpy as np
 from typing import Dict, List, Any, Tuple, Optional, Union
 from dataclasses import dataclass, field
 import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import time
 
 # Configure logging
@@ -32,6 +32,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("backtester")
 
+# Exchanges quoted in the historical data, in column order of the price matrix
+EXCHANGES = ["uniswap", "sushiswap", "balancer", "curve"]
+
 @dataclass
 class BacktestConfig:
     """Configuration settings for backtesting."""
@@ -180,6 +183,9 @@ class Backtester:
         self.config = config
         self.logger = logger
         self.historical_data = {}
+        self.market_data = {}
+        self.day_index = {}
+        self.pair_mask = None
         self.current_capital = config.initial_capital
         self.active_trades = []
         self.completed_trades = []
@@ -211,6 +217,73 @@ class Backtester:
                 self.logger.error(f"Failed to load data for {pair}: {str(e)}")
                 
         self.logger.info(f"Historical data loaded for {len(self.historical_data)} token pairs")
+        self._build_market_index()
+    
+    def _build_market_index(self) -> None:
+        """
+        Build the columnar market data store and its day index.
+        
+        All records of all token pairs are packed into NumPy columns grouped
+        by day and then token pair, with prices in an (n, exchanges)
+        matrix ordered as EXCHANGES. day_index maps each date to the slice of
+        rows falling on it, so a day's data is found without scanning.
+        """
+        pairs = list(self.historical_data)
+        columns = [f"{exchange}_price" for exchange in EXCHANGES]
+        
+        pair_codes, timestamps, prices = [], [], []
+        for code, pair in enumerate(pairs):
+            data = self.historical_data[pair]
+            pair_codes.append(np.full(len(data), code, dtype=np.int32))
+            timestamps.extend(record["timestamp"] for record in data)
+            prices.append(np.column_stack([
+                np.fromiter((record.get(column, 0) for record in data), dtype=float, count=len(data))
+                for column in columns
+            ]))
+        
+        pair_codes = np.concatenate(pair_codes) if pairs else np.empty(0, dtype=np.int32)
+        prices = np.concatenate(prices) if pairs else np.empty((0, len(columns)))
+        timestamps = pd.to_datetime(timestamps).values.astype("datetime64[us]")
+        days = timestamps.astype("datetime64[D]")
+        
+        # Stable sort keeps each pair's records in their original order within a day
+        order = np.lexsort((pair_codes, days))
+        
+        self.market_data = {
+            "pairs": np.array(pairs, dtype=object),
+            "pair_code": pair_codes[order],
+            "timestamp": timestamps[order],
+            "prices": prices[order]
+        }
+        
+        unique_days, starts = np.unique(days[order], return_index=True)
+        stops = np.append(starts[1:], len(order))
+        self.day_index = {
+            day.item(): (int(start), int(stop))
+            for day, start, stop in zip(unique_days, starts, stops)
+        }
+        self.pair_mask = None
+        
+        self.logger.info(f"Indexed {len(order)} data points over {len(self.day_index)} days")
+    
+    def set_market_data(self, market_data: Dict[str, np.ndarray], day_index: Dict[date, Tuple[int, int]]) -> None:
+        """
+        Use an already built market data store instead of loading data.
+        
+        This lets several backtests share one store (see sweep.SweepRunner).
+        Token pairs in the store that are not in config.token_pairs are ignored.
+        
+        Args:
+            market_data: Columnar store as built by load_historical_data
+            day_index: Date to row slice index of the store
+        """
+        self.market_data = market_data
+        self.day_index = day_index
+        
+        token_pairs = set(self.config.token_pairs)
+        self.pair_mask = np.array([pair in token_pairs for pair in market_data["pairs"]], dtype=bool)
+        if self.pair_mask.all():
+            self.pair_mask = None
     
     def _generate_demo_data(self, token_pair: str) -> List[Dict[str, Any]]:
         """
@@ -283,8 +356,9 @@ class Backtester:
         start_time = time.time()
         self.logger.info(f"Starting backtest for {self.config.strategy_name}")
         
-        # Load historical data
-        self.load_historical_data()
+        # Load historical data unless a shared store was provided
+        if not self.day_index:
+            self.load_historical_data()
         
         # Initialize result tracking
         result = BacktestResult(
@@ -387,75 +461,83 @@ class Backtester:
         Returns:
             A list of opportunity dictionaries
         """
-        opportunities = []
-        
-        # Filter data for the current day
-        for token_pair, data in self.historical_data.items():
-            day_data = [d for d in data if d["timestamp"].date() == date.date()]
-            
-            # Process each hour
-            for hour_data in day_data:
-                # Find price differences between exchanges
-                prices = {
-                    "uniswap": hour_data["uniswap_price"],
-                    "sushiswap": hour_data["sushiswap_price"],
-                    "balancer": hour_data["balancer_price"],
-                    "curve": hour_data.get("curve_price", 0)
-                }
-                
-                # Find min and max prices
-                min_exchange = min(prices, key=prices.get)
-                max_exchange = max(prices, key=prices.get)
-                min_price = prices[min_exchange]
-                max_price = prices[max_exchange]
-                
-                # Calculate potential profit (considering fees)
-                fee_buy = self.config.exchange_fees[min_exchange]
-                fee_sell = self.config.exchange_fees[max_exchange]
-                
-                # Simple arbitrage calculation
-                trade_size = self.config.trade_size_eth
-                buy_amount = trade_size / min_price
-                sell_amount = buy_amount * (1 - fee_sell)
-                sell_value = sell_amount * max_price
-                buy_cost = trade_size * (1 + fee_buy)
-                
-                profit = sell_value - buy_cost
-                profit_threshold = 0.001 * buy_cost  # 0.1% minimum profit
-                
-                # Check if profit is above threshold
-                if profit > profit_threshold:
-                    # Calculate gas cost based on current network
-                    if self.config.l2_networks_enabled:
-                        # L2 gas cost is much lower
-                        gas_units = 150000  # Approximate gas units for a swap
-                        gas_price_gwei = self.config.gas_price_gwei * 0.1  # 90% cheaper on L2
-                        gas_cost_eth = (gas_units * gas_price_gwei * 1e-9)
-                    else:
-                        gas_units = 180000  # Slightly higher on mainnet
-                        gas_price_gwei = self.config.gas_price_gwei
-                        gas_cost_eth = (gas_units * gas_price_gwei * 1e-9)
-                    
-                    # Check if still profitable after gas
-                    if profit > gas_cost_eth:
-                        opportunity = {
-                            "timestamp": hour_data["timestamp"],
-                            "token_pair": token_pair,
-                            "buy_exchange": min_exchange,
-                            "sell_exchange": max_exchange,
-                            "buy_price": min_price,
-                            "sell_price": max_price,
-                            "trade_size_eth": trade_size,
-                            "expected_profit_eth": profit - gas_cost_eth,
-                            "expected_profit_usd": (profit - gas_cost_eth) * min_price,
-                            "gas_cost_eth": gas_cost_eth,
-                            "gas_price_gwei": gas_price_gwei
-                        }
-                        opportunities.append(opportunity)
-        
-        # Sort opportunities by expected profit (descending)
-        opportunities.sort(key=lambda x: x["expected_profit_eth"], reverse=True)
-        return opportunities
+        start, stop = self.day_index.get(date.date(), (0, 0))
+        if start == stop:
+            return []
+        
+        prices = self.market_data["prices"][start:stop]
+        pair_codes = self.market_data["pair_code"][start:stop]
+        timestamps = self.market_data["timestamp"][start:stop]
+        if self.pair_mask is not None:
+            keep = self.pair_mask[pair_codes]
+            prices, pair_codes, timestamps = prices[keep], pair_codes[keep], timestamps[keep]
+        
+        # Cheapest and most expensive exchange for every hour of the day
+        rows = np.arange(len(prices))
+        buy_idx = prices.argmin(axis=1)
+        sell_idx = prices.argmax(axis=1)
+        min_price = prices[rows, buy_idx]
+        max_price = prices[rows, sell_idx]
+        
+        # Calculate potential profit (considering fees)
+        fees = np.array([self.config.exchange_fees[exchange] for exchange in EXCHANGES])
+        fee_buy = fees[buy_idx]
+        fee_sell = fees[sell_idx]
+        
+        # Simple arbitrage calculation
+        trade_size = self.config.trade_size_eth
+        with np.errstate(divide="ignore"):
+            buy_amount = trade_size / min_price
+        sell_amount = buy_amount * (1 - fee_sell)
+        sell_value = sell_amount * max_price
+        buy_cost = trade_size * (1 + fee_buy)
+        
+        profit = sell_value - buy_cost
+        profit_threshold = 0.001 * buy_cost  # 0.1% minimum profit
+        
+        # Calculate gas cost based on current network
+        if self.config.l2_networks_enabled:
+            # L2 gas cost is much lower
+            gas_units = 150000  # Approximate gas units for a swap
+            gas_price_gwei = self.config.gas_price_gwei * 0.1  # 90% cheaper on L2
+        else:
+            gas_units = 180000  # Slightly higher on mainnet
+            gas_price_gwei = self.config.gas_price_gwei
+        gas_cost_eth = (gas_units * gas_price_gwei * 1e-9)
+        
+        # Keep hours profitable above the threshold and after gas
+        selected = np.nonzero((profit > profit_threshold) & (profit > gas_cost_eth))[0]
+        if len(selected) == 0:
+            return []
+        
+        # Sort by expected profit (descending); the stable sort keeps pair/hour order on ties
+        net_profit = profit[selected] - gas_cost_eth
+        order = np.argsort(-net_profit, kind="stable")
+        selected = selected[order]
+        net_profit = net_profit[order]
+        
+        token_pairs = self.market_data["pairs"][pair_codes[selected]]
+        timestamps = timestamps[selected].tolist()
+        
+        return [
+            {
+                "timestamp": timestamp,
+                "token_pair": token_pair,
+                "buy_exchange": EXCHANGES[buy],
+                "sell_exchange": EXCHANGES[sell],
+                "buy_price": buy_price,
+                "sell_price": sell_price,
+                "trade_size_eth": trade_size,
+                "expected_profit_eth": expected_profit,
+                "expected_profit_usd": expected_profit * buy_price,
+                "gas_cost_eth": gas_cost_eth,
+                "gas_price_gwei": gas_price_gwei
+            }
+            for timestamp, token_pair, buy, sell, buy_price, sell_price, expected_profit in zip(
+                timestamps, token_pairs, buy_idx[selected].tolist(), sell_idx[selected].tolist(),
+                min_price[selected].tolist(), max_price[selected].tolist(), net_profit.tolist()
+            )
+        ]
     
     def _execute_trade(self, opportunity: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -555,7 +637,7 @@ class Backtester:
         
         # Save results as JSON
         with open(filename, 'w') as f:
-            json.dump(results.to_dict(), f, indent=2)
+            json.dump(results.to_dict(), f, indent=2, default=str)
             
         self.logger.info(f"Backtest results saved to {filename}")
         
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ArbitrageX Backtest Sweep Runner
+
+This module runs many backtests in parallel, for a list of configurations or
+a parameter grid, across a pool of worker processes. Historical market data
+is loaded once and shared through memory-mapped arrays, so every worker reads
+the same pages instead of loading or unpickling its own copy.
+"""
+
+import copy
+import itertools
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from typing import Dict, List, Any, Tuple, Optional, Union, Iterator
+
+import numpy as np
+
+try:
+    from .backtester import Backtester, BacktestConfig, BacktestResult
+except ImportError:
+    # Running with the backtesting directory itself on the path
+    from backtester import Backtester, BacktestConfig, BacktestResult
+
+logger = logging.getLogger("backtest_sweep")
+
+# Columns of the Backtester market data store that are shared with workers
+SHARED_COLUMNS = ("pair_code", "timestamp", "prices")
+
+
+def expand_grid(base_config: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into one configuration per combination.
+
+    Args:
+        base_config: Configuration dictionary shared by every run
+        grid: Mapping of BacktestConfig field to the values to try
+
+    Returns:
+        A list of configuration dictionaries, named after the base strategy
+        and the parameter values of each combination
+    """
+    if not grid:
+        return [copy.deepcopy(base_config)]
+
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        config = copy.deepcopy(base_config)
+        config.update(zip(keys, copy.deepcopy(values)))
+        suffix = "_".join(f"{key}={value}" for key, value in zip(keys, values))
+        config["strategy_name"] = f"{base_config['strategy_name']}_{suffix}"
+        configs.append(config)
+    return configs
+
+
+class SharedMarketData:
+    """
+    A Backtester market data store written to memory-mapped files.
+
+    Worker processes open the files read-only through attach(spec), so all
+    of them share the same pages of the OS page cache. The creating process
+    owns the files and must call close() when done.
+    """
+
+    def __init__(self, market_data: Dict[str, np.ndarray], day_index: Dict[date, Tuple[int, int]]):
+        """
+        Write the store's columns to a temporary directory.
+
+        Args:
+            market_data: Columnar store built by Backtester.load_historical_data
+            day_index: Date to row slice index of the store
+        """
+        self.directory = tempfile.TemporaryDirectory(prefix="arbitragex_sweep_")
+        self.spec = {"pairs": market_data["pairs"], "day_index": day_index, "columns": {}}
+
+        for name in SHARED_COLUMNS:
+            path = os.path.join(self.directory.name, f"{name}.npy")
+            np.save(path, np.ascontiguousarray(market_data[name]))
+            self.spec["columns"][name] = path
+
+    @staticmethod
+    def attach(spec: Dict[str, Any]) -> Tuple[Dict[str, np.ndarray], Dict[date, Tuple[int, int]]]:
+        """
+        Open a store written by another process.
+
+        Args:
+            spec: The creating instance's spec
+
+        Returns:
+            Tuple of (read-only market data store, day index)
+        """
+        market_data = {"pairs": spec["pairs"]}
+        for name, path in spec["columns"].items():
+            market_data[name] = np.load(path, mmap_mode="r")
+        return market_data, spec["day_index"]
+
+    def close(self) -> None:
+        """Remove the memory-mapped files."""
+        self.directory.cleanup()
+
+
+# Market data attached once per worker process by _init_worker
+_worker_data = None
+
+
+def _init_worker(spec: Dict[str, Any]) -> None:
+    """Attach a worker process to the shared market data."""
+    global _worker_data
+    _worker_data = SharedMarketData.attach(spec)
+
+
+def _run_backtest(index: int, config: BacktestConfig, seed: int) -> Tuple[int, BacktestResult]:
+    """Run one backtest of a sweep in a worker process."""
+    market_data, day_index = _worker_data
+    np.random.seed(seed)
+
+    backtester = Backtester(config)
+    backtester.set_market_data(market_data, day_index)
+    return index, backtester.run_backtest()
+
+
+class SweepRunner:
+    """
+    Parallel runner for a set of backtest configurations.
+
+    All runs share one historical data set covering the union of their
+    token pairs and date ranges. Each run gets its own seed derived from
+    the sweep seed, so a sweep gives the same results whatever the number
+    of workers or the order in which runs finish.
+    """
+
+    def __init__(self, configs: List[Union[BacktestConfig, Dict[str, Any]]],
+                 max_workers: Optional[int] = None, seed: int = 42):
+        """
+        Initialize the sweep runner.
+
+        Args:
+            configs: Backtest configurations (objects or dictionaries)
+            max_workers: Number of worker processes (defaults to the CPU count)
+            seed: Seed for the historical data and the per-run seeds
+        """
+        if not configs:
+            raise ValueError("At least one backtest configuration is required")
+
+        self.configs = [
+            config if isinstance(config, BacktestConfig) else BacktestConfig.from_dict(copy.deepcopy(config))
+            for config in configs
+        ]
+        self.max_workers = max_workers
+        self.seed = seed
+        self.run_seeds = [
+            int(child.generate_state(1)[0])
+            for child in np.random.SeedSequence(seed).spawn(len(self.configs))
+        ]
+        self.market_data = None
+        self.day_index = None
+
+    def load_market_data(self) -> None:
+        """Load the historical data for every run of the sweep once."""
+        token_pairs = list(dict.fromkeys(pair for config in self.configs for pair in config.token_pairs))
+        data_config = BacktestConfig(
+            strategy_name="sweep",
+            start_date=min(config.start_date for config in self.configs),
+            end_date=max(config.end_date for config in self.configs),
+            data_source=self.configs[0].data_source,
+            token_pairs=token_pairs,
+            metrics_dir=self.configs[0].metrics_dir
+        )
+
+        np.random.seed(self.seed)
+        loader = Backtester(data_config)
+        loader.load_historical_data()
+        self.market_data = loader.market_data
+        self.day_index = loader.day_index
+
+    def iter_results(self) -> Iterator[Tuple[int, BacktestResult]]:
+        """
+        Run the sweep, yielding results as runs finish.
+
+        Yields:
+            Tuples of (index of the configuration, its backtest result)
+        """
+        if self.market_data is None:
+            self.load_market_data()
+
+        shared = SharedMarketData(self.market_data, self.day_index)
+        logger.info(f"Running {len(self.configs)} backtests on {self.max_workers or 'all'} workers")
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(shared.spec,)) as pool:
+                futures = [
+                    pool.submit(_run_backtest, index, config, seed)
+                    for index, (config, seed) in enumerate(zip(self.configs, self.run_seeds))
+                ]
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    index, result = future.result()
+                    logger.info(f"Finished {result.strategy_name} ({completed}/{len(futures)}): "
+                                f"{result.total_trades} trades, P/L {result.total_profit_loss:.4f} ETH")
+                    yield index, result
+        finally:
+            shared.close()
+
+    def run(self) -> List[BacktestResult]:
+        """
+        Run the sweep.
+
+        Returns:
+            Backtest results in the order of the configurations
+        """
+        results = [None] * len(self.configs)
+        for index, result in self.iter_results():
+            results[index] = result
+        return results
@@ -0,0 +1,315 @@
+"""
+Dataset Store Module for ArbitrageX
+
+This module keeps historical datasets (swaps, gas prices, arbitrage
+opportunities) as partitioned Parquet datasets with typed schemas, in place
+of one CSV file per fetch. Datasets are partitioned by network, DEX and UTC
+month where those apply, and files are sorted by token pair and time with
+small row groups, so reads filtered on a time range or pair only touch the
+matching partitions and row groups.
+"""
+
+import logging
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+    logging.warning("pyarrow not available. Datasets will be stored as CSV.")
+
+logger = logging.getLogger("DatasetStore")
+
+# Column types, partition columns and sort order of each dataset. Every
+# dataset has a unix-seconds "timestamp" column, from which the "month"
+# partition (YYYY-MM, UTC) is derived. Monthly rather than daily partitions
+# keep files large enough for row group statistics to skip other pairs.
+DATASETS = {
+    "swaps": {
+        "columns": {
+            "id": "string",
+            "timestamp": "int64",
+            "datetime": "timestamp[us]",
+            "token0": "string",
+            "token1": "string",
+            "amount0": "float64",
+            "amount1": "float64",
+            "amountUSD": "float64",
+            "price": "float64",
+            "fee_tier": "string",
+            "dex": "string",
+            "network": "string"
+        },
+        "partitioning": ["network", "dex", "month"],
+        "sort_by": ["token0", "token1", "timestamp"]
+    },
+    "gas_prices": {
+        "columns": {
+            "timestamp": "int64",
+            "datetime": "timestamp[us]",
+            "gas_price_wei": "int64",
+            "gas_price_gwei": "float64",
+            "network": "string"
+        },
+        "partitioning": ["network", "month"],
+        "sort_by": ["timestamp"]
+    },
+    "arbitrage_opportunities": {
+        "columns": {
+            "timestamp": "int64",
+            "datetime": "timestamp[us]",
+            "token0": "string",
+            "token1": "string",
+            "buy_dex": "string",
+            "buy_network": "string",
+            "buy_price": "float64",
+            "sell_dex": "string",
+            "sell_network": "string",
+            "sell_price": "float64",
+            "price_diff_pct": "float64",
+            "potential_profit_usd": "float64"
+        },
+        "partitioning": ["buy_network", "month"],
+        "sort_by": ["token0", "token1", "timestamp"]
+    },
+    "combined_arbitrage": {
+        "columns": {
+            "timestamp": "int64",
+            "datetime": "timestamp[us]",
+            "token0": "string",
+            "token1": "string",
+            "buy_dex": "string",
+            "buy_network": "string",
+            "buy_price": "float64",
+            "sell_dex": "string",
+            "sell_network": "string",
+            "sell_price": "float64",
+            "price_diff_pct": "float64",
+            "potential_profit_usd": "float64",
+            "gas_price_gwei": "float64",
+            "estimated_gas_cost_usd": "float64",
+            "net_profit_usd": "float64",
+            "profitable": "bool"
+        },
+        "partitioning": ["buy_network", "month"],
+        "sort_by": ["token0", "token1", "timestamp"]
+    }
+}
+
+# Rows per Parquet row group; small enough for pair filters to skip most of a file
+ROW_GROUP_SIZE = 16384
+
+
+def _schema(name: str) -> "pa.Schema":
+    """Full Arrow schema of a dataset, partition columns included"""
+    columns = dict(DATASETS[name]["columns"], month="string")
+    return pa.schema([(column, pa.type_for_alias(dtype)) for column, dtype in columns.items()])
+
+
+def _partitioning(name: str) -> "ds.Partitioning":
+    """Hive partitioning (column=value directories) of a dataset"""
+    schema = _schema(name)
+    return ds.partitioning(
+        pa.schema([schema.field(column) for column in DATASETS[name]["partitioning"]]),
+        flavor="hive"
+    )
+
+
+def _to_timestamp(value: Union[datetime, int, float]) -> int:
+    """Convert a datetime or unix timestamp to unix seconds"""
+    return int(value.timestamp()) if isinstance(value, datetime) else int(value)
+
+
+def _utc_months(timestamps: np.ndarray) -> np.ndarray:
+    """UTC months (YYYY-MM) of unix timestamps, as used for the month partition"""
+    return np.asarray(timestamps, dtype=np.int64).astype("datetime64[s]").astype("datetime64[M]").astype(str)
+
+
+def load_dataset(path: Union[str, Path],
+                 start_time: Optional[Union[datetime, int]] = None,
+                 end_time: Optional[Union[datetime, int]] = None,
+                 filters: Optional[Dict[str, Any]] = None,
+                 columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a Parquet dataset, or a single Parquet file, into a DataFrame.
+
+    Filters are pushed down to the scan: partitions outside the time range
+    or not matching a partition column filter are never opened, and row
+    groups whose statistics rule out a match are skipped.
+
+    Args:
+        path: Dataset directory (named after its entry in DATASETS for a
+            typed read) or Parquet file
+        start_time: Earliest timestamp to include
+        end_time: Latest timestamp to include
+        filters: Column to value (or list of accepted values) to match,
+            e.g. {"token0": "WETH", "token1": "USDC"}
+        columns: Columns to read (defaults to all)
+
+    Returns:
+        DataFrame of the matching rows
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("pyarrow is required to read Parquet datasets")
+
+    path = Path(path)
+    name = path.name
+    if name in DATASETS:
+        if not path.exists():
+            return pd.DataFrame(columns=columns or list(DATASETS[name]["columns"]))
+        dataset = ds.dataset(path, format="parquet", schema=_schema(name), partitioning=_partitioning(name))
+    else:
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+
+    expression = None
+    conditions = []
+    partitioned_by_month = "month" in dataset.schema.names
+    if start_time is not None:
+        start_timestamp = _to_timestamp(start_time)
+        conditions.append(ds.field("timestamp") >= start_timestamp)
+        if partitioned_by_month:
+            conditions.append(ds.field("month") >= _utc_months(start_timestamp).item())
+    if end_time is not None:
+        end_timestamp = _to_timestamp(end_time)
+        conditions.append(ds.field("timestamp") <= end_timestamp)
+        if partitioned_by_month:
+            conditions.append(ds.field("month") <= _utc_months(end_timestamp).item())
+    for column, value in (filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            conditions.append(ds.field(column).isin(list(value)))
+        else:
+            conditions.append(ds.field(column) == value)
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    if columns is None:
+        # The month partition only exists to prune reads
+        columns = [column for column in dataset.schema.names if column != "month"]
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+
+class DatasetStore:
+    """
+    Append-only store of the partitioned historical datasets under one root.
+    """
+
+    def __init__(self, root: Union[str, Path] = "data/datasets"):
+        """
+        Initialize the dataset store.
+
+        Args:
+            root: Directory holding one subdirectory per dataset
+        """
+        self.root = Path(root)
+
+    def append(self, name: str, df: pd.DataFrame) -> int:
+        """
+        Append rows to a dataset.
+
+        Rows are written as new files in their partitions; existing files
+        are never rewritten, and rows are not de-duplicated.
+
+        Args:
+            name: Dataset name (a key of DATASETS)
+            df: Rows to append; columns missing from the schema are dropped
+                and schema columns missing from df are stored as null
+
+        Returns:
+            Number of rows written
+        """
+        if not ARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to write Parquet datasets")
+        if df.empty:
+            return 0
+
+        spec = DATASETS[name]
+        schema = _schema(name)
+        months = _utc_months(df["timestamp"].to_numpy(dtype=np.int64))
+
+        arrays = []
+        for field in schema:
+            if field.name == "month":
+                arrays.append(pa.array(months, type=field.type))
+            elif field.name in df.columns:
+                arrays.append(pa.array(df[field.name], type=field.type, from_pandas=True))
+            else:
+                arrays.append(pa.nulls(len(df), type=field.type))
+        table = pa.Table.from_arrays(arrays, schema=schema)
+        table = table.sort_by([(column, "ascending") for column in spec["sort_by"]])
+
+        ds.write_dataset(
+            table,
+            self.root / name,
+            format="parquet",
+            partitioning=_partitioning(name),
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            max_rows_per_group=ROW_GROUP_SIZE,
+            min_rows_per_group=min(ROW_GROUP_SIZE, table.num_rows)
+        )
+        logger.info(f"Appended {table.num_rows} rows to dataset {name}")
+        return table.num_rows
+
+    def compact(self, name: str) -> int:
+        """
+        Merge the files that appends left in each partition of a dataset.
+
+        Every append adds files, so partitions fed by frequent small
+        appends end up with many small, separately sorted files. Compaction
+        rewrites each such partition as one file sorted by the dataset's
+        sort order. Don't append to the dataset while it runs.
+
+        Args:
+            name: Dataset name (a key of DATASETS)
+
+        Returns:
+            Number of partitions rewritten
+        """
+        if not ARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to write Parquet datasets")
+
+        files_by_partition: Dict[Path, List[Path]] = {}
+        for path in (self.root / name).rglob("*.parquet"):
+            files_by_partition.setdefault(path.parent, []).append(path)
+
+        sort_keys = [(column, "ascending") for column in DATASETS[name]["sort_by"]]
+        rewritten = 0
+        for partition, files in files_by_partition.items():
+            if len(files) < 2:
+                continue
+
+            table = ds.dataset(files, format="parquet").to_table().sort_by(sort_keys)
+            compacted = partition / f"part-{uuid.uuid4().hex}-0.parquet"
+            temp_path = partition / (compacted.name + ".tmp")
+            pq.write_table(table, temp_path, row_group_size=ROW_GROUP_SIZE)
+            temp_path.rename(compacted)
+            for path in files:
+                path.unlink()
+            rewritten += 1
+
+        logger.info(f"Compacted {rewritten} partitions of dataset {name}")
+        return rewritten
+
+    def read(self, name: str,
+             start_time: Optional[Union[datetime, int]] = None,
+             end_time: Optional[Union[datetime, int]] = None,
+             filters: Optional[Dict[str, Any]] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read rows of a dataset; see load_dataset for the arguments.
+
+        Returns:
+            DataFrame of the matching rows (empty if nothing was stored yet)
+        """
+        return load_dataset(self.root / name, start_time, end_time, filters, columns)
@@ -187,6 +187,8 @@ class FeatureExtractor:
         """
         self.config = self._load_config(config_path)
         self.raw_data = None
+        self.hourly_data = None
+        self.unscaled_features_df = None
         self.features_df = None
         self.target_df = None
         self.scaler = None
@@ -266,15 +268,7 @@ class FeatureExtractor:
                     trades = data["trade_history"]
                     logger.info(f"Loaded {len(trades)} trades from {self.raw_data_path}")
                     
-                    # Convert to DataFrame
-                    df = pd.DataFrame(trades)
-                    
-                    # Convert timestamp to datetime
-                    if "timestamp" in df.columns:
-                        df["datetime"] = pd.to_datetime(df["timestamp"], unit='s')
-                        df.set_index("datetime", inplace=True)
-                        df.sort_index(inplace=True)
-                    
+                    df = self._trades_to_frame(trades)
                     self.raw_data = df
                     return df
                 else:
@@ -287,13 +281,68 @@ class FeatureExtractor:
             logger.error(f"Error loading raw data: {str(e)}")
             return pd.DataFrame()
     
-    def extract_features(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    @staticmethod
+    def _trades_to_frame(trades: List[Dict]) -> pd.DataFrame:
+        """
+        Convert a list of trades to a DataFrame indexed by trade time.
+        
+        Args:
+            trades: Trade dictionaries with a "timestamp" in seconds
+            
+        Returns:
+            DataFrame of trades sorted by time
+        """
+        # Convert to DataFrame
+        df = pd.DataFrame(trades)
+        
+        # Convert timestamp to datetime
+        if "timestamp" in df.columns:
+            df["datetime"] = pd.to_datetime(df["timestamp"], unit='s')
+            df.set_index("datetime", inplace=True)
+            df.sort_index(inplace=True)
+        
+        return df
+    
+    @staticmethod
+    def _resample_hourly(raw_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate trades into hourly intervals.
+        
+        Args:
+            raw_data: DataFrame of trades indexed by trade time
+            
+        Returns:
+            DataFrame with hourly means and a trade_count column
+        """
+        hourly_data = raw_data.resample('1H').agg({
+            'profit': 'mean',
+            'success': 'mean',  # This gives success rate
+            'gas_price': 'mean',
+            'gas_used': 'mean',
+            'amount': 'mean',
+            'timestamp': 'count'  # This gives trade count per hour
+        }).fillna(0)
+        
+        hourly_data.rename(columns={'timestamp': 'trade_count'}, inplace=True)
+        return hourly_data
+    
+    def extract_features(self, new_results: Optional[Union[Dict, List[Dict]]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Extract features from raw trade data.
         
+        When new trade results are passed after a previous extraction, they
+        are appended to the raw data and only the hours they affect are
+        featurized again; the rest of the previous features are reused.
+        
+        Args:
+            new_results: Trade result(s) to append to the raw data (optional)
+            
         Returns:
             Tuple of (features_df, target_df)
         """
+        if new_results is not None:
+            return self._append_results(new_results)
+        
         if self.raw_data is None or self.raw_data.empty:
             self.load_raw_data()
             
@@ -308,109 +357,70 @@ class FeatureExtractor:
             logger.warning(f"Insufficient data points: {len(self.raw_data)} < {self.config.get('min_data_points', 100)}")
             return pd.DataFrame(), pd.DataFrame()
         
-        # Initialize feature dataframes
-        features = []
-        targets = []
+        # Resample data to hourly intervals if needed
+        self.hourly_data = self._resample_hourly(self.raw_data)
         
-        # Get feature window size in hours
+        # Extract features for each time window
         window_size = self.config.get("feature_window_size", 24)
-        target_window = self.config.get("target_window_size", 6)
-        
-        # Resample data to hourly intervals if needed
-        hourly_data = self.raw_data.resample('1H').agg({
-            'profit': 'mean',
-            'success': 'mean',  # This gives success rate
-            'gas_price': 'mean',
-            'gas_used': 'mean',
-            'amount': 'mean',
-            'timestamp': 'count'  # This gives trade count per hour
-        }).fillna(0)
+        features_df, target_df = self._extract_windows(self.hourly_data, window_size)
         
-        hourly_data.rename(columns={'timestamp': 'trade_count'}, inplace=True)
+        return self._finish_extraction(features_df, target_df)
+    
+    def _append_results(self, new_results: Union[Dict, List[Dict]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Append trade results and featurize only the hours they affect.
         
-        # Extract features for each time window
-        for i in range(window_size, len(hourly_data) - target_window):
-            # Get window data
-            window_data = hourly_data.iloc[i-window_size:i]
-            target_data = hourly_data.iloc[i:i+target_window]
-            
-            # Extract features from this window
-            window_features = {}
-            
-            # 1. Market volatility indicators
-            if "market_volatility" in self.config.get("features_to_extract", []):
-                window_features["profit_std"] = window_data["profit"].std()
-                window_features["profit_range"] = window_data["profit"].max() - window_data["profit"].min()
-                window_features["profit_trend"] = self._calculate_trend(window_data["profit"])
-            
-            # 2. Gas price trends
-            if "gas_price_trends" in self.config.get("features_to_extract", []):
-                window_features["gas_price_mean"] = window_data["gas_price"].mean()
-                window_features["gas_price_std"] = window_data["gas_price"].std()
-                window_features["gas_price_trend"] = self._calculate_trend(window_data["gas_price"])
-            
-            # 3. Time-based patterns
-            if "time_patterns" in self.config.get("features_to_extract", []):
-                current_hour = window_data.index[-1].hour
-                current_day = window_data.index[-1].dayofweek
-                window_features["hour_of_day"] = current_hour
-                window_features["day_of_week"] = current_day
-                
-                # One-hot encode hour of day (simplified to 4 periods)
-                for period in range(4):
-                    period_start = period * 6
-                    period_end = (period + 1) * 6 - 1
-                    window_features[f"hour_period_{period}"] = 1 if period_start <= current_hour <= period_end else 0
-                
-                # One-hot encode day of week (weekday vs weekend)
-                window_features["is_weekend"] = 1 if current_day >= 5 else 0
-            
-            # 4. Historical profitability
-            if "historical_profitability" in self.config.get("features_to_extract", []):
-                window_features["avg_profit_1h"] = window_data["profit"].iloc[-1]
-                window_features["avg_profit_6h"] = window_data["profit"].iloc[-6:].mean()
-                window_features["avg_profit_24h"] = window_data["profit"].mean()
-                window_features["success_rate_24h"] = window_data["success"].mean()
-            
-            # 5. Network congestion metrics
-            if "network_congestion" in self.config.get("features_to_extract", []):
-                window_features["avg_gas_used"] = window_data["gas_used"].mean()
-                window_features["gas_used_trend"] = self._calculate_trend(window_data["gas_used"])
-                window_features["trade_frequency"] = window_data["trade_count"].mean()
-            
-            # Add timestamp for reference
-            window_features["timestamp"] = window_data.index[-1].timestamp()
-            
-            # Extract target variables
-            target_vars = {}
-            for target in self.config.get("target_variables", ["profit", "success_rate"]):
-                if target == "profit":
-                    target_vars["future_profit"] = target_data["profit"].mean()
-                elif target == "success_rate":
-                    target_vars["future_success_rate"] = target_data["success"].mean()
-            
-            target_vars["timestamp"] = window_data.index[-1].timestamp()
+        Args:
+            new_results: Trade result(s) with a "timestamp" in seconds
             
-            features.append(window_features)
-            targets.append(target_vars)
+        Returns:
+            Tuple of (features_df, target_df) covering all data
+        """
+        if isinstance(new_results, dict):
+            new_results = [new_results]
+        new_data = self._trades_to_frame(new_results)
+        if new_data.empty:
+            return self.features_df, self.target_df
         
-        # Convert to DataFrames
-        features_df = pd.DataFrame(features)
-        target_df = pd.DataFrame(targets)
+        if self.raw_data is None:
+            self.load_raw_data()
+        if self.raw_data is None or self.raw_data.empty:
+            self.raw_data = new_data
+        else:
+            self.raw_data = pd.concat([self.raw_data, new_data]).sort_index(kind="stable")
         
-        # Set timestamp as index
-        if "timestamp" in features_df.columns:
-            features_df["datetime"] = pd.to_datetime(features_df["timestamp"], unit='s')
-            features_df.set_index("datetime", inplace=True)
-            features_df.drop("timestamp", axis=1, inplace=True)
+        # Without previous features there is nothing to reuse
+        if self.hourly_data is None or self.unscaled_features_df is None or self.hourly_data.empty:
+            return self.extract_features()
         
-        if "timestamp" in target_df.columns:
-            target_df["datetime"] = pd.to_datetime(target_df["timestamp"], unit='s')
-            target_df.set_index("datetime", inplace=True)
-            target_df.drop("timestamp", axis=1, inplace=True)
+        # Re-aggregate from the last previous hour (it may have been partial) or
+        # from the earliest new trade, whichever comes first
+        first_hour = min(new_data.index.min().floor('H'), self.hourly_data.index[-1])
+        recent_hours = self._resample_hourly(self.raw_data[self.raw_data.index >= first_hour])
+        self.hourly_data = pd.concat([self.hourly_data[self.hourly_data.index < first_hour], recent_hours])
+        
+        # Feature rows whose feature or target window includes a changed hour
+        window_size = self.config.get("feature_window_size", 24)
+        target_window = self.config.get("target_window_size", 6)
+        first_changed = self.hourly_data.index.get_loc(first_hour)
+        first_row = max(window_size, first_changed - target_window + 1)
+        
+        features_df, target_df = self._extract_windows(self.hourly_data, first_row)
+        if first_row > 0:
+            cutoff = self.hourly_data.index[first_row - 1]
+            features_df = pd.concat([self.unscaled_features_df[self.unscaled_features_df.index < cutoff], features_df])
+            target_df = pd.concat([self.target_df[self.target_df.index < cutoff], target_df])
+        
+        logger.info(f"Appended {len(new_data)} trades, featurized {max(len(self.hourly_data) - target_window - first_row, 0)} windows")
+        return self._finish_extraction(features_df, target_df)
+    
+    def _finish_extraction(self, features_df: pd.DataFrame, target_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Scale extracted features and store the results."""
+        self.unscaled_features_df = features_df
         
         # Scale features
-        features_df = self._scale_features(features_df)
+        if not features_df.empty:
+            features_df = self._scale_features(features_df)
         
         self.features_df = features_df
         self.target_df = target_df
@@ -419,34 +429,129 @@ class FeatureExtractor:
         
         return features_df, target_df
     
-    def _calculate_trend(self, series: pd.Series) -> float:
+    def _extract_windows(self, hourly_data: pd.DataFrame, first_row: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
-        Calculate the trend of a time series using linear regression.
+        Extract features and targets for every window ending at or after a row.
+        
+        The feature window of row i covers hours i-window_size .. i-1 and its
+        target window hours i .. i+target_window-1. All windows are processed
+        at once as strided views of the hourly columns.
         
         Args:
-            series: Time series data
+            hourly_data: Hourly aggregated trade data
+            first_row: First row i to extract (at least window_size)
             
         Returns:
-            Slope of the linear regression line
+            Tuple of (unscaled features_df, target_df) indexed by the last
+            hour of each feature window
         """
-        if len(series) < 2:
-            return 0
-        
-        x = np.arange(len(series))
-        y = series.values
+        window_size = self.config.get("feature_window_size", 24)
+        target_window = self.config.get("target_window_size", 6)
+        features_to_extract = self.config.get("features_to_extract", [])
         
-        # Calculate slope using least squares
-        x_mean = x.mean()
-        y_mean = y.mean()
+        first_row = max(first_row, window_size)
+        last_row = len(hourly_data) - target_window
+        if last_row <= first_row:
+            return pd.DataFrame(), pd.DataFrame()
         
-        numerator = ((x - x_mean) * (y - y_mean)).sum()
-        denominator = ((x - x_mean) ** 2).sum()
+        def windows(column: str) -> np.ndarray:
+            values = hourly_data[column].to_numpy(dtype=float)[first_row - window_size:last_row - 1]
+            return np.lib.stride_tricks.sliding_window_view(values, window_size)
+        
+        def target_windows(column: str) -> np.ndarray:
+            values = hourly_data[column].to_numpy(dtype=float)[first_row:last_row + target_window - 1]
+            return np.lib.stride_tricks.sliding_window_view(values, target_window)
+        
+        # Index of each row is the last hour of its feature window
+        window_end = hourly_data.index[first_row - 1:last_row - 1]
+        index = pd.DatetimeIndex(window_end, name="datetime")
+        
+        features = {}
+        
+        # 1. Market volatility indicators
+        if "market_volatility" in features_to_extract:
+            profit = windows("profit")
+            features["profit_std"] = self._window_std(profit)
+            features["profit_range"] = profit.max(axis=1) - profit.min(axis=1)
+            features["profit_trend"] = self._calculate_trend(profit)
+        
+        # 2. Gas price trends
+        if "gas_price_trends" in features_to_extract:
+            gas_price = windows("gas_price")
+            features["gas_price_mean"] = gas_price.mean(axis=1)
+            features["gas_price_std"] = self._window_std(gas_price)
+            features["gas_price_trend"] = self._calculate_trend(gas_price)
+        
+        # 3. Time-based patterns
+        if "time_patterns" in features_to_extract:
+            current_hour = window_end.hour.to_numpy(dtype=np.int64)
+            current_day = window_end.dayofweek.to_numpy(dtype=np.int64)
+            features["hour_of_day"] = current_hour
+            features["day_of_week"] = current_day
+            
+            # One-hot encode hour of day (simplified to 4 periods)
+            for period in range(4):
+                features[f"hour_period_{period}"] = (current_hour // 6 == period).astype(np.int64)
+            
+            # One-hot encode day of week (weekday vs weekend)
+            features["is_weekend"] = (current_day >= 5).astype(np.int64)
+        
+        # 4. Historical profitability
+        if "historical_profitability" in features_to_extract:
+            profit = windows("profit")
+            features["avg_profit_1h"] = profit[:, -1]
+            features["avg_profit_6h"] = profit[:, -6:].mean(axis=1)
+            features["avg_profit_24h"] = profit.mean(axis=1)
+            features["success_rate_24h"] = windows("success").mean(axis=1)
+        
+        # 5. Network congestion metrics
+        if "network_congestion" in features_to_extract:
+            gas_used = windows("gas_used")
+            features["avg_gas_used"] = gas_used.mean(axis=1)
+            features["gas_used_trend"] = self._calculate_trend(gas_used)
+            features["trade_frequency"] = windows("trade_count").mean(axis=1)
+        
+        # Extract target variables
+        targets = {}
+        for target in self.config.get("target_variables", ["profit", "success_rate"]):
+            if target == "profit":
+                targets["future_profit"] = target_windows("profit").mean(axis=1)
+            elif target == "success_rate":
+                targets["future_success_rate"] = target_windows("success").mean(axis=1)
+        
+        return pd.DataFrame(features, index=index), pd.DataFrame(targets, index=index.copy())
+    
+    @staticmethod
+    def _window_std(windows: np.ndarray) -> np.ndarray:
+        """Sample standard deviation of each window (NaN for single-value windows)."""
+        if windows.shape[1] < 2:
+            return np.full(len(windows), np.nan)
+        return windows.std(axis=1, ddof=1)
+    
+    def _calculate_trend(self, series: Union[pd.Series, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Calculate the trend of a time series using linear regression.
         
-        if denominator == 0:
-            return 0
+        A 2-D array is treated as one series per row and gives one slope per
+        row; the closed-form least-squares slope is a dot product with fixed
+        weights, so all windows are fitted in a single matrix product.
         
-        slope = numerator / denominator
-        return slope
+        Args:
+            series: Time series data, or a 2-D array of equally long series
+            
+        Returns:
+            Slope of the linear regression line (an array for 2-D input)
+        """
+        y = np.asarray(series, dtype=float)
+        length = y.shape[-1]
+        if length < 2:
+            return np.zeros(y.shape[:-1]) if y.ndim > 1 else 0
+        
+        # Calculate slope using least squares: sum((x - x_mean) * y) / sum((x - x_mean) ** 2)
+        x = np.arange(length)
+        x_centered = x - x.mean()
+        slope = y @ x_centered / (x_centered ** 2).sum()
+        return slope if y.ndim > 1 else float(slope)
     
     def _scale_features(self, features_df: pd.DataFrame) -> pd.DataFrame:
         """
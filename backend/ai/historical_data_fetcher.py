@@ -4,12 +4,19 @@ import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import requests
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from web3 import Web3
 from pathlib import Path
 import time
 
+try:
+    from .subgraph_fetcher import SubgraphFetcher
+    from .dataset_store import DatasetStore, ARROW_AVAILABLE
+except ImportError:
+    # Running with the ai directory itself on the path
+    from subgraph_fetcher import SubgraphFetcher
+    from dataset_store import DatasetStore, ARROW_AVAILABLE
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,16 +34,23 @@ class HistoricalDataFetcher:
     Supports multiple DEXs, networks, and time periods.
     """
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", max_workers: int = 8):
         """
         Initialize the historical data fetcher.
         
         Args:
             data_dir: Directory to store fetched data
+            max_workers: Maximum number of concurrent subgraph requests
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
+        # Paginated, resumable subgraph client; checkpoints live next to the data
+        self.subgraph = SubgraphFetcher(self.data_dir / "checkpoints", max_workers=max_workers)
+        
+        # Partitioned Parquet datasets of everything fetched
+        self.store = DatasetStore(self.data_dir / "datasets")
+        
         # Default API endpoints and settings
         self.settings = {
             "ethereum": {
@@ -77,7 +91,7 @@ class HistoricalDataFetcher:
                        token_pair: Optional[str] = None,
                        start_time: Optional[datetime] = None,
                        end_time: Optional[datetime] = None,
-                       limit: int = 1000) -> pd.DataFrame:
+                       limit: Optional[int] = None) -> pd.DataFrame:
         """
         Fetch historical swap data from a specific DEX on a specific network.
         
@@ -87,7 +101,8 @@ class HistoricalDataFetcher:
             token_pair: Optional token pair to filter by (e.g., "ETH-USDC")
             start_time: Start time for data fetching
             end_time: End time for data fetching
-            limit: Maximum number of swaps to fetch
+            limit: Maximum number of swaps to return, most recent first
+                (defaults to every swap in the time range)
             
         Returns:
             DataFrame containing historical swap data
@@ -100,6 +115,31 @@ class HistoricalDataFetcher:
             logger.error(f"DEX {dex} not supported on {network}")
             return pd.DataFrame()
         
+        swaps_df = self.fetch_swaps([(network, dex)], token_pair, start_time, end_time)[(network, dex)]
+        return swaps_df if limit is None else swaps_df.head(limit)
+    
+    def fetch_swaps(self, 
+                    network_dexes: List[Tuple[str, str]], 
+                    token_pair: Optional[str] = None,
+                    start_time: Optional[datetime] = None,
+                    end_time: Optional[datetime] = None) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Fetch historical swap data from several DEXs concurrently.
+        
+        Every (network, DEX) time range is split into chunks that share one
+        worker pool and HTTP session. Progress is checkpointed, so calling
+        again with the same arguments after an interruption resumes the pull.
+        
+        Args:
+            network_dexes: (network, DEX) pairs to fetch
+            token_pair: Optional token pair to filter by (e.g., "ETH-USDC")
+            start_time: Start time for data fetching
+            end_time: End time for data fetching
+            
+        Returns:
+            Dictionary of (network, DEX) to a DataFrame of its swaps, most
+            recent first (empty if the fetch failed or found no swaps)
+        """
         # Set default time range if not provided
         if start_time is None:
             start_time = datetime.now() - timedelta(days=30)
@@ -110,60 +150,53 @@ class HistoricalDataFetcher:
         start_timestamp = int(start_time.timestamp())
         end_timestamp = int(end_time.timestamp())
         
-        logger.info(f"Fetching {dex} swaps on {network} from {start_time} to {end_time}")
-        
-        # Construct GraphQL query based on DEX and network
-        query = self._get_graphql_query(dex, network, token_pair, start_timestamp, end_timestamp, limit)
+        logger.info(f"Fetching swaps for {network_dexes} from {start_time} to {end_time}")
         
-        try:
-            response = requests.post(
-                self.settings[network]["api_url"],
-                json={"query": query}
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"API request failed with status code {response.status_code}: {response.text}")
-                return pd.DataFrame()
-            
-            data = response.json()
-            
-            if "errors" in data:
-                logger.error(f"GraphQL query returned errors: {data['errors']}")
-                return pd.DataFrame()
+        tasks = [
+            {
+                "key": f"{network}_{dex}_swaps",
+                "url": self.settings[network]["api_url"],
+                "entity": "swaps",
+                "fields": self._get_graphql_fields(dex, network, token_pair),
+                "start": start_timestamp,
+                "end": end_timestamp
+            }
+            for network, dex in network_dexes
+        ]
+        results = self.subgraph.fetch(tasks)
+        
+        swaps_dfs = {}
+        for (network, dex), task in zip(network_dexes, tasks):
+            rows = results[task["key"]]
+            if rows is None:
+                logger.error(f"Error fetching {dex} swaps on {network}")
+                swaps_dfs[(network, dex)] = pd.DataFrame()
+                continue
             
             # Process the response based on DEX
-            swaps = self._process_dex_response(dex, data)
+            swaps = self._process_dex_response(dex, {"data": {"swaps": rows}})
             
             if not swaps:
                 logger.warning(f"No swaps found for {dex} on {network}")
-                return pd.DataFrame()
+                swaps_dfs[(network, dex)] = pd.DataFrame()
+                continue
             
-            df = pd.DataFrame(swaps)
+            df = pd.DataFrame(swaps).sort_values(["timestamp", "id"], ascending=False, ignore_index=True)
+            df["network"] = network
             
-            # Save to CSV
-            output_file = self.data_dir / f"{network}_{dex}_swaps_{start_timestamp}_{end_timestamp}.csv"
-            df.to_csv(output_file, index=False)
-            logger.info(f"Saved {len(df)} swaps to {output_file}")
+            self._save_dataset("swaps", df, f"{network}_{dex}_swaps_{start_timestamp}_{end_timestamp}.csv")
             
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error fetching {dex} swaps on {network}: {e}")
-            return pd.DataFrame()
+            swaps_dfs[(network, dex)] = df
+        
+        return swaps_dfs
     
-    def _get_graphql_query(self, 
-                          dex: str, 
-                          network: str, 
-                          token_pair: Optional[str], 
-                          start_timestamp: int, 
-                          end_timestamp: int, 
-                          limit: int) -> str:
-        """Generate the appropriate GraphQL query for the specified DEX"""
+    def _get_graphql_fields(self, 
+                            dex: str, 
+                            network: str, 
+                            token_pair: Optional[str]) -> str:
+        """Generate the GraphQL selection set of a swap for the specified DEX"""
         if dex == "uniswap":
             return """
-            {
-                swaps(first: %d, orderBy: timestamp, orderDirection: desc, 
-                      where: {timestamp_gte: %d, timestamp_lte: %d}) {
                     id
                     timestamp
                     pool {
@@ -180,14 +213,9 @@ class HistoricalDataFetcher:
                     amountUSD
                     sqrtPriceX96
                     tick
-                }
-            }
-            """ % (limit, start_timestamp, end_timestamp)
+            """
         elif dex == "sushiswap":
             return """
-            {
-                swaps(first: %d, orderBy: timestamp, orderDirection: desc, 
-                      where: {timestamp_gte: %d, timestamp_lte: %d}) {
                     id
                     timestamp
                     pair {
@@ -203,15 +231,10 @@ class HistoricalDataFetcher:
                     amount0Out
                     amount1Out
                     amountUSD
-                }
-            }
-            """ % (limit, start_timestamp, end_timestamp)
+            """
         else:
-            # Default query structure
+            # Default selection
             return """
-            {
-                swaps(first: %d, orderBy: timestamp, orderDirection: desc, 
-                      where: {timestamp_gte: %d, timestamp_lte: %d}) {
                     id
                     timestamp
                     pair {
@@ -226,9 +249,7 @@ class HistoricalDataFetcher:
                     amount1In
                     amount0Out
                     amount1Out
-                }
-            }
-            """ % (limit, start_timestamp, end_timestamp)
+            """
     
     def _process_dex_response(self, dex: str, response_data: Dict) -> List[Dict]:
         """Process the API response based on the DEX format"""
@@ -355,10 +376,8 @@ class HistoricalDataFetcher:
         
         df = pd.DataFrame(gas_prices)
         
-        # Save to CSV
-        output_file = self.data_dir / f"{network}_gas_prices_{int(start_time.timestamp())}_{int(end_time.timestamp())}.csv"
-        df.to_csv(output_file, index=False)
-        logger.info(f"Saved {len(df)} gas price records to {output_file}")
+        self._save_dataset("gas_prices", df,
+                           f"{network}_gas_prices_{int(start_time.timestamp())}_{int(end_time.timestamp())}.csv")
         
         return df
     
@@ -367,7 +386,9 @@ class HistoricalDataFetcher:
                                     dexes: List[str] = None,
                                     token_pairs: List[str] = None,
                                     start_time: Optional[datetime] = None,
-                                    end_time: Optional[datetime] = None) -> pd.DataFrame:
+                                    end_time: Optional[datetime] = None,
+                                    bucket_seconds: int = 60,
+                                    min_price_diff_pct: float = 0.5) -> pd.DataFrame:
         """
         Identify historical arbitrage opportunities across multiple DEXs and networks.
         
@@ -377,6 +398,8 @@ class HistoricalDataFetcher:
             token_pairs: List of token pairs to analyze
             start_time: Start time for data fetching
             end_time: End time for data fetching
+            bucket_seconds: Width of the time buckets prices are compared in
+            min_price_diff_pct: Minimum price difference in percent
             
         Returns:
             DataFrame containing historical arbitrage opportunities
@@ -398,83 +421,211 @@ class HistoricalDataFetcher:
         
         logger.info(f"Analyzing arbitrage opportunities across {networks} networks and {dexes} DEXs")
         
-        # Fetch swap data for each network and DEX
+        # Fetch swap data for every network and DEX in one concurrent pull
+        network_dexes = [
+            (network, dex)
+            for network in networks
+            for dex in self.settings[network]["dexes"]
+            if dex in dexes
+        ]
         all_swaps = []
         
-        for network in networks:
-            for dex in self.settings[network]["dexes"]:
-                if dex in dexes:
-                    swaps_df = self.fetch_dex_swaps(
-                        network=network,
-                        dex=dex,
-                        token_pair=None,  # Fetch all token pairs
-                        start_time=start_time,
-                        end_time=end_time
-                    )
-                    
-                    if not swaps_df.empty:
-                        swaps_df["network"] = network
-                        all_swaps.append(swaps_df)
+        for (network, dex), swaps_df in self.fetch_swaps(network_dexes, None, start_time, end_time).items():
+            if not swaps_df.empty:
+                swaps_df["network"] = network
+                all_swaps.append(swaps_df)
         
         if not all_swaps:
             logger.warning("No swap data fetched")
             return pd.DataFrame()
         
-        # Combine all swap data
-        combined_df = pd.concat(all_swaps, ignore_index=True)
-        
-        # Group by timestamp (rounded to nearest minute) and token pair
-        combined_df["minute"] = combined_df["timestamp"].apply(lambda x: x - (x % 60))
-        
         # Identify arbitrage opportunities
-        arbitrage_opportunities = []
-        
-        for (minute, token0, token1), group in combined_df.groupby(["minute", "token0", "token1"]):
-            if len(group) < 2:
-                continue
-            
-            # Find min and max prices within the group
-            min_price_row = group.loc[group["price"].idxmin()]
-            max_price_row = group.loc[group["price"].idxmax()]
-            
-            # Skip if min and max are from the same DEX and network
-            if (min_price_row["dex"] == max_price_row["dex"] and 
-                min_price_row["network"] == max_price_row["network"]):
-                continue
-            
-            # Calculate potential profit percentage
-            price_diff_pct = (max_price_row["price"] - min_price_row["price"]) / min_price_row["price"] * 100
-            
-            # Only consider significant opportunities
-            if price_diff_pct > 0.5:  # More than 0.5% difference
-                arbitrage_opportunities.append({
-                    "timestamp": minute,
-                    "datetime": datetime.fromtimestamp(minute),
-                    "token0": token0,
-                    "token1": token1,
-                    "buy_dex": min_price_row["dex"],
-                    "buy_network": min_price_row["network"],
-                    "buy_price": min_price_row["price"],
-                    "sell_dex": max_price_row["dex"],
-                    "sell_network": max_price_row["network"],
-                    "sell_price": max_price_row["price"],
-                    "price_diff_pct": price_diff_pct,
-                    "potential_profit_usd": price_diff_pct * min_price_row["amountUSD"] / 100 if "amountUSD" in min_price_row else None
-                })
+        arb_df = self.detect_arbitrage_opportunities(all_swaps, bucket_seconds, min_price_diff_pct)
         
-        if not arbitrage_opportunities:
+        if arb_df.empty:
             logger.warning("No arbitrage opportunities identified")
             return pd.DataFrame()
         
-        arb_df = pd.DataFrame(arbitrage_opportunities)
+        self._save_dataset("arbitrage_opportunities", arb_df,
+                           f"arbitrage_opportunities_{int(start_time.timestamp())}_{int(end_time.timestamp())}.csv")
         
-        # Save to CSV
-        output_file = self.data_dir / f"arbitrage_opportunities_{int(start_time.timestamp())}_{int(end_time.timestamp())}.csv"
-        arb_df.to_csv(output_file, index=False)
-        logger.info(f"Saved {len(arb_df)} arbitrage opportunities to {output_file}")
+        return arb_df
+    
+    def detect_arbitrage_opportunities(self, 
+                                       swaps: Union[pd.DataFrame, List[pd.DataFrame]], 
+                                       bucket_seconds: int = 60,
+                                       min_price_diff_pct: float = 0.5,
+                                       cross_network: bool = True,
+                                       chunk_seconds: int = 86400) -> pd.DataFrame:
+        """
+        Find price differences for the same token pair within each time bucket.
+        
+        In every bucket the cheapest and dearest swap of a pair are compared
+        (the first one in input order on ties); buckets whose two swaps come
+        from different venues and differ by more than min_price_diff_pct
+        are opportunities. Swaps are processed one time chunk at a time and
+        the input frames are never concatenated, so memory stays bounded by
+        the swaps of one chunk.
+        
+        Args:
+            swaps: Swap DataFrames (timestamp, token0, token1, price, dex,
+                network and optionally amountUSD), e.g. one per network and DEX
+            bucket_seconds: Width of the time buckets prices are compared in
+            min_price_diff_pct: Minimum price difference in percent
+            cross_network: Compare prices across networks; if False, only
+                swaps on the same network are compared
+            chunk_seconds: Time span processed at once (rounded to whole buckets)
+            
+        Returns:
+            DataFrame of opportunities ordered by bucket and token pair
+        """
+        frames = [swaps] if isinstance(swaps, pd.DataFrame) else [df for df in swaps if not df.empty]
+        has_amount_usd = any("amountUSD" in df.columns for df in frames)
+        
+        # Each frame's columns in time order, with categories as integer codes
+        # into shared vocabularies (-1 for missing) and every row's position
+        # in the concatenated input for tie-breaking
+        categories = ("token0", "token1", "dex", "network")
+        vocabularies = {column: {} for column in categories}
+        sorted_frames = []
+        offset = 0
+        for df in frames:
+            timestamps = df["timestamp"].to_numpy(dtype=np.int64)
+            order = np.argsort(timestamps, kind="stable")
+            columns = {
+                "timestamp": timestamps[order],
+                "position": order + offset,
+                "price": df["price"].to_numpy(dtype=float)[order],
+                "amountUSD": (df["amountUSD"].to_numpy(dtype=float)[order] if "amountUSD" in df.columns
+                              else np.full(len(df), np.nan))
+            }
+            for column in categories:
+                if column not in df.columns:
+                    columns[column] = np.full(len(df), -1, dtype=np.int64)
+                    continue
+                codes, uniques = pd.factorize(df[column])
+                vocabulary = vocabularies[column]
+                remap = np.array([vocabulary.setdefault(value, len(vocabulary)) for value in uniques] + [-1],
+                                 dtype=np.int64)
+                columns[column] = remap[codes[order]]
+            sorted_frames.append(columns)
+            offset += len(df)
+        
+        if not offset:
+            return pd.DataFrame()
         
+        # Rank token codes alphabetically so groups come out in (bucket, token0, token1) order
+        values = {column: np.array(list(vocabularies[column]) + [np.nan], dtype=object) for column in categories}
+        for column in ("token0", "token1"):
+            order = np.argsort(values[column][:-1].astype(str), kind="stable")
+            values[column] = np.append(values[column][:-1][order], np.nan)
+            rank = np.empty(len(order) + 1, dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            rank[-1] = -1
+            for columns in sorted_frames:
+                columns[column] = rank[columns[column]]
+        
+        chunk_seconds = max(chunk_seconds // bucket_seconds, 1) * bucket_seconds
+        first = min(columns["timestamp"][0] for columns in sorted_frames)
+        last = max(columns["timestamp"][-1] for columns in sorted_frames)
+        
+        opportunities = []
+        chunk_start = first - first % bucket_seconds
+        while chunk_start <= last:
+            chunk_end = chunk_start + chunk_seconds
+            chunk = {}
+            for columns in sorted_frames:
+                start, stop = np.searchsorted(columns["timestamp"], [chunk_start, chunk_end])
+                for name, column_values in columns.items():
+                    chunk.setdefault(name, []).append(column_values[start:stop])
+            chunk = {name: np.concatenate(parts) for name, parts in chunk.items()}
+            
+            if len(chunk["timestamp"]):
+                opportunities.append(self._detect_bucket_extremes(
+                    chunk, values, chunk_start, bucket_seconds, min_price_diff_pct, cross_network
+                ))
+            chunk_start = chunk_end
+        
+        arb_df = pd.concat(opportunities, ignore_index=True)
+        if not has_amount_usd:
+            arb_df["potential_profit_usd"] = None
         return arb_df
     
+    @staticmethod
+    def _detect_bucket_extremes(chunk: Dict[str, np.ndarray], 
+                                values: Dict[str, np.ndarray],
+                                chunk_start: int,
+                                bucket_seconds: int,
+                                min_price_diff_pct: float,
+                                cross_network: bool) -> pd.DataFrame:
+        """
+        Find the opportunities among one chunk of encoded swap columns.
+        
+        Rows are sorted once by group key and input position; the cheapest
+        and dearest price of each group, and the first row holding each, are
+        then segment reductions over the sorted rows.
+        """
+        network = chunk["network"] if not cross_network else np.zeros(len(chunk["timestamp"]), dtype=np.int64)
+        valid = np.flatnonzero((chunk["token0"] >= 0) & (chunk["token1"] >= 0) & (network >= 0))
+        
+        bucket = (chunk["timestamp"][valid] - chunk_start) // bucket_seconds
+        key = bucket
+        for codes, size in ((chunk["token0"], len(values["token0"])), 
+                            (chunk["token1"], len(values["token1"])), 
+                            (network, len(values["network"]))):
+            key = key * size + codes[valid]
+        
+        order = np.lexsort((chunk["position"][valid], key))
+        rows = valid[order]
+        key = key[order]
+        
+        group_starts = np.flatnonzero(np.r_[len(key) > 0, key[1:] != key[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(rows)])
+        
+        # Lowest and highest price of each group (NaN prices ignored), and
+        # the first row in input order that holds it
+        price = chunk["price"][rows]
+        lowest = np.fmin.reduceat(price, group_starts)
+        highest = np.fmax.reduceat(price, group_starts)
+        index = np.arange(len(rows))
+        buy = np.minimum.reduceat(np.where(price == np.repeat(lowest, group_sizes), index, len(rows)), group_starts)
+        sell = np.minimum.reduceat(np.where(price == np.repeat(highest, group_sizes), index, len(rows)), group_starts)
+        
+        candidates = (group_sizes >= 2) & ~np.isnan(lowest)
+        buy = rows[buy[candidates]]
+        sell = rows[sell[candidates]]
+        buy_price = chunk["price"][buy]
+        sell_price = chunk["price"][sell]
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price_diff_pct = (sell_price - buy_price) / buy_price * 100
+        
+        # Skip if min and max are from the same DEX and network (missing values never match)
+        same_venue = ((chunk["dex"][buy] == chunk["dex"][sell]) & (chunk["dex"][buy] >= 0) &
+                      (chunk["network"][buy] == chunk["network"][sell]) & (chunk["network"][buy] >= 0))
+        selected = ~same_venue & (price_diff_pct > min_price_diff_pct)
+        buy, sell = buy[selected], sell[selected]
+        price_diff_pct = price_diff_pct[selected]
+        
+        timestamps = chunk["timestamp"][buy] - chunk["timestamp"][buy] % bucket_seconds
+        unique_timestamps, inverse = np.unique(timestamps, return_inverse=True)
+        local_datetimes = np.array([datetime.fromtimestamp(int(ts)) for ts in unique_timestamps], dtype=object)
+        
+        return pd.DataFrame({
+            "timestamp": timestamps,
+            "datetime": pd.to_datetime(local_datetimes[inverse]),
+            "token0": values["token0"][chunk["token0"][buy]],
+            "token1": values["token1"][chunk["token1"][buy]],
+            "buy_dex": values["dex"][chunk["dex"][buy]],
+            "buy_network": values["network"][chunk["network"][buy]],
+            "buy_price": buy_price[selected],
+            "sell_dex": values["dex"][chunk["dex"][sell]],
+            "sell_network": values["network"][chunk["network"][sell]],
+            "sell_price": sell_price[selected],
+            "price_diff_pct": price_diff_pct,
+            "potential_profit_usd": price_diff_pct * chunk["amountUSD"][buy] / 100
+        })
+    
     def combine_datasets(self, 
                         arb_opportunities_df: pd.DataFrame, 
                         gas_prices_df: pd.DataFrame) -> pd.DataFrame:
@@ -496,42 +647,114 @@ class HistoricalDataFetcher:
         arb_opportunities_df["timestamp"] = arb_opportunities_df["timestamp"].astype(int)
         gas_prices_df["timestamp"] = gas_prices_df["timestamp"].astype(int)
         
-        # Find the closest gas price timestamp for each arbitrage opportunity
-        def find_closest_gas_price(row):
-            network = row["buy_network"]  # Use the buy network for gas price
-            network_gas = gas_prices_df[gas_prices_df["network"] == network]
-            
-            if network_gas.empty:
-                return None
-            
-            # Find closest timestamp
-            closest_idx = (network_gas["timestamp"] - row["timestamp"]).abs().idxmin()
-            return network_gas.loc[closest_idx, "gas_price_gwei"]
+        # Find the closest gas price timestamp for each arbitrage opportunity,
+        # using the gas prices of its buy network
+        arb_timestamps = arb_opportunities_df["timestamp"].to_numpy()
+        arb_networks = arb_opportunities_df["buy_network"].to_numpy()
+        gas_price_gwei = np.full(len(arb_opportunities_df), np.nan)
         
-        arb_opportunities_df["gas_price_gwei"] = arb_opportunities_df.apply(find_closest_gas_price, axis=1)
+        for network, network_gas in gas_prices_df.groupby("network", sort=False):
+            rows = np.flatnonzero(arb_networks == network)
+            if len(rows):
+                gas_price_gwei[rows] = self._nearest_values(
+                    network_gas["timestamp"].to_numpy(),
+                    network_gas["gas_price_gwei"].to_numpy(dtype=float),
+                    arb_timestamps[rows]
+                )
+        
+        arb_opportunities_df["gas_price_gwei"] = gas_price_gwei
         
         # Calculate estimated gas cost and net profit
-        arb_opportunities_df["estimated_gas_cost_usd"] = arb_opportunities_df.apply(
-            lambda row: row["gas_price_gwei"] * 200000 / 1e9 * 2000 if pd.notnull(row["gas_price_gwei"]) else None, 
-            axis=1  # Assuming 200k gas per transaction and $2000 ETH price
-        )
+        # Assuming 200k gas per transaction and $2000 ETH price
+        arb_opportunities_df["estimated_gas_cost_usd"] = gas_price_gwei * 200000 / 1e9 * 2000
         
-        arb_opportunities_df["net_profit_usd"] = arb_opportunities_df.apply(
-            lambda row: row["potential_profit_usd"] - row["estimated_gas_cost_usd"] 
-                       if pd.notnull(row["potential_profit_usd"]) and pd.notnull(row["estimated_gas_cost_usd"]) 
-                       else None,
-            axis=1
-        )
+        potential_profit = pd.to_numeric(arb_opportunities_df["potential_profit_usd"], errors="coerce")
+        arb_opportunities_df["net_profit_usd"] = potential_profit - arb_opportunities_df["estimated_gas_cost_usd"]
         
         arb_opportunities_df["profitable"] = arb_opportunities_df["net_profit_usd"] > 0
         
         # Save combined dataset
-        output_file = self.data_dir / f"combined_arbitrage_dataset_{int(datetime.now().timestamp())}.csv"
-        arb_opportunities_df.to_csv(output_file, index=False)
-        logger.info(f"Saved combined dataset with {len(arb_opportunities_df)} records to {output_file}")
+        self._save_dataset("combined_arbitrage", arb_opportunities_df,
+                           f"combined_arbitrage_dataset_{int(datetime.now().timestamp())}.csv")
         
         return arb_opportunities_df
 
+    def _save_dataset(self, name: str, df: pd.DataFrame, csv_name: str):
+        """
+        Append fetched data to its partitioned dataset.
+        
+        Falls back to a CSV file in data_dir when pyarrow is not installed.
+        
+        Args:
+            name: Dataset name in the store
+            df: Rows to save
+            csv_name: File name to use for the CSV fallback
+        """
+        if ARROW_AVAILABLE:
+            self.store.append(name, df)
+            logger.info(f"Saved {len(df)} records to dataset {self.store.root / name}")
+        else:
+            output_file = self.data_dir / csv_name
+            df.to_csv(output_file, index=False)
+            logger.info(f"Saved {len(df)} records to {output_file}")
+    
+    def load_dataset(self, 
+                     name: str, 
+                     start_time: Optional[datetime] = None,
+                     end_time: Optional[datetime] = None,
+                     **filters) -> pd.DataFrame:
+        """
+        Load previously fetched data, reading only the partitions needed.
+        
+        Args:
+            name: Dataset name (swaps, gas_prices, arbitrage_opportunities,
+                combined_arbitrage)
+            start_time: Earliest time to include
+            end_time: Latest time to include
+            **filters: Column values to match, e.g. network="ethereum",
+                token0="WETH", token1="USDC"
+            
+        Returns:
+            DataFrame of the matching records
+        """
+        return self.store.read(name, start_time, end_time, filters)
+    
+    @staticmethod
+    def _nearest_values(times: np.ndarray, values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Look up the value at the timestamp closest to each target.
+        
+        Equally close timestamps resolve to the one that comes first in
+        the input, matching a row-by-row idxmin over the absolute difference.
+        
+        Args:
+            times: Timestamps of the values (any order)
+            values: Values to look up
+            targets: Timestamps to find the closest value for
+            
+        Returns:
+            Array of the closest value for each target
+        """
+        order = np.argsort(times, kind="stable")
+        sorted_times = times[order]
+        last = len(sorted_times) - 1
+        
+        # First timestamp at or after each target, and the first row holding
+        # the timestamp just before it
+        after = np.searchsorted(sorted_times, targets, side="left")
+        before = np.searchsorted(sorted_times, sorted_times[np.maximum(after - 1, 0)], side="left")
+        after_clipped = np.minimum(after, last)
+        
+        before_distance = np.where(after > 0, targets - sorted_times[before], np.inf)
+        after_distance = np.where(after <= last, sorted_times[after_clipped] - targets, np.inf)
+        before_row = order[before]
+        after_row = order[after_clipped]
+        
+        use_after = (after_distance < before_distance) | (
+            (after_distance == before_distance) & (after_row < before_row)
+        )
+        return values[np.where(use_after, after_row, before_row)]
+
 # Example usage
 if __name__ == "__main__":
     fetcher = HistoricalDataFetcher()
@@ -15,8 +15,7 @@ import datetime
 import random
 from typing import Dict, List, Any, Tuple, Optional
 import pymongo
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from backend.bot.mongo_manager import get_connection, release_connection
 
 # Configure logging
 logging.basicConfig(
@@ -43,6 +42,7 @@ class ImprovedTradeSelection:
         self.token_pair_success_rates = {}
         self.dex_combination_success_rates = {}
         self.profitable_thresholds = {}
+        self.mongodb_connection = None
         self.mongodb_client = None
         self.mongodb_db = None
         
@@ -152,20 +152,29 @@ class ImprovedTradeSelection:
             return
         
         try:
-            # Connect to MongoDB
-            self.mongodb_client = MongoClient(self.config["mongodb_uri"], serverSelectionTimeoutMS=5000)
-            # Check if connection is successful
-            self.mongodb_client.admin.command('ping')
+            # Share the process-wide pooled client for this URI
+            connection = get_connection(self.config["mongodb_uri"])
+            self.mongodb_connection = connection
+            self.mongodb_client = connection.client
             self.mongodb_db = self.mongodb_client[self.config["mongodb_db"]]
-            logger.info(f"Connected to MongoDB: {self.config['mongodb_uri']}")
-        except ConnectionFailure as e:
-            logger.error(f"MongoDB connection failed: {e}")
-            self.mongodb_client = None
-            self.mongodb_db = None
+            if connection.wait_until_healthy(5.0):
+                logger.info(f"Connected to MongoDB: {self.config['mongodb_uri']}")
+            else:
+                # Keep the client; it reconnects in the background
+                logger.error(f"MongoDB connection failed: {connection.health()['last_error']}")
         except Exception as e:
             logger.error(f"Error initializing MongoDB: {e}")
-            self.mongodb_client = None
-            self.mongodb_db = None
+            self.close()
+    
+    def close(self) -> None:
+        """
+        Release the shared MongoDB connection.
+        """
+        if self.mongodb_connection is not None:
+            release_connection(self.mongodb_connection)
+            self.mongodb_connection = None
+        self.mongodb_client = None
+        self.mongodb_db = None
     
     def _load_historical_data(self) -> List[Dict[str, Any]]:
         """
@@ -175,7 +184,7 @@ class ImprovedTradeSelection:
             List of historical trades
         """
         # Try to load from MongoDB first if enabled
-        if self.config["mongodb_enabled"] and self.mongodb_db:
+        if self.config["mongodb_enabled"] and self.mongodb_db is not None:
             try:
                 collection = self.mongodb_db[self.config["mongodb_collection"]]
                 trades = list(collection.find({}, {'_id': 0}))
@@ -271,6 +271,10 @@ class MLTrainingPipeline:
         """
         Prepare sequence data for LSTM models.
         
+        The sequences are a strided view over the feature rows rather than
+        copies, so they take no more memory than the features themselves.
+        The view is read-only; copy it before modifying it in place.
+        
         Args:
             features_df: DataFrame of scaled features
             targets_df: DataFrame of scaled targets
@@ -279,17 +283,119 @@ class MLTrainingPipeline:
         Returns:
             Tuple of (X_sequences, y_sequences)
         """
-        X = features_df.values
-        y = targets_df.values
+        return self._sequence_windows(features_df.values, targets_df.values, sequence_length)
+    
+    @staticmethod
+    def _sequence_windows(X: np.ndarray, y: np.ndarray, sequence_length: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        View rows X[i:i+sequence_length] paired with target y[i+sequence_length].
+        
+        Args:
+            X: Feature rows (an in-memory or memory-mapped array)
+            y: Target rows aligned with X
+            sequence_length: Length of sequences
+            
+        Returns:
+            Tuple of (windows of shape (n, sequence_length, n_features), targets)
+        """
+        count = max(len(X) - sequence_length, 0)
+        if count == 0:
+            return np.empty((0, sequence_length) + X.shape[1:], dtype=X.dtype), y[:0]
+        
+        # sliding_window_view puts the window axis last; move it next to the sample axis
+        windows = np.lib.stride_tricks.sliding_window_view(X, sequence_length, axis=0)
+        windows = np.moveaxis(windows, -1, 1)
+        return windows[:count], y[sequence_length:]
+    
+    def save_sequence_data(self, features_df: pd.DataFrame, targets_df: pd.DataFrame,
+                           name: str) -> Tuple[str, str]:
+        """
+        Save scaled features and targets as .npy files for streamed training.
         
-        X_sequences = []
-        y_sequences = []
+        Args:
+            features_df: DataFrame of scaled features
+            targets_df: DataFrame (or Series) of scaled targets
+            name: Name of the dataset directory under data_dir/sequences
+            
+        Returns:
+            Tuple of (features file path, targets file path)
+        """
+        output_dir = self.data_dir / "sequences" / name
+        output_dir.mkdir(parents=True, exist_ok=True)
         
-        for i in range(len(X) - sequence_length):
-            X_sequences.append(X[i:i+sequence_length])
-            y_sequences.append(y[i+sequence_length])
+        features_path = output_dir / "features.npy"
+        targets_path = output_dir / "targets.npy"
+        np.save(features_path, np.ascontiguousarray(features_df.values, dtype=np.float32))
+        np.save(targets_path, np.ascontiguousarray(targets_df.values, dtype=np.float32))
         
-        return np.array(X_sequences), np.array(y_sequences)
+        logger.info(f"Saved {len(features_df)} rows of sequence data to {output_dir}")
+        return str(features_path), str(targets_path)
+    
+    def iter_sequence_batches(self, features_path: str, targets_path: str, sequence_length: int,
+                              batch_size: int = 32, start: int = 0, stop: Optional[int] = None,
+                              shuffle: bool = False, seed: Optional[int] = None):
+        """
+        Build a generator function that streams sequence batches from .npy files.
+        
+        The files are memory-mapped, so only the rows of the batch being
+        built are read and at most one batch of windows is materialized at a
+        time; datasets larger than RAM can be trained on.
+        
+        Args:
+            features_path: Features file written by save_sequence_data
+            targets_path: Targets file written by save_sequence_data
+            sequence_length: Length of sequences
+            batch_size: Number of sequences per batch
+            start: Index of the first sequence to use
+            stop: Index after the last sequence to use (defaults to all)
+            shuffle: Shuffle sequences on every pass
+            seed: Seed for the shuffle order
+            
+        Returns:
+            A function returning a fresh iterator of (X_batch, y_batch) per pass
+        """
+        rng = np.random.default_rng(seed)
+        
+        def generate():
+            X = np.load(features_path, mmap_mode="r")
+            y = np.load(targets_path, mmap_mode="r")
+            windows, targets = self._sequence_windows(X, y, sequence_length)
+            
+            indices = np.arange(start, len(windows) if stop is None else min(stop, len(windows)))
+            if shuffle:
+                rng.shuffle(indices)
+            
+            for offset in range(0, len(indices), batch_size):
+                # Sorted indices keep the reads of a batch sequential within the file
+                batch = np.sort(indices[offset:offset + batch_size])
+                yield np.ascontiguousarray(windows[batch]), np.ascontiguousarray(targets[batch])
+        
+        return generate
+    
+    def make_sequence_dataset(self, features_path: str, targets_path: str, sequence_length: int,
+                              batch_size: int = 32, start: int = 0, stop: Optional[int] = None,
+                              shuffle: bool = False, seed: Optional[int] = None) -> tf.data.Dataset:
+        """
+        Create a tf.data pipeline of sequence batches streamed from .npy files.
+        
+        Arguments are the same as for iter_sequence_batches. Use start and
+        stop to take train and validation sets from consecutive ranges.
+        
+        Returns:
+            A prefetching dataset of (X_batch, y_batch)
+        """
+        X = np.load(features_path, mmap_mode="r")
+        y = np.load(targets_path, mmap_mode="r")
+        
+        dataset = tf.data.Dataset.from_generator(
+            self.iter_sequence_batches(features_path, targets_path, sequence_length,
+                                       batch_size, start, stop, shuffle, seed),
+            output_signature=(
+                tf.TensorSpec(shape=(None, sequence_length) + X.shape[1:], dtype=tf.as_dtype(X.dtype)),
+                tf.TensorSpec(shape=(None,) + y.shape[1:], dtype=tf.as_dtype(y.dtype))
+            )
+        )
+        return dataset.prefetch(tf.data.AUTOTUNE)
     
     def build_opportunity_model(self) -> tf.keras.Model:
         """Build and compile the opportunity detection model"""
@@ -443,6 +549,9 @@ class MLTrainingPipeline:
         """
         Train the opportunity detection model.
         
+        X_train and X_val may also be datasets from make_sequence_dataset,
+        in which case y_train and y_val are not used.
+        
         Args:
             X_train: Training features
             y_train: Training targets
@@ -473,14 +582,24 @@ class MLTrainingPipeline:
         
         # Train model
         logger.info("Training opportunity detection model...")
-        history = self.opportunity_model.fit(
-            X_train, y_train,
-            batch_size=batch_size,
-            epochs=epochs,
-            validation_data=(X_val, y_val) if X_val is not None else None,
-            callbacks=callbacks,
-            verbose=1
-        )
+        if isinstance(X_train, tf.data.Dataset):
+            # Streamed sequences - the datasets already yield (X, y) batches
+            history = self.opportunity_model.fit(
+                X_train,
+                epochs=epochs,
+                validation_data=X_val,
+                callbacks=callbacks,
+                verbose=1
+            )
+        else:
+            history = self.opportunity_model.fit(
+                X_train, y_train,
+                batch_size=batch_size,
+                epochs=epochs,
+                validation_data=(X_val, y_val) if X_val is not None else None,
+                callbacks=callbacks,
+                verbose=1
+            )
         
         # Save model and scalers
         self.opportunity_model.save(str(self.models_dir / "opportunity_model.h5"))
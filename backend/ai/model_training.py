@@ -17,6 +17,8 @@ import logging
 import json
 import os
 import time
+import threading
+from collections import OrderedDict
 from datetime import datetime
 import matplotlib.pyplot as plt
 import pickle
@@ -37,7 +39,17 @@ logger = logging.getLogger(__name__)
 class ModelTrainer:
     """Trains and evaluates machine learning models for arbitrage execution"""
     
-    def __init__(self, models_dir: str = "backend/ai/models"):
+    def __init__(self, models_dir: str = "backend/ai/models", cache_size_mb: float = 512,
+                 predict_batch_size: int = 1024, warm_up: bool = False):
+        """
+        Initialize the model trainer.
+        
+        Args:
+            models_dir: Directory holding trained models and the model registry
+            cache_size_mb: Memory budget of the in-process model cache
+            predict_batch_size: Batch size of the compiled Keras predict function
+            warm_up: Load every registered model into the cache right away
+        """
         self.models_dir = models_dir
         
         # Create models directory if it doesn't exist
@@ -46,8 +58,20 @@ class ModelTrainer:
         # Initialize model registry
         self.model_registry = {}
         
+        # Deserialized models by model_id, least recently used first; each entry
+        # keeps the model file's mtime so a retrained file is reloaded
+        self.cache_size_bytes = int(cache_size_mb * 1024 * 1024)
+        self.predict_batch_size = predict_batch_size
+        self._model_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.RLock()
+        self.cache_stats = {"hits": 0, "misses": 0, "reloads": 0, "evictions": 0}
+        
         # Load existing models if available
         self._load_models()
+        
+        if warm_up:
+            self.warm_up()
     
     def _load_models(self):
         """Load existing models from disk"""
@@ -422,18 +446,15 @@ class ModelTrainer:
             return {"error": f"Model ID {model_id} not found"}
         
         model_info = self.model_registry[model_id]
-        model_path = model_info["model_path"]
         model_type = model_info["model_type"]
         target = model_info["target"]
         
         X_test, y_test = test_data.X, test_data.y
         
-        # Load model based on type
+        # Predict with the cached model
         if model_type in ["xgboost", "lightgbm", "random_forest"]:
-            model = joblib.load(model_path)
-            
             # Make predictions
-            y_pred = model.predict(X_test)
+            y_pred = self.predict(model_id, X_test)
             
             # Calculate metrics
             if target in ["profit", "gas_price"]:
@@ -466,10 +487,8 @@ class ModelTrainer:
                 }
         
         elif model_type == "neural_network":
-            model = load_model(model_path)
-            
             # Make predictions
-            y_pred = model.predict(X_test)
+            y_pred = self.predict(model_id, X_test)
             
             # Calculate metrics
             if target in ["profit", "gas_price"]:
@@ -520,6 +539,9 @@ class ModelTrainer:
         """
         Make predictions using a trained model
         
+        Models are served from the in-process cache; the model file is only
+        deserialized on first use or after it changes on disk.
+        
         Args:
             model_id: ID of the model to use
             features: Feature matrix for prediction
@@ -527,27 +549,143 @@ class ModelTrainer:
         Returns:
             Numpy array with predictions
         """
+        entry = self._get_cached_model(model_id)
+        if entry is None:
+            return np.array([])
+        
+        # Make predictions
+        return entry["predict_fn"](features)
+    
+    def warm_up(self, model_ids: Optional[List[str]] = None):
+        """
+        Load models into the cache ahead of time and trace the Keras predict functions.
+        
+        Args:
+            model_ids: Models to load (defaults to every registered model)
+        """
+        for model_id in model_ids or list(self.model_registry):
+            entry = self._get_cached_model(model_id)
+            if entry is None:
+                continue
+            
+            # Run one prediction so graph tracing doesn't happen on the first real call
+            feature_count = len(self.model_registry[model_id].get("feature_names") or [])
+            if feature_count:
+                try:
+                    entry["predict_fn"](np.zeros((1, feature_count), dtype=np.float32))
+                except Exception as e:
+                    logger.warning(f"Warm-up prediction for model {model_id} failed: {e}")
+        
+        logger.info(f"Warmed up {len(self._model_cache)} models "
+                    f"({self._cache_bytes / (1024 * 1024):.1f} MB cached)")
+    
+    def clear_model_cache(self):
+        """Drop every cached model"""
+        with self._cache_lock:
+            self._model_cache.clear()
+            self._cache_bytes = 0
+    
+    def get_cache_stats(self) -> Dict:
+        """
+        Get model cache statistics
+        
+        Returns:
+            Dictionary with hit/miss/reload/eviction counts and memory usage
+        """
+        with self._cache_lock:
+            return {
+                **self.cache_stats,
+                "cached_models": len(self._model_cache),
+                "cache_bytes": self._cache_bytes,
+                "cache_size_bytes": self.cache_size_bytes
+            }
+    
+    def _get_cached_model(self, model_id: str) -> Optional[Dict]:
+        """Get a model's cache entry, loading it if missing or changed on disk"""
         if model_id not in self.model_registry:
             logger.error(f"Model ID {model_id} not found in registry")
-            return np.array([])
+            return None
         
         model_info = self.model_registry[model_id]
         model_path = model_info["model_path"]
         model_type = model_info["model_type"]
         
-        # Load model based on type
-        if model_type in ["xgboost", "lightgbm", "random_forest"]:
-            model = joblib.load(model_path)
-        elif model_type == "neural_network":
-            model = load_model(model_path)
-        else:
-            logger.error(f"Unsupported model type: {model_type}")
-            return np.array([])
+        try:
+            mtime = os.path.getmtime(model_path)
+        except OSError as e:
+            logger.error(f"Model file for {model_id} not available: {e}")
+            return None
         
-        # Make predictions
-        predictions = model.predict(features)
+        with self._cache_lock:
+            entry = self._model_cache.get(model_id)
+            if entry is not None and entry["mtime"] == mtime:
+                self._model_cache.move_to_end(model_id)
+                self.cache_stats["hits"] += 1
+                return entry
+            
+            if entry is not None:
+                self.cache_stats["reloads"] += 1
+                self._evict(model_id)
+            else:
+                self.cache_stats["misses"] += 1
+            
+            # Load model based on type
+            if model_type in ["xgboost", "lightgbm", "random_forest"]:
+                model = joblib.load(model_path)
+                predict_fn = model.predict
+                size = os.path.getsize(model_path)
+            elif model_type == "neural_network":
+                model = load_model(model_path)
+                predict_fn = self._compile_keras_predict(model)
+                size = max(os.path.getsize(model_path), model.count_params() * 4)
+            else:
+                logger.error(f"Unsupported model type: {model_type}")
+                return None
+            
+            entry = {"model": model, "predict_fn": predict_fn, "mtime": mtime, "size": size}
+            self._model_cache[model_id] = entry
+            self._cache_bytes += size
+            
+            # Evict least recently used models until the cache fits its budget
+            while self._cache_bytes > self.cache_size_bytes and len(self._model_cache) > 1:
+                oldest_id = next(iter(self._model_cache))
+                self._evict(oldest_id)
+                self.cache_stats["evictions"] += 1
+                logger.info(f"Evicted model {oldest_id} from cache")
+            
+            logger.info(f"Loaded model {model_id} into cache ({size / 1024:.1f} KB)")
+            return entry
+    
+    def _evict(self, model_id: str):
+        """Remove a model from the cache"""
+        entry = self._model_cache.pop(model_id, None)
+        if entry is not None:
+            self._cache_bytes -= entry["size"]
+    
+    def _compile_keras_predict(self, model: Model):
+        """
+        Build a batched predict function around a compiled inference graph.
+        
+        Calling the traced graph directly avoids the per-call setup of
+        Model.predict, which dominates for the small batches used per
+        opportunity.
+        """
+        @tf.function(reduce_retracing=True)
+        def infer(batch):
+            return model(batch, training=False)
+        
+        batch_size = self.predict_batch_size
+        
+        def predict_fn(features: np.ndarray) -> np.ndarray:
+            features = np.asarray(features, dtype=np.float32)
+            if len(features) <= batch_size:
+                return infer(features).numpy()
+            return np.concatenate([
+                infer(features[start:start + batch_size]).numpy()
+                for start in range(0, len(features), batch_size)
+            ])
         
-        return predictions
+        return predict_fn
     
     def get_best_model(self, target: str) -> str:
         """
@@ -203,6 +203,7 @@ class NetworkAdaptation:
         self.network_selector_model_id = self.model_trainer.get_best_model("network")
         
         if self.network_selector_model_id:
+            self.model_trainer.warm_up([self.network_selector_model_id])
             logger.info(f"Loaded best network selector model: {self.network_selector_model_id}")
         else:
             logger.warning("No network selector model found")
@@ -17,6 +17,10 @@ from datetime import datetime, timedelta
 import requests
 import json
 import os
+from backend.bot.amm_math import (
+    get_amount_out_v2, get_d_stable, get_y_stable,
+    max_amount_for_impact, max_amount_for_impact_v2, price_impact_v2
+)
 
 # Configure logging
 logging.basicConfig(
@@ -404,41 +408,42 @@ class OrderbookAnalyzer:
                 "pool_address": pool_address
             }
         
-        # Start with a conservative estimate
-        estimated_optimal = liquidity * (max_price_impact / 100) / 2
-        
-        # Test a range around the estimate
-        test_amounts = [
-            estimated_optimal * 0.5,
-            estimated_optimal * 0.75,
-            estimated_optimal,
-            estimated_optimal * 1.25,
-            estimated_optimal * 1.5
-        ]
+        # Expected output grows with size, so the optimum is the largest trade
+        # within the impact limit. Solve it on the pool's AMM curve instead of
+        # re-querying the pool at trial sizes.
+        fee = initial_analysis.get("fee_percent", 0.3) / 100
+        max_impact = max_price_impact / 100
         
-        # Analyze each test amount
-        results = []
-        for amount in test_amounts:
-            analysis = self.analyze_pool(dex, pool_address, token_in, token_out, amount)
-            impact = analysis.get("price_impact_percent", 100)
+        if initial_analysis.get("is_stable_pool", False):
+            balances = [liquidity / 2, liquidity / 2]
+            amp = self.config.get("stable_pool_amp", 100)
+            d = get_d_stable(balances, amp)
             
-            if impact <= max_price_impact:
-                results.append({
-                    "amount_in": amount,
-                    "expected_output": analysis.get("expected_output", 0),
-                    "price_impact_percent": impact
-                })
-        
-        if not results:
+            def amount_out(amount: float) -> float:
+                return (balances[1] - get_y_stable(0, 1, balances[0] + amount, balances, amp, d)) * (1 - fee)
+            
+            optimal_amount = max_amount_for_impact(amount_out, max_impact, liquidity)
+            expected_output = amount_out(optimal_amount)
+            spot_rate = amount_out(1e-9 * liquidity) / (1e-9 * liquidity)
+            impact = 1 - (expected_output / optimal_amount) / spot_rate if optimal_amount > 0 else 0.0
+        else:
+            reserve = liquidity / 2
+            optimal_amount = max_amount_for_impact_v2(max_impact, reserve, fee)
+            expected_output = get_amount_out_v2(optimal_amount, reserve, reserve, fee)
+            impact = price_impact_v2(optimal_amount, reserve, fee)
+        
+        if optimal_amount <= 0:
             return {
                 "error": f"Could not find a trade size with impact below {max_price_impact}%",
                 "dex": dex,
-                "pool_address": pool_address,
-                "max_tested_amount": max(test_amounts)
+                "pool_address": pool_address
             }
         
-        # Find the amount with the highest expected output
-        optimal = max(results, key=lambda x: x["expected_output"])
+        optimal = {
+            "amount_in": optimal_amount,
+            "expected_output": expected_output,
+            "price_impact_percent": impact * 100
+        }
         
         return {
             "dex": dex,
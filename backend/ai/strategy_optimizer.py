@@ -32,6 +32,7 @@ import argparse
 
 # Import Web3 connector for real blockchain data
 from backend.ai.web3_connector import Web3Connector
+from backend.ai.dataset_store import load_dataset
 
 # Configure logging
 logging.basicConfig(
@@ -62,6 +63,25 @@ USE_MAINNET_FORK = args.mainnet_fork.lower() == 'true'
 if USE_MAINNET_FORK:
     logger.info("Using MAINNET FORK data for real blockchain interaction")
 
+# Numeric strategy parameters searched by optimize_strategy: (default, lower bound, upper bound)
+PARAMETER_BOUNDS = {
+    "entry_threshold": (0.5, 0.01, 0.99),
+    "exit_threshold": (0.3, 0.01, 0.99),
+    "max_slippage": (0.5, 0.01, 0.99),
+    "gas_price_multiplier": (1.1, 1.0, 2.0),
+    "min_profit_threshold": (0.2, 0.01, 1.0),
+    "max_trade_size": (10.0, 0.1, 100.0),
+    "time_window": (60, 10, 300),
+    "risk_tolerance": (0.5, 0.01, 0.99)
+}
+
+# Parameters that affect strategy evaluation; these are always searched
+EVALUATED_PARAMETERS = ["entry_threshold", "exit_threshold", "max_slippage",
+                        "gas_price_multiplier", "min_profit_threshold"]
+
+# Upper bound on candidates x opportunities evaluated in one broadcast
+EVALUATION_CHUNK_SIZE = 1 << 20
+
 @dataclass
 class Strategy:
     """Data class to represent a trading strategy with its parameters and performance metrics."""
@@ -395,18 +415,26 @@ class StrategyOptimizer:
         except Exception as e:
             logger.error(f"Error saving strategies: {e}")
     
-    def load_historical_data(self, file_path: str) -> pd.DataFrame:
+    def load_historical_data(self, file_path: str,
+                             start_time: Optional[datetime] = None,
+                             end_time: Optional[datetime] = None) -> pd.DataFrame:
         """
         Load historical arbitrage data for strategy optimization.
         
         Args:
-            file_path: Path to the CSV file containing historical data
+            file_path: Path to the CSV file, Parquet file or partitioned
+                Parquet dataset directory containing historical data
+            start_time: Earliest record to load from a Parquet dataset
+            end_time: Latest record to load from a Parquet dataset
             
         Returns:
             DataFrame containing historical data
         """
         try:
-            df = pd.read_csv(file_path)
+            if os.path.isdir(file_path) or file_path.endswith(".parquet"):
+                df = load_dataset(file_path, start_time, end_time)
+            else:
+                df = pd.read_csv(file_path)
             logger.info(f"Loaded historical data from {file_path}: {len(df)} records")
             return df
         except Exception as e:
@@ -470,46 +498,187 @@ class StrategyOptimizer:
                          historical_data: pd.DataFrame,
                          optimization_metric: str = "profit",
                          risk_tolerance: float = 0.5,
-                         n_iterations: int = 100) -> OptimizationResult:
+                         n_iterations: int = 100,
+                         population_size: int = 50,
+                         patience: int = 10,
+                         checkpoint_path: Optional[str] = None,
+                         seed: Optional[int] = None) -> OptimizationResult:
         """
         Optimize trading strategy parameters based on historical data.
         
+        Runs a differential evolution search (DE/rand/1/bin) over the numeric
+        strategy parameters. Each generation of candidates is evaluated at
+        once with _evaluate_population. All candidates share the same
+        slippage draws, so they are compared on equal terms. The search
+        stops early when the best strategy has not improved for `patience`
+        generations.
+        
         Args:
             historical_data: DataFrame containing historical arbitrage data
             optimization_metric: Metric to optimize for (profit, win_rate, sharpe)
             risk_tolerance: Risk tolerance level (0-1)
-            n_iterations: Number of optimization iterations
+            n_iterations: Maximum number of generations
+            population_size: Number of candidate strategies per generation
+            patience: Generations without improvement before stopping
+            checkpoint_path: JSON file to save the search state to after every
+                generation; an existing checkpoint for the same search is resumed
+            seed: Seed for the search (random if None)
             
         Returns:
-            OptimizationResult containing the best strategy and optimization metrics
+            OptimizationResult containing the best strategy and optimization
+            metrics; all_strategies holds the candidates evaluated by this call
         """
-        logger.info(f"Starting strategy optimization with {n_iterations} iterations")
+        logger.info(f"Starting strategy optimization with up to {n_iterations} generations "
+                    f"of {population_size} candidates")
         start_time = datetime.now()
+        population_size = max(population_size, 4)
+        
+        base_strategy = self._get_best_strategy()
+        names = [name for name in PARAMETER_BOUNDS
+                 if name in EVALUATED_PARAMETERS or name in base_strategy.parameters]
+        lower = np.array([PARAMETER_BOUNDS[name][1] for name in names], dtype=float)
+        upper = np.array([PARAMETER_BOUNDS[name][2] for name in names], dtype=float)
+        
+        def to_parameters(population: np.ndarray) -> Dict[str, np.ndarray]:
+            values = lower + population * (upper - lower)
+            return {name: values[:, i] for i, name in enumerate(names)}
+        
+        def to_strategies(population: np.ndarray, metrics: Dict[str, np.ndarray], generation: int) -> List[Strategy]:
+            values = (lower + population * (upper - lower)).tolist()
+            return [
+                Strategy(
+                    id=str(uuid.uuid4()),
+                    name=f"variant_of_{base_strategy.name}_gen{generation}",
+                    parameters={**base_strategy.parameters, **dict(zip(names, row))},
+                    performance=performance
+                )
+                for row, performance in zip(values, self._metric_rows(metrics))
+            ]
+        
+        search = {
+            "optimization_metric": optimization_metric,
+            "risk_tolerance": risk_tolerance,
+            "population_size": population_size,
+            "parameter_names": names,
+            "total_opportunities": len(historical_data)
+        }
         
-        # Initialize list to store all evaluated strategies
-        evaluated_strategies = []
+        def save_checkpoint():
+            if not checkpoint_path:
+                return
+            self._save_optimization_checkpoint(checkpoint_path, dict(
+                search,
+                generation=generation,
+                stale_generations=stale_generations,
+                evaluations=evaluations,
+                history=history,
+                slippage_seed=slippage_seed,
+                rng_state=rng.bit_generator.state,
+                population=population.tolist(),
+                population_metrics={key: values.tolist() for key, values in population_metrics.items()},
+                best_strategy={
+                    "id": best_strategy.id,
+                    "name": best_strategy.name,
+                    "parameters": best_strategy.parameters,
+                    "performance": best_strategy.performance
+                }
+            ))
         
-        # Start with the best existing strategy as a baseline
-        best_strategy = self._get_best_strategy()
-        best_performance = self._evaluate_strategy(best_strategy, historical_data)
-        best_strategy.performance = best_performance
-        evaluated_strategies.append(best_strategy)
+        state = self._load_optimization_checkpoint(checkpoint_path, search)
+        evaluated_strategies = []
         
-        # Optimization loop
-        for i in range(n_iterations):
-            # Generate a new strategy with random variations
-            new_strategy = self._generate_strategy_variation(best_strategy, i/n_iterations)
+        if state is not None:
+            rng = np.random.default_rng()
+            rng.bit_generator.state = state["rng_state"]
+            population = np.array(state["population"], dtype=float)
+            population_metrics = {key: np.array(values) for key, values in state["population_metrics"].items()}
+            best_strategy = Strategy(
+                id=state["best_strategy"]["id"],
+                name=state["best_strategy"]["name"],
+                parameters=state["best_strategy"]["parameters"],
+                performance=state["best_strategy"]["performance"]
+            )
+            generation = state["generation"]
+            stale_generations = state["stale_generations"]
+            evaluations = state["evaluations"]
+            history = state["history"]
+            slippage_seed = state["slippage_seed"]
+            slippage_draws = np.random.default_rng(slippage_seed).random(len(historical_data))
+            logger.info(f"Resumed optimization from {checkpoint_path} at generation {generation}")
+        else:
+            rng = np.random.default_rng(seed)
+            slippage_seed = int(rng.integers(2**63))
+            slippage_draws = np.random.default_rng(slippage_seed).random(len(historical_data))
+            
+            # Seed the population with the best existing strategy
+            base_values = np.array([base_strategy.parameters.get(name, PARAMETER_BOUNDS[name][0]) for name in names],
+                                   dtype=float)
+            population = rng.random((population_size, len(names)))
+            population[0] = np.clip((base_values - lower) / (upper - lower), 0, 1)
+            
+            population_metrics = self._evaluate_population(to_parameters(population), historical_data, slippage_draws)
+            evaluated_strategies.extend(to_strategies(population, population_metrics, 0))
+            best_strategy = self._select_best_strategy(evaluated_strategies, optimization_metric, risk_tolerance)
+            generation = 0
+            stale_generations = 0
+            evaluations = population_size
+            history = [best_strategy.performance.get(optimization_metric, 0)]
+            save_checkpoint()
+        
+        higher_is_better = optimization_metric != "max_drawdown"
+        dimensions = len(names)
+        rows = np.arange(population_size)
+        stopped_early = False
+        
+        while generation < n_iterations:
+            if stale_generations >= patience:
+                stopped_early = True
+                logger.info(f"No improvement for {patience} generations, stopping at generation {generation}")
+                break
+            generation += 1
+            
+            # Mutation: three distinct partners per candidate, none of them the candidate itself
+            partners = np.argsort(rng.random((population_size, population_size - 1)), axis=1)[:, :3]
+            partners += partners >= rows[:, None]
+            scale = rng.uniform(0.5, 1.0, (population_size, 1))
+            mutants = population[partners[:, 0]] + scale * (population[partners[:, 1]] - population[partners[:, 2]])
+            
+            # Binomial crossover, keeping at least one mutated parameter per candidate
+            crossover = rng.random((population_size, dimensions)) < 0.9
+            crossover[rows, rng.integers(dimensions, size=population_size)] = True
+            trials = np.clip(np.where(crossover, mutants, population), 0, 1)
             
-            # Evaluate the new strategy
-            performance = self._evaluate_strategy(new_strategy, historical_data)
-            new_strategy.performance = performance
-            evaluated_strategies.append(new_strategy)
+            trial_metrics = self._evaluate_population(to_parameters(trials), historical_data, slippage_draws)
+            trial_strategies = to_strategies(trials, trial_metrics, generation)
+            evaluated_strategies.extend(trial_strategies)
+            evaluations += population_size
             
-            # Update best strategy if this one is better
-            if self._is_better_strategy(new_strategy, best_strategy, optimization_metric, risk_tolerance):
-                best_strategy = new_strategy
-                best_performance = performance
-                logger.info(f"Iteration {i+1}/{n_iterations}: Found better strategy with {optimization_metric}={best_performance.get(optimization_metric, 0):.4f}")
+            # Selection: each trial replaces its parent if it is better
+            replace = self._is_better_population(trial_metrics, population_metrics, optimization_metric, risk_tolerance)
+            population[replace] = trials[replace]
+            for key in population_metrics:
+                population_metrics[key] = np.where(replace, trial_metrics[key], population_metrics[key])
+            
+            # Update best strategy if a trial beats it
+            best_metrics = {key: np.array([value]) for key, value in best_strategy.performance.items()}
+            better = np.nonzero(self._is_better_population(trial_metrics, best_metrics,
+                                                           optimization_metric, risk_tolerance))[0]
+            previous_value = best_strategy.performance.get(optimization_metric, 0)
+            if len(better) > 0:
+                values = trial_metrics.get(optimization_metric, np.zeros(population_size))[better]
+                best_strategy = trial_strategies[better[np.argmax(values) if higher_is_better else np.argmin(values)]]
+            
+            best_value = best_strategy.performance.get(optimization_metric, 0)
+            improvement = best_value - previous_value if higher_is_better else previous_value - best_value
+            if improvement > 1e-9 * max(1.0, abs(previous_value)):
+                stale_generations = 0
+                logger.info(f"Generation {generation}/{n_iterations}: Found better strategy with "
+                            f"{optimization_metric}={best_value:.4f}")
+            else:
+                stale_generations += 1
+            history.append(best_value)
+            
+            save_checkpoint()
         
         # Calculate optimization time
         optimization_time = (datetime.now() - start_time).total_seconds()
@@ -519,10 +688,14 @@ class StrategyOptimizer:
             best_strategy=best_strategy,
             all_strategies=evaluated_strategies,
             optimization_metrics={
-                "iterations": n_iterations,
+                "iterations": generation,
+                "evaluations": evaluations,
+                "population_size": population_size,
+                "stopped_early": stopped_early,
                 "optimization_metric": optimization_metric,
                 "risk_tolerance": risk_tolerance,
-                "best_performance": best_performance
+                "best_performance": best_strategy.performance,
+                "history": history
             },
             optimization_time=optimization_time
         )
@@ -532,9 +705,56 @@ class StrategyOptimizer:
             self.strategies.append(best_strategy)
             self._save_strategies()
         
-        logger.info(f"Strategy optimization completed in {optimization_time:.2f} seconds")
+        logger.info(f"Strategy optimization completed in {optimization_time:.2f} seconds "
+                    f"({evaluations} strategies over {generation} generations)")
         return result
     
+    def _select_best_strategy(self, strategies: List[Strategy], metric: str, risk_tolerance: float) -> Strategy:
+        """Pick the best of a list of evaluated strategies."""
+        best = strategies[0]
+        for strategy in strategies[1:]:
+            if self._is_better_strategy(strategy, best, metric, risk_tolerance):
+                best = strategy
+        return best
+    
+    def _load_optimization_checkpoint(self, checkpoint_path: Optional[str], search: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Load a checkpoint written by optimize_strategy.
+        
+        Args:
+            checkpoint_path: Path to the checkpoint file
+            search: Settings of the current search
+            
+        Returns:
+            The saved search state, or None if there is no checkpoint for
+            the same search settings
+        """
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return None
+        
+        try:
+            with open(checkpoint_path, 'r') as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading optimization checkpoint: {e}")
+            return None
+        
+        if any(state.get(key) != value for key, value in search.items()):
+            logger.warning(f"Ignoring checkpoint {checkpoint_path}: it was saved for different search settings")
+            return None
+        return state
+    
+    def _save_optimization_checkpoint(self, checkpoint_path: str, state: Dict[str, Any]):
+        """Atomically write the search state to the checkpoint file."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+            temp_path = f"{checkpoint_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, checkpoint_path)
+        except Exception as e:
+            logger.error(f"Error saving optimization checkpoint: {e}")
+    
     def _get_best_strategy(self) -> Strategy:
         """Get the best performing strategy from existing strategies."""
         if not self.strategies or len(self.strategies) == 1:
@@ -623,72 +843,120 @@ class StrategyOptimizer:
         Returns:
             Dictionary of performance metrics
         """
-        # Extract strategy parameters
-        params = strategy.parameters
-        entry_threshold = params.get("entry_threshold", 0.5)
-        exit_threshold = params.get("exit_threshold", 0.3)
-        max_slippage = params.get("max_slippage", 0.5)
-        gas_price_multiplier = params.get("gas_price_multiplier", 1.1)
-        min_profit_threshold = params.get("min_profit_threshold", 0.2)
-        
-        # Apply strategy rules to historical data
-        # In a real implementation, this would be a more sophisticated simulation
-        
-        # Calculate adjusted gas cost based on the multiplier
-        adjusted_gas_cost = historical_data['gas_price'] * gas_price_multiplier * 150000 / 1e9 / historical_data['eth_price']
+        parameters = {name: np.array([strategy.parameters[name]], dtype=float)
+                      for name in EVALUATED_PARAMETERS if name in strategy.parameters}
+        slippage_draws = np.random.uniform(0, 1, len(historical_data))
+        metrics = self._evaluate_population(parameters, historical_data, slippage_draws, size=1)
+        return self._metric_rows(metrics)[0]
+    
+    def _evaluate_population(self,
+                             parameters: Dict[str, np.ndarray],
+                             historical_data: pd.DataFrame,
+                             slippage_draws: np.ndarray,
+                             size: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate many strategies on historical data at once.
         
-        # Calculate adjusted profit after slippage
-        adjusted_profit = historical_data['potential_profit'] * (1 - np.random.uniform(0, max_slippage, len(historical_data)))
+        Each metric is computed as a (strategies x opportunities) broadcast.
+        Strategies are processed in chunks to bound memory use.
         
-        # Determine which trades would be executed based on strategy parameters
-        execute_trade = (
-            (adjusted_profit > min_profit_threshold) &  # Profit threshold
-            (historical_data['price_volatility'] < entry_threshold) &  # Entry based on volatility
-            (historical_data['network_congestion'] < 1 - exit_threshold)  # Exit based on congestion
-        )
+        Args:
+            parameters: Parameter arrays with one value per strategy; parameters
+                missing from the mapping take their default value
+            historical_data: DataFrame containing historical data
+            slippage_draws: Uniform [0, 1) draw per opportunity; each strategy
+                loses draw * max_slippage of the potential profit
+            size: Number of strategies (taken from the parameter arrays if omitted)
+            
+        Returns:
+            Dictionary of metric arrays with one value per strategy
+        """
+        if size is None:
+            size = len(next(iter(parameters.values())))
+        
+        def parameter(name: str) -> np.ndarray:
+            values = parameters.get(name, PARAMETER_BOUNDS[name][0])
+            return np.broadcast_to(np.asarray(values, dtype=float), (size,))[:, None]
+        
+        entry_threshold = parameter("entry_threshold")
+        exit_threshold = parameter("exit_threshold")
+        max_slippage = parameter("max_slippage")
+        gas_price_multiplier = parameter("gas_price_multiplier")
+        min_profit_threshold = parameter("min_profit_threshold")
+        
+        n_opportunities = len(historical_data)
+        gas_price = historical_data['gas_price'].to_numpy(dtype=float)
+        eth_price = historical_data['eth_price'].to_numpy(dtype=float)
+        potential_profit = historical_data['potential_profit'].to_numpy(dtype=float)
+        price_volatility = historical_data['price_volatility'].to_numpy(dtype=float)
+        network_congestion = historical_data['network_congestion'].to_numpy(dtype=float)
+        
+        metrics = {
+            "profit": np.zeros(size),
+            "win_rate": np.zeros(size),
+            "avg_profit_per_trade": np.zeros(size),
+            "sharpe_ratio": np.zeros(size),
+            "max_drawdown": np.ones(size),
+            "trade_frequency": np.zeros(size),
+            "trades_executed": np.zeros(size, dtype=int),
+            "total_opportunities": np.full(size, n_opportunities)
+        }
         
-        # Calculate performance metrics
-        if execute_trade.sum() > 0:
-            executed_profits = adjusted_profit[execute_trade] - adjusted_gas_cost[execute_trade]
+        chunk_size = max(1, EVALUATION_CHUNK_SIZE // max(n_opportunities, 1))
+        for start in range(0, size, chunk_size):
+            chunk = slice(start, start + chunk_size)
             
-            total_profit = executed_profits.sum()
-            win_rate = (executed_profits > 0).mean()
-            avg_profit_per_trade = executed_profits.mean()
+            # Calculate adjusted gas cost and profit after slippage
+            adjusted_gas_cost = gas_price * gas_price_multiplier[chunk] * 150000 / 1e9 / eth_price
+            adjusted_profit = potential_profit * (1 - slippage_draws * max_slippage[chunk])
             
-            # Calculate Sharpe ratio (risk-adjusted return)
-            if executed_profits.std() > 0:
-                sharpe_ratio = executed_profits.mean() / executed_profits.std() * np.sqrt(252)  # Annualized
-            else:
-                sharpe_ratio = 0
-                
-            # Calculate max drawdown
-            cumulative_returns = (1 + executed_profits).cumprod()
-            max_drawdown = 1 - (cumulative_returns / cumulative_returns.cummax()).min()
+            # Determine which trades would be executed based on strategy parameters
+            execute_trade = (
+                (adjusted_profit > min_profit_threshold[chunk]) &  # Profit threshold
+                (price_volatility < entry_threshold[chunk]) &  # Entry based on volatility
+                (network_congestion < 1 - exit_threshold[chunk])  # Exit based on congestion
+            )
+            trades = execute_trade.sum(axis=1)
+            executed = trades > 0
+            if not executed.any():
+                continue
             
-            # Calculate trade frequency
-            trade_frequency = execute_trade.sum() / len(historical_data)
-
-            return {
-                "profit": total_profit,
-                "win_rate": win_rate,
-                "avg_profit_per_trade": avg_profit_per_trade,
-                "sharpe_ratio": sharpe_ratio,
-                "max_drawdown": max_drawdown,
-                "trade_frequency": trade_frequency,
-                "trades_executed": execute_trade.sum(),
-                "total_opportunities": len(historical_data)
-            }
-        else:
-            return {
-                "profit": 0,
-                "win_rate": 0,
-                "avg_profit_per_trade": 0,
-                "sharpe_ratio": 0,
-                "max_drawdown": 1,
-                "trade_frequency": 0,
-                "trades_executed": 0,
-                "total_opportunities": len(historical_data)
-            }
+            # Restrict to strategies that executed at least one trade
+            execute_trade = execute_trade[executed]
+            trades = trades[executed]
+            executed_profits = np.where(execute_trade, adjusted_profit[executed] - adjusted_gas_cost[executed], 0.0)
+            
+            total_profit = executed_profits.sum(axis=1)
+            avg_profit = total_profit / trades
+            win_rate = (executed_profits > 0).sum(axis=1) / trades
+            
+            # Calculate Sharpe ratio (sample standard deviation, annualized)
+            squared_deviations = np.where(execute_trade, (executed_profits - avg_profit[:, None]) ** 2, 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                std = np.sqrt(squared_deviations.sum(axis=1) / (trades - 1))
+                sharpe_ratio = np.where(std > 0, avg_profit / std * np.sqrt(252), 0.0)
+            
+                # Calculate max drawdown over the executed trades
+                cumulative_returns = np.cumprod(np.where(execute_trade, 1 + executed_profits, 1.0), axis=1)
+                drawdown_ratio = cumulative_returns / np.maximum.accumulate(cumulative_returns, axis=1)
+            max_drawdown = 1 - np.fmin.reduce(drawdown_ratio, axis=1)
+            
+            indices = np.arange(size)[chunk][executed]
+            metrics["profit"][indices] = total_profit
+            metrics["win_rate"][indices] = win_rate
+            metrics["avg_profit_per_trade"][indices] = avg_profit
+            metrics["sharpe_ratio"][indices] = sharpe_ratio
+            metrics["max_drawdown"][indices] = max_drawdown
+            metrics["trade_frequency"][indices] = trades / n_opportunities
+            metrics["trades_executed"][indices] = trades
+        
+        return metrics
+    
+    @staticmethod
+    def _metric_rows(metrics: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+        """Split metric arrays into one performance dictionary per strategy."""
+        columns = {key: values.tolist() for key, values in metrics.items()}
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
     
     def _is_better_strategy(self, 
                            strategy1: Strategy, 
@@ -733,6 +1001,49 @@ class StrategyOptimizer:
         # Default comparison
         return metric1 > metric2
     
+    def _is_better_population(self,
+                              metrics1: Dict[str, np.ndarray],
+                              metrics2: Dict[str, np.ndarray],
+                              metric: str = "profit",
+                              risk_tolerance: float = 0.5) -> np.ndarray:
+        """
+        Vectorized _is_better_strategy over arrays of performance metrics.
+        
+        Args:
+            metrics1: Metric arrays of the first strategies
+            metrics2: Metric arrays of the strategies to compare against
+                (same length, or length 1 to compare against one strategy)
+            metric: Metric to use for comparison
+            risk_tolerance: Risk tolerance level (0-1)
+            
+        Returns:
+            Boolean array, True where the first strategy is better
+        """
+        size = max(len(values) for values in metrics1.values())
+        
+        def values(metrics: Dict[str, np.ndarray], key: str, default: float) -> np.ndarray:
+            return np.asarray(metrics.get(key, np.full(size, default)), dtype=float)
+        
+        metric1 = values(metrics1, metric, 0)
+        metric2 = values(metrics2, metric, 0)
+        
+        # If optimizing for profit or Sharpe ratio, higher is better
+        if metric in ["profit", "sharpe_ratio", "win_rate"]:
+            # If metrics are very close, consider risk
+            close = np.abs(metric1 - metric2) / np.maximum(np.abs(metric2), 1e-10) < 0.05
+            if risk_tolerance < 0.5:
+                tie_break = values(metrics1, "max_drawdown", 1) < values(metrics2, "max_drawdown", 1)
+            else:
+                tie_break = values(metrics1, "trade_frequency", 0) > values(metrics2, "trade_frequency", 0)
+            return np.where(close, tie_break, metric1 > metric2)
+        
+        # If optimizing for drawdown, lower is better
+        elif metric == "max_drawdown":
+            return metric1 < metric2
+        
+        # Default comparison
+        return metric1 > metric2
+    
     def get_best_strategy_for_market(self, 
                                     market_conditions: Dict[str, Any],
                                     optimization_metric: str = "profit") -> Strategy:
@@ -0,0 +1,287 @@
+"""
+Subgraph Fetcher Module for ArbitrageX
+
+This module pulls every entity in a time range from The Graph style GraphQL
+endpoints. Each time range is split into chunks that are fetched concurrently
+over one shared HTTP session; each chunk is paged with a timestamp/id cursor,
+failed requests are retried with exponential backoff, and progress is
+checkpointed to disk so an interrupted pull resumes where it stopped.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("SubgraphFetcher")
+
+# HTTP statuses worth retrying; any other error status fails the request
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class SubgraphFetcher:
+    """
+    Concurrent, resumable fetcher for timestamped subgraph entities.
+
+    Entities are paged in ascending timestamp order. When a page ends
+    partway through a second, the rows of that second are dropped and
+    refetched by the next page. A second with more rows than fit in one page
+    is drained in id order, so no entity is skipped or repeated.
+    """
+
+    def __init__(self, checkpoint_dir: str, max_workers: int = 8, page_size: int = 1000,
+                 chunk_seconds: int = 86400, max_retries: int = 5, backoff_factor: float = 0.5,
+                 timeout: float = 30.0):
+        """
+        Initialize the subgraph fetcher.
+
+        Args:
+            checkpoint_dir: Directory for progress checkpoints and fetched pages
+            max_workers: Maximum number of concurrent requests
+            page_size: Entities per request (The Graph allows up to 1000)
+            chunk_seconds: Length of the time ranges fetched in parallel
+            max_retries: Retries per request before a chunk fails
+            backoff_factor: Base delay in seconds, doubled on every retry
+            timeout: Request timeout in seconds
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.chunk_seconds = chunk_seconds
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._checkpoint_lock = threading.Lock()
+
+    def fetch(self, tasks: List[Dict]) -> Dict[str, Optional[List[Dict]]]:
+        """
+        Fetch all entities of several tasks, sharing one worker pool.
+
+        Each task is a dictionary with:
+            key: Unique name of the task (used for checkpoint files)
+            url: GraphQL endpoint
+            entity: Entity collection to query (e.g., "swaps")
+            fields: GraphQL selection set of the entity
+            start: First timestamp to fetch (inclusive)
+            end: Last timestamp to fetch (inclusive)
+
+        Args:
+            tasks: Tasks to fetch
+
+        Returns:
+            Dictionary of task key to its raw entities, or to None if part of
+            the task failed (its progress is kept so a rerun resumes it)
+        """
+        plans = {task["key"]: self._load_checkpoint(task) for task in tasks}
+        failed = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._fetch_chunk, task, plans[task["key"]], chunk): task["key"]
+                for task in tasks
+                for chunk, state in plans[task["key"]]["chunks"].items()
+                if not state["done"]
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching {key}: {e}")
+                    failed.add(key)
+
+        results = {}
+        for task in tasks:
+            key = task["key"]
+            if key in failed:
+                logger.warning(f"Fetch of {key} incomplete; rerun to resume from the checkpoint")
+                results[key] = None
+                continue
+            results[key] = self._read_rows(task)
+            self._clear_checkpoint(task)
+        return results
+
+    def _task_path(self, task: Dict, suffix: str) -> Path:
+        """Path of a task's checkpoint file with the given suffix"""
+        return self.checkpoint_dir / f"{task['key']}_{task['start']}_{task['end']}{suffix}"
+
+    def _chunk_path(self, task: Dict, chunk: str) -> Path:
+        """Path of the file holding the rows fetched for one chunk"""
+        return self._task_path(task, f"_{chunk}.jsonl")
+
+    def _load_checkpoint(self, task: Dict) -> Dict:
+        """Load a task's progress, or split its range into fresh chunks"""
+        path = self._task_path(task, ".json")
+        if path.exists():
+            with open(path, "r") as f:
+                plan = json.load(f)
+            remaining = sum(1 for state in plan["chunks"].values() if not state["done"])
+            logger.info(f"Resuming {task['key']}: {remaining} of {len(plan['chunks'])} chunks left")
+            return plan
+
+        plan = {"chunks": {}}
+        chunk_start = task["start"]
+        while chunk_start <= task["end"]:
+            chunk_end = min(chunk_start + self.chunk_seconds - 1, task["end"])
+            plan["chunks"][f"{chunk_start}_{chunk_end}"] = {
+                "start": chunk_start,
+                "end": chunk_end,
+                "timestamp": chunk_start,
+                "id": None,
+                "done": False
+            }
+            chunk_start = chunk_end + 1
+
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        for chunk in plan["chunks"]:
+            self._chunk_path(task, chunk).unlink(missing_ok=True)
+        self._save_checkpoint(task, plan)
+        return plan
+
+    def _save_checkpoint(self, task: Dict, plan: Dict):
+        """Write a task's progress atomically"""
+        path = self._task_path(task, ".json")
+        with self._checkpoint_lock:
+            temp_path = path.with_name(path.name + ".tmp")
+            with open(temp_path, "w") as f:
+                json.dump(plan, f)
+            os.replace(temp_path, path)
+
+    def _clear_checkpoint(self, task: Dict):
+        """Remove a completed task's checkpoint and page files"""
+        for path in self.checkpoint_dir.glob(f"{task['key']}_{task['start']}_{task['end']}*"):
+            path.unlink(missing_ok=True)
+
+    def _read_rows(self, task: Dict) -> List[Dict]:
+        """Read every row fetched for a task, dropping rows written twice"""
+        rows = {}
+        for path in sorted(self.checkpoint_dir.glob(f"{task['key']}_{task['start']}_{task['end']}_*.jsonl")):
+            with open(path, "r") as f:
+                for line in f:
+                    row = json.loads(line)
+                    rows[row["id"]] = row
+        return list(rows.values())
+
+    @staticmethod
+    def _truncate_partial_line(path: Path):
+        """Drop a row left half-written by an interrupted run (its page is refetched)"""
+        if not path.exists():
+            return
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _fetch_chunk(self, task: Dict, plan: Dict, chunk: str):
+        """
+        Page through one chunk of a task from its checkpointed cursor.
+
+        The cursor is the timestamp to continue from, plus the last id seen
+        while draining a second that overflows a page (None otherwise).
+        """
+        state = plan["chunks"][chunk]
+        rows_path = self._chunk_path(task, chunk)
+        self._truncate_partial_line(rows_path)
+
+        while not state["done"]:
+            if state["id"] is None:
+                where = f'{{timestamp_gte: {state["timestamp"]}, timestamp_lte: {state["end"]}}}'
+                page = self._query(task, where, "timestamp")
+                last_timestamp = int(page[-1]["timestamp"]) if page else None
+
+                if len(page) < self.page_size:
+                    rows, cursor = page, (None, None)
+                elif int(page[0]["timestamp"]) == last_timestamp:
+                    # The whole page is one second - drain it by id
+                    rows, cursor = [], (last_timestamp, "")
+                else:
+                    # The last second may continue on the next page; refetch it there
+                    rows = [row for row in page if int(row["timestamp"]) < last_timestamp]
+                    cursor = (last_timestamp, None)
+            else:
+                where = f'{{timestamp: {state["timestamp"]}, id_gt: {json.dumps(state["id"])}}}'
+                rows = self._query(task, where, "id")
+                if len(rows) < self.page_size:
+                    next_second = state["timestamp"] + 1
+                    cursor = (next_second, None) if next_second <= state["end"] else (None, None)
+                else:
+                    cursor = (state["timestamp"], rows[-1]["id"])
+
+            if rows:
+                with open(rows_path, "a") as f:
+                    f.writelines(json.dumps(row) + "\n" for row in rows)
+
+            if cursor == (None, None):
+                state["done"] = True
+            else:
+                state["timestamp"], state["id"] = cursor
+            self._save_checkpoint(task, plan)
+
+        logger.debug(f"Fetched chunk {chunk} of {task['key']}")
+
+    def _query(self, task: Dict, where: str, order_by: str) -> List[Dict]:
+        """Run one page query, returning the entities it matched"""
+        query = """
+        {
+            %s(first: %d, orderBy: %s, orderDirection: asc, where: %s) {
+                %s
+            }
+        }
+        """ % (task["entity"], self.page_size, order_by, where, task["fields"])
+
+        data = self._post(task["url"], {"query": query})
+        return data.get("data", {}).get(task["entity"], [])
+
+    def _post(self, url: str, payload: Dict) -> Dict:
+        """
+        POST a GraphQL request, retrying transient failures with backoff.
+
+        Connection errors, timeouts, rate limiting, server errors and
+        GraphQL errors (e.g. indexer timeouts) are retried.
+
+        Raises:
+            RuntimeError: If the request still fails after max_retries retries
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Exponential backoff with jitter so workers don't retry in lockstep
+                time.sleep(self.backoff_factor * 2 ** (attempt - 1) * (0.5 + random.random()))
+
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                last_error = str(e)
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES:
+                last_error = f"status code {response.status_code}"
+                continue
+            if response.status_code != 200:
+                raise RuntimeError(f"API request failed with status code {response.status_code}: {response.text}")
+
+            data = response.json()
+            if "errors" in data:
+                last_error = f"GraphQL errors: {data['errors']}"
+                continue
+            return data
+
+        raise RuntimeError(f"Request failed after {self.max_retries} retries: {last_error}")
+
+    def close(self):
+        """Close the shared HTTP session"""
+        self.session.close()
@@ -0,0 +1,362 @@
+"""
+Response Cache Module for ArbitrageX
+
+This module caches the responses of the API's read-heavy endpoints for a few
+seconds, so dashboards polling every second are answered from the cache
+instead of querying the database on every request. Entries live in Redis when
+the server has a Redis connection, so all API workers share them, and in an
+in-process LRU otherwise. Every entry is tagged with the collections it was
+read from and dropped as soon as the scanner writes to one of them.
+
+Responses carry a weak ETag of their body, so clients revalidating with
+If-None-Match get an empty 304 while nothing changed, and large bodies are
+sent gzip-compressed to clients that accept it.
+"""
+
+import functools
+import gzip
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from flask import Response, make_response, request
+
+logger = logging.getLogger("ResponseCache")
+
+# Bodies smaller than this are sent uncompressed; gzip saves little on them
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+# Prefix of the cache's Redis keys
+REDIS_PREFIX = "arbitragex:api-cache:"
+
+# Seconds to use the in-process store after a Redis error before trying Redis again
+REDIS_RETRY_INTERVAL = 30.0
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body with its ETag and compressed form"""
+    body: bytes
+    mimetype: str
+    etag: str
+    gzip_body: Optional[bytes] = None
+
+    @classmethod
+    def from_body(cls, body: bytes, mimetype: str) -> "CachedResponse":
+        """Hash and, if it is large enough, compress a response body"""
+        gzip_body = gzip.compress(body, GZIP_LEVEL) if len(body) >= GZIP_MIN_SIZE else None
+        return cls(body, mimetype, hashlib.sha1(body).hexdigest(), gzip_body)
+
+
+class _MemoryStore:
+    """In-process LRU of cached responses with per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, entry: CachedResponse, ttl: float, tags: Tuple[str, ...]):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, entry, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            removed = 0
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    removed += self._remove(key)
+            return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> int:
+        """Drop an entry and its tag memberships; returns the number removed"""
+        item = self._entries.pop(key, None)
+        if item is None:
+            return 0
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return 1
+
+
+class _RedisStore:
+    """Cached responses as Redis hashes, with a set of keys per tag"""
+
+    def __init__(self, client):
+        self.client = client
+        # Tag sets must outlive every entry they list
+        self._tag_ttl = 0.0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        data = self.client.hgetall(REDIS_PREFIX + key)
+        if not data:
+            return None
+        return CachedResponse(
+            body=data[b"body"],
+            mimetype=data[b"mimetype"].decode(),
+            etag=data[b"etag"].decode(),
+            gzip_body=data.get(b"gzip") or None
+        )
+
+    def set(self, key: str, entry: CachedResponse, ttl: float, tags: Tuple[str, ...]):
+        redis_key = REDIS_PREFIX + key
+        self._tag_ttl = max(self._tag_ttl, ttl)
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.hset(redis_key, mapping={
+            "body": entry.body,
+            "mimetype": entry.mimetype,
+            "etag": entry.etag,
+            "gzip": entry.gzip_body or b""
+        })
+        pipeline.pexpire(redis_key, int(ttl * 1000))
+        for tag in tags:
+            pipeline.sadd(REDIS_PREFIX + "tag:" + tag, redis_key)
+            pipeline.pexpire(REDIS_PREFIX + "tag:" + tag, int(self._tag_ttl * 1000))
+        pipeline.execute()
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        tag_keys = [REDIS_PREFIX + "tag:" + tag for tag in tags]
+        pipeline = self.client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipeline.smembers(tag_key)
+        keys = set().union(*pipeline.execute())
+        if not keys:
+            return 0
+        pipeline.delete(*keys)
+        pipeline.delete(*tag_keys)
+        return pipeline.execute()[0]
+
+
+class ResponseCache:
+    """
+    Short-lived cache of GET responses keyed on path and query arguments.
+
+    Only 200 responses are cached. The cache uses Redis once use_redis() was
+    called; after a Redis error it uses the in-process LRU for
+    REDIS_RETRY_INTERVAL seconds, so an outage neither sends every poll to
+    the database nor makes each one wait for a Redis timeout.
+    """
+
+    def __init__(self, default_ttl: float = 2.0, max_entries: int = 1024):
+        """
+        Initialize the cache with the in-process store.
+
+        Args:
+            default_ttl: Seconds a response is cached unless the route sets a TTL
+            max_entries: Maximum responses kept by the in-process LRU
+        """
+        self.default_ttl = default_ttl
+        self._memory = _MemoryStore(max_entries)
+        self._redis: Optional[_RedisStore] = None
+        self._redis_retry_at = 0.0
+        self._lock = threading.Lock()
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "not_modified": 0,
+            "invalidated": 0,
+            "errors": 0
+        }
+
+    @property
+    def backend(self) -> str:
+        """Name of the store in use ("redis" or "memory")"""
+        return "redis" if self._redis_available() else "memory"
+
+    def use_redis(self, client):
+        """
+        Keep entries in Redis, shared with other API workers.
+
+        Args:
+            client: redis-py client
+        """
+        self._redis = _RedisStore(client)
+        self._redis_retry_at = 0.0
+        logger.info("Response cache using Redis")
+
+    def cached(self, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> Callable:
+        """
+        Decorator caching a Flask view's responses.
+
+        Args:
+            ttl: Seconds to cache a response (defaults to default_ttl)
+            tags: Collections the view reads; writes to any of them
+                invalidate its cached responses
+
+        Returns:
+            The decorator
+        """
+        tags = tuple(tags)
+
+        def decorator(view: Callable) -> Callable:
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = self._key()
+                entry = self._get(key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough:
+                        return response
+
+                    entry = CachedResponse.from_body(response.get_data(), response.mimetype)
+                    self._set(key, entry, self.default_ttl if ttl is None else ttl, tags)
+                    self._count("misses")
+                else:
+                    self._count("hits")
+                return self._respond(entry)
+            return wrapper
+        return decorator
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """
+        Drop the cached responses of views tagged with any of the given tags.
+
+        Args:
+            tags: Tags (collection names) whose responses are stale
+
+        Returns:
+            Number of responses dropped
+        """
+        tags = list(tags)
+        removed = self._memory.invalidate(tags)
+        if self._redis_available():
+            try:
+                removed += self._redis.invalidate(tags)
+            except Exception as e:
+                self._redis_failed("invalidating", e)
+        self._count("invalidated", removed)
+        return removed
+
+    def get_metrics(self) -> Dict:
+        """
+        Get hit, miss and invalidation counts.
+
+        Returns:
+            Dictionary with the backend, the in-process entry count and
+            cumulative counters; not_modified counts 304 responses
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+        metrics.update({"backend": self.backend, "memory_entries": len(self._memory)})
+        return metrics
+
+    def _key(self) -> str:
+        """Cache key of the current request: path and sorted query arguments"""
+        return request.path + "?" + urlencode(sorted(request.args.items(multi=True)))
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        """Look up a response in Redis, or the in-process store if Redis fails"""
+        if self._redis_available():
+            try:
+                return self._redis.get(key)
+            except Exception as e:
+                self._redis_failed("reading", e)
+        return self._memory.get(key)
+
+    def _set(self, key: str, entry: CachedResponse, ttl: float, tags: Tuple[str, ...]):
+        """Store a response in Redis, or the in-process store if Redis fails"""
+        if self._redis_available():
+            try:
+                self._redis.set(key, entry, ttl, tags)
+                return
+            except Exception as e:
+                self._redis_failed("writing", e)
+        self._memory.set(key, entry, ttl, tags)
+
+    def _redis_available(self) -> bool:
+        """Check whether Redis is configured and not backed off after an error"""
+        return self._redis is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, action: str, error: Exception):
+        """Back off from Redis after an error"""
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+        self._count("errors")
+        logger.warning(f"Error {action} Redis response cache, caching in process for "
+                       f"{REDIS_RETRY_INTERVAL:.0f}s: {error}")
+
+    def _respond(self, entry: CachedResponse) -> Response:
+        """Build the response for a cached entry, or a 304 if the client has it"""
+        if entry.gzip_body is not None and accepts_gzip():
+            response = Response(entry.gzip_body, mimetype=entry.mimetype)
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(entry.body, mimetype=entry.mimetype)
+        response.vary.add("Accept-Encoding")
+        # Clients may keep the body but must revalidate it on every poll
+        response.headers["Cache-Control"] = "no-cache"
+        response.set_etag(entry.etag, weak=True)
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            self._count("not_modified")
+        return response
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.metrics[name] += amount
+
+
+def accepts_gzip() -> bool:
+    """Check whether the current request accepts a gzip-encoded response"""
+    return request.accept_encodings["gzip"] > 0
+
+
+def finalize_response(response: Response) -> Response:
+    """
+    Add an ETag to, and compress, a response not served from the cache.
+
+    Meant for an after_request hook. Successful GET responses get a weak
+    ETag of their body and become a 304 if it matches If-None-Match; bodies
+    of at least GZIP_MIN_SIZE bytes are gzip-compressed if the client
+    accepts it. Streamed and already encoded responses are left alone.
+
+    Args:
+        response: Response of the current request
+
+    Returns:
+        The response to send
+    """
+    if (request.method != "GET" or response.status_code != 200 or response.direct_passthrough
+            or "Content-Encoding" in response.headers):
+        return response
+
+    if "ETag" not in response.headers:
+        response.add_etag(weak=True)
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+    body = response.get_data()
+    response.vary.add("Accept-Encoding")
+    if len(body) >= GZIP_MIN_SIZE and accepts_gzip():
+        response.set_data(gzip.compress(body, GZIP_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
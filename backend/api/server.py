@@ -22,6 +22,21 @@ from pymongo import MongoClient
 import redis
 from dotenv import load_dotenv
 
+# Share the bot's pooled MongoDB client and history queries when the backend
+# package is importable
+try:
+    from backend.bot.mongo_manager import get_connection, release_connection
+    from backend.bot.database_connector import find_page
+    MONGO_MANAGER_AVAILABLE = True
+except ImportError:
+    MONGO_MANAGER_AVAILABLE = False
+
+# Response caching, ETags and compression of the read-heavy endpoints
+try:
+    from backend.api.response_cache import ResponseCache, finalize_response
+except ImportError:
+    from response_cache import ResponseCache, finalize_response
+
 # Monitoring imports
 try:
     import sentry_sdk
@@ -63,6 +78,13 @@ if MONITORING_ENABLED:
     REQUESTS = Counter('arbitragex_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
     REQUEST_LATENCY = Histogram('arbitragex_request_latency_seconds', 'Request latency in seconds', ['method', 'endpoint'])
 
+# Responses of the polled endpoints are cached for a few seconds and dropped
+# when the scanner writes to the collections they read
+response_cache = ResponseCache(
+    default_ttl=float(os.getenv("API_CACHE_TTL", "2")),
+    max_entries=int(os.getenv("API_CACHE_SIZE", "1024"))
+)
+
 # Bot status (for compatibility with existing Python server)
 bot_status = {
     "isRunning": False,
@@ -75,31 +97,47 @@ bot_status = {
 }
 
 # Database connections
+mongo_connection = None
 mongo_client = None
 db = None
 redis_client = None
 
 def init_database_connections():
     """Initialize database connections."""
-    global mongo_client, db, redis_client
+    global mongo_connection, mongo_client, db, redis_client
     
     try:
         # MongoDB connection
         MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-        mongo_client = MongoClient(MONGO_URI)
+        if MONGO_MANAGER_AVAILABLE:
+            mongo_connection = get_connection(MONGO_URI)
+            mongo_client = mongo_connection.client
+        else:
+            mongo_client = MongoClient(MONGO_URI)
         db = mongo_client["arbitragex"]
         logger.info(f"Connected to MongoDB at {MONGO_URI}")
-        
+    except Exception as e:
+        logger.error(f"Database connection error: {e}")
+        return False
+    
+    try:
         # Redis connection (for caching and pub/sub)
         REDIS_URI = os.getenv("REDIS_URI", "redis://localhost:6379/0")
-        redis_client = redis.from_url(REDIS_URI)
-        redis_client.ping()  # Test connection
+        client = redis.from_url(REDIS_URI)
+        client.ping()  # Test connection
+        redis_client = client
+        response_cache.use_redis(redis_client)
         logger.info(f"Connected to Redis at {REDIS_URI}")
-        
-        return True
     except Exception as e:
-        logger.error(f"Database connection error: {e}")
-        return False
+        logger.warning(f"Redis not available, caching responses in process: {e}")
+    
+    return True
+
+def mongo_is_connected() -> bool:
+    """Check the MongoDB connection (from cached health when the client is shared)."""
+    if mongo_connection is not None:
+        return mongo_connection.is_healthy()
+    return mongo_client is not None
 
 # Import bot modules
 bot_core = None
@@ -122,6 +160,9 @@ def init_bot_components():
             
             bot_core = BotCore(config_path)
             network_scanner = NetworkScanner(bot_config)
+            # Both scanners write opportunities; bot_core's runs when the bot is started
+            for scanner in (bot_core.network_scanner, network_scanner):
+                scanner.db_connector.add_write_listener(response_cache.invalidate)
             logger.info("Bot components initialized")
             
             return True
@@ -141,11 +182,12 @@ def health_check():
         "timestamp": datetime.now().isoformat(),
         "version": "1.0.0",
         "services": {
-            "mongodb": "connected" if mongo_client is not None else "disconnected",
+            "mongodb": "connected" if mongo_is_connected() else "disconnected",
             "redis": "connected" if redis_client is not None else "disconnected",
             "bot_core": "initialized" if bot_core is not None else "not_initialized",
             "network_scanner": "initialized" if network_scanner is not None else "not_initialized"
-        }
+        },
+        "cache": response_cache.get_metrics()
     })
 
 # Metrics endpoint for Prometheus
@@ -210,12 +252,13 @@ def stop_bot_legacy():
     })
 
 @app.route('/api/v1/market-data/recent', methods=['GET'])
+@response_cache.cached(tags=["marketdatas"])
 def get_recent_market_data_legacy():
     """Get recent market data (legacy endpoint)."""
     logger.info("Legacy recent market data endpoint called")
     
     # Try to get data from database if available
-    if db:
+    if db is not None and mongo_is_connected():
         try:
             market_data = list(db.marketdatas.find().sort('timestamp', -1).limit(10))
             # Convert ObjectId to string for JSON serialization
@@ -252,23 +295,37 @@ def get_recent_market_data_legacy():
     })
 
 @app.route('/api/v1/arbitrage/opportunities', methods=['GET'])
+@response_cache.cached(tags=["arbitrageopportunities"])
 def get_arbitrage_opportunities_legacy():
     """Get arbitrage opportunities (legacy endpoint)."""
     logger.info("Legacy arbitrage opportunities endpoint called")
     
     # Try to get data from database if available
-    if db:
+    if db is not None and mongo_is_connected():
         try:
-            opportunities = list(db.arbitrageopportunities.find().sort('timestamp', -1).limit(10))
-            # Convert ObjectId to string for JSON serialization
-            for item in opportunities:
-                if '_id' in item:
-                    item['_id'] = str(item['_id'])
+            # Summaries by default; pages continue from the previous page's nextCursor
+            limit = max(1, min(int(request.args.get('limit', 10)), 100))
+            cursor = request.args.get('cursor')
+            projection = None if request.args.get('details') == 'true' else {"details": 0}
+            
+            if MONGO_MANAGER_AVAILABLE:
+                opportunities, next_cursor = find_page(db.arbitrageopportunities, {}, limit, cursor, projection)
+            else:
+                opportunities = list(db.arbitrageopportunities.find({}, projection)
+                                     .sort([('timestamp', -1), ('_id', -1)]).limit(limit))
+                next_cursor = None
+                # Convert ObjectId to string for JSON serialization
+                for item in opportunities:
+                    if '_id' in item:
+                        item['_id'] = str(item['_id'])
             
             return jsonify({
                 "success": True,
-                "data": opportunities
+                "data": opportunities,
+                "nextCursor": next_cursor
             })
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
         except Exception as e:
             logger.error(f"Error getting opportunities from database: {e}")
     
@@ -347,6 +404,7 @@ def update_settings_legacy():
 
 # New API endpoints
 @app.route('/api/opportunities', methods=['GET'])
+@response_cache.cached(tags=["arbitrageopportunities"])
 def get_opportunities():
     """Get arbitrage opportunities with optional filtering."""
     try:
@@ -355,7 +413,7 @@ def get_opportunities():
         limit = int(request.args.get('limit', 100))
         min_profit = float(request.args.get('min_profit', 0))
         
-        if not network_scanner or not db:
+        if not network_scanner or db is None:
             return jsonify({"error": "Service not available"}), 503
         
         # Get opportunities from database
@@ -501,6 +559,8 @@ def before_request():
 @app.after_request
 def after_request(response):
     """Log response and record metrics."""
+    # ETag and gzip for responses not already handled by the response cache
+    response = finalize_response(response)
     latency = (datetime.now() - request.start_time).total_seconds()
     
     # Log request details
@@ -519,7 +579,10 @@ def graceful_shutdown(signal_received, frame):
     logger.info(f"Signal {signal_received} received, shutting down gracefully")
     
     # Close database connections
-    if mongo_client:
+    if mongo_connection is not None:
+        release_connection(mongo_connection)
+        logger.info("MongoDB connection released")
+    elif mongo_client:
         mongo_client.close()
         logger.info("MongoDB connection closed")
     
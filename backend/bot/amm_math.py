@@ -0,0 +1,383 @@
+"""
+AMM Math Module for ArbitrageX
+
+This module provides exact swap output functions for the pool types the bot
+trades against and closed-form or Newton-solved trade sizing:
+- Uniswap V2-style constant-product (x * y = k) pools
+- Uniswap V3-style concentrated liquidity across tick ranges
+- Curve stableswap pools
+- Optimal input size for two-pool arbitrage
+
+All functions work on floating-point token amounts (already scaled by
+decimals). The constant-product functions are branch-free, so they also
+accept NumPy arrays.
+"""
+
+import math
+from typing import Callable, Optional, Sequence, Tuple
+
+
+def get_amount_out_v2(amount_in, reserve_in, reserve_out, fee: float = 0.003):
+    """
+    Output amount of a constant-product swap.
+
+    Args:
+        amount_in: Amount of the input token
+        reserve_in: Pool reserve of the input token
+        reserve_out: Pool reserve of the output token
+        fee: Pool fee as a fraction
+
+    Returns:
+        Amount of the output token received
+    """
+    amount_in_with_fee = amount_in * (1 - fee)
+    return amount_in_with_fee * reserve_out / (reserve_in + amount_in_with_fee)
+
+
+def get_amount_in_v2(amount_out, reserve_in, reserve_out, fee: float = 0.003):
+    """
+    Input amount needed to receive a given output from a constant-product pool.
+
+    Args:
+        amount_out: Desired amount of the output token (must be below reserve_out)
+        reserve_in: Pool reserve of the input token
+        reserve_out: Pool reserve of the output token
+        fee: Pool fee as a fraction
+
+    Returns:
+        Amount of the input token required
+    """
+    return reserve_in * amount_out / ((reserve_out - amount_out) * (1 - fee))
+
+
+def price_impact_v2(amount_in, reserve_in, fee: float = 0.003):
+    """
+    Price impact of a constant-product swap, excluding the fee.
+
+    Returns:
+        Fractional shortfall of the execution price versus the spot price
+    """
+    amount_in_with_fee = amount_in * (1 - fee)
+    return amount_in_with_fee / (reserve_in + amount_in_with_fee)
+
+
+def max_amount_for_impact_v2(max_impact: float, reserve_in: float, fee: float = 0.003) -> float:
+    """
+    Largest input whose constant-product price impact stays within a bound.
+
+    Args:
+        max_impact: Maximum price impact as a fraction (e.g., 0.01 for 1%)
+        reserve_in: Pool reserve of the input token
+        fee: Pool fee as a fraction
+
+    Returns:
+        Maximum input amount
+    """
+    if max_impact <= 0:
+        return 0.0
+    if max_impact >= 1:
+        return math.inf
+    return reserve_in * max_impact / ((1 - fee) * (1 - max_impact))
+
+
+def get_amount_out_v3(amount_in: float, sqrt_price: float, liquidity_ranges: Sequence[Tuple[float, float, float]],
+                      zero_for_one: bool, fee: float = 0.003) -> Tuple[float, float]:
+    """
+    Output amount of a concentrated-liquidity swap crossing tick ranges.
+
+    Args:
+        amount_in: Amount of the input token
+        sqrt_price: Current sqrt(price of token0 in token1)
+        liquidity_ranges: (sqrt_price_lower, sqrt_price_upper, liquidity) for
+            each initialized range; ranges must not overlap
+        zero_for_one: True when selling token0 for token1 (price moves down)
+        fee: Pool fee as a fraction
+
+    Returns:
+        Tuple of (amount out, sqrt price after the swap). If liquidity runs
+        out, the output of the portion that could be filled is returned.
+    """
+    remaining = amount_in * (1 - fee)
+    amount_out = 0.0
+
+    if zero_for_one:
+        ranges = sorted((r for r in liquidity_ranges if r[0] < sqrt_price), key=lambda r: r[1], reverse=True)
+    else:
+        ranges = sorted((r for r in liquidity_ranges if r[1] > sqrt_price), key=lambda r: r[0])
+
+    for lower, upper, liquidity in ranges:
+        if remaining <= 0:
+            break
+
+        if zero_for_one:
+            # Jump across any gap down to the top of this range
+            sqrt_price = min(sqrt_price, upper)
+            if liquidity <= 0:
+                sqrt_price = lower
+                continue
+            # token0 needed to move the price down to the range's lower bound
+            max_in = liquidity * (sqrt_price - lower) / (sqrt_price * lower)
+            if remaining < max_in:
+                next_sqrt_price = liquidity * sqrt_price / (liquidity + remaining * sqrt_price)
+                remaining_used = remaining
+            else:
+                next_sqrt_price = lower
+                remaining_used = max_in
+            amount_out += liquidity * (sqrt_price - next_sqrt_price)
+        else:
+            sqrt_price = max(sqrt_price, lower)
+            if liquidity <= 0:
+                sqrt_price = upper
+                continue
+            # token1 needed to move the price up to the range's upper bound
+            max_in = liquidity * (upper - sqrt_price)
+            if remaining < max_in:
+                next_sqrt_price = sqrt_price + remaining / liquidity
+                remaining_used = remaining
+            else:
+                next_sqrt_price = upper
+                remaining_used = max_in
+            amount_out += liquidity * (1 / sqrt_price - 1 / next_sqrt_price)
+
+        remaining -= remaining_used
+        sqrt_price = next_sqrt_price
+
+    return amount_out, sqrt_price
+
+
+def virtual_reserves_v3(sqrt_price: float, liquidity: float) -> Tuple[float, float]:
+    """
+    Virtual reserves of the active range of a concentrated-liquidity pool.
+
+    Within the active range the pool behaves like a constant-product pool
+    with these reserves.
+
+    Returns:
+        Tuple of (reserve0, reserve1)
+    """
+    return liquidity / sqrt_price, liquidity * sqrt_price
+
+
+def get_d_stable(balances: Sequence[float], amp: float, max_iterations: int = 255) -> float:
+    """
+    Solve the stableswap invariant D by Newton's method.
+
+    Args:
+        balances: Pool balances (normalized to the same precision)
+        amp: Amplification coefficient A
+
+    Returns:
+        Invariant D
+    """
+    n = len(balances)
+    total = sum(balances)
+    if total == 0:
+        return 0.0
+
+    ann = amp * n ** n
+    d = total
+    for _ in range(max_iterations):
+        d_p = d
+        for balance in balances:
+            d_p = d_p * d / (n * balance)
+        d_prev = d
+        d = (ann * total + d_p * n) * d / ((ann - 1) * d + (n + 1) * d_p)
+        if abs(d - d_prev) <= 1e-12 * d:
+            break
+
+    return d
+
+
+def get_y_stable(i: int, j: int, x: float, balances: Sequence[float], amp: float,
+                 d: Optional[float] = None, max_iterations: int = 255) -> float:
+    """
+    Solve for the balance of coin j after coin i's balance is set to x.
+
+    Args:
+        i: Index of the input coin
+        j: Index of the output coin
+        x: New balance of coin i
+        balances: Current pool balances
+        amp: Amplification coefficient A
+        d: Precomputed invariant (computed from balances if omitted)
+
+    Returns:
+        New balance of coin j
+    """
+    n = len(balances)
+    if d is None:
+        d = get_d_stable(balances, amp)
+
+    ann = amp * n ** n
+    c = d
+    s = 0.0
+    for k in range(n):
+        if k == j:
+            continue
+        balance = x if k == i else balances[k]
+        s += balance
+        c = c * d / (n * balance)
+    c = c * d / (ann * n)
+    b = s + d / ann
+
+    y = d
+    for _ in range(max_iterations):
+        y_prev = y
+        y = (y * y + c) / (2 * y + b - d)
+        if abs(y - y_prev) <= 1e-12 * d:
+            break
+
+    return y
+
+
+def get_amount_out_stable(amount_in: float, balances: Sequence[float], i: int, j: int,
+                          amp: float, fee: float = 0.0004) -> float:
+    """
+    Output amount of a Curve stableswap exchange (fee charged on output).
+
+    Args:
+        amount_in: Amount of coin i
+        balances: Pool balances
+        i: Index of the input coin
+        j: Index of the output coin
+        amp: Amplification coefficient A
+        fee: Pool fee as a fraction
+
+    Returns:
+        Amount of coin j received
+    """
+    d = get_d_stable(balances, amp)
+    y = get_y_stable(i, j, balances[i] + amount_in, balances, amp, d)
+    return (balances[j] - y) * (1 - fee)
+
+
+def optimal_arbitrage_v2(reserve_in_1: float, reserve_out_1: float, reserve_in_2: float, reserve_out_2: float,
+                         fee_1: float = 0.003, fee_2: float = 0.003) -> Tuple[float, float]:
+    """
+    Closed-form optimal input for a round trip through two constant-product pools.
+
+    The route sells token X into pool 1 for token Y, then sells Y into pool 2
+    for X. The two pools compose into one virtual constant-product pool with
+    reserves (e_in, e_out); profit out(x) - x peaks where
+    (e_in + g * x)^2 = g * e_in * e_out.
+
+    Args:
+        reserve_in_1: Pool 1 reserve of X
+        reserve_out_1: Pool 1 reserve of Y
+        reserve_in_2: Pool 2 reserve of Y
+        reserve_out_2: Pool 2 reserve of X
+        fee_1: Pool 1 fee as a fraction
+        fee_2: Pool 2 fee as a fraction
+
+    Returns:
+        Tuple of (optimal input of X, profit in X); (0.0, 0.0) when the
+        round trip is not profitable at any size
+    """
+    g1 = 1 - fee_1
+    g2 = 1 - fee_2
+    denominator = reserve_in_2 + g2 * reserve_out_1
+    e_in = reserve_in_1 * reserve_in_2 / denominator
+    e_out = g2 * reserve_out_1 * reserve_out_2 / denominator
+
+    if g1 * e_out <= e_in:
+        return 0.0, 0.0
+
+    amount_in = (math.sqrt(g1 * e_in * e_out) - e_in) / g1
+    profit = get_amount_out_v2(amount_in, e_in, e_out, fee_1) - amount_in
+    return amount_in, profit
+
+
+def optimal_arbitrage_amount(route_out: Callable[[float], float], upper_bound: float,
+                             tolerance: float = 1e-9, max_iterations: int = 50) -> Tuple[float, float]:
+    """
+    Optimal input for any round-trip route with a concave output curve.
+
+    Solves route_out'(x) = 1 by Newton's method on finite differences,
+    falling back to bisection steps when Newton leaves the bracket. Use this
+    for routes through V3 or stableswap pools where no closed form exists.
+
+    Args:
+        route_out: Function mapping input amount to output amount of the same token
+        upper_bound: Largest input to consider
+        tolerance: Relative tolerance on the input amount
+        max_iterations: Maximum number of iterations
+
+    Returns:
+        Tuple of (optimal input, profit); (0.0, 0.0) when unprofitable
+    """
+    if upper_bound <= 0:
+        return 0.0, 0.0
+
+    step = max(upper_bound * 1e-7, 1e-12)
+
+    def marginal(x: float) -> float:
+        return (route_out(x + step) - route_out(max(x - step, 0.0))) / (x + step - max(x - step, 0.0)) - 1
+
+    low, high = 0.0, upper_bound
+    if marginal(low) <= 0:
+        return 0.0, 0.0
+    if marginal(high) >= 0:
+        return high, route_out(high) - high
+
+    x = upper_bound / 2
+    for _ in range(max_iterations):
+        m = marginal(x)
+        if m > 0:
+            low = x
+        else:
+            high = x
+
+        curvature = (marginal(x + step) - marginal(max(x - step, 0.0))) / (2 * step)
+        next_x = x - m / curvature if curvature < 0 else (low + high) / 2
+        if not low < next_x < high:
+            next_x = (low + high) / 2
+
+        if abs(next_x - x) <= tolerance * max(x, 1.0):
+            x = next_x
+            break
+        x = next_x
+
+    profit = route_out(x) - x
+    if profit <= 0:
+        return 0.0, 0.0
+    return x, profit
+
+
+def max_amount_for_impact(amount_out: Callable[[float], float], max_impact: float, upper_bound: float,
+                          tolerance: float = 1e-9, max_iterations: int = 100) -> float:
+    """
+    Largest input whose price impact stays within a bound, for any pool curve.
+
+    Impact is measured against the marginal rate at a tiny trade size, so
+    the pool's fee does not count towards it.
+
+    Args:
+        amount_out: Function mapping input amount to output amount
+        max_impact: Maximum price impact as a fraction
+        upper_bound: Largest input to consider
+        tolerance: Relative tolerance on the input amount
+        max_iterations: Maximum number of bisection steps
+
+    Returns:
+        Maximum input amount
+    """
+    probe = max(upper_bound * 1e-9, 1e-12)
+    spot_rate = amount_out(probe) / probe
+
+    def impact(x: float) -> float:
+        return 1 - (amount_out(x) / x) / spot_rate
+
+    if impact(upper_bound) <= max_impact:
+        return upper_bound
+
+    low, high = 0.0, upper_bound
+    for _ in range(max_iterations):
+        mid = (low + high) / 2
+        if impact(mid) <= max_impact:
+            low = mid
+        else:
+            high = mid
+        if high - low <= tolerance * high:
+            break
+
+    return low
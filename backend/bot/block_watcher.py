@@ -0,0 +1,160 @@
+"""
+Block Watcher Module for ArbitrageX
+
+This module tracks the chain head of a network and reports which monitored
+pools had their reserves changed in the blocks since the last check. The
+scanner uses it to run only when a new block arrives and to re-quote only
+the pools that actually traded.
+"""
+
+import logging
+from typing import Dict, List, Optional, Set, Any
+import requests
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("block_watcher.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("BlockWatcher")
+
+# Sync(uint112,uint112) - emitted by V2-style pairs whenever reserves change
+SYNC_TOPIC = "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1"
+# Swap(address,address,int256,int256,uint160,uint128,int24) - Uniswap V3 pools
+V3_SWAP_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+
+
+class BlockWatcher:
+    """
+    Polls eth_blockNumber for new heads and filters Sync/Swap logs
+    to find the pools whose prices moved.
+    """
+
+    def __init__(self, network: str, rpc_url: str, config: Optional[Dict] = None,
+                 session: Optional[requests.Session] = None):
+        """
+        Initialize the block watcher.
+
+        Args:
+            network: Network name (e.g., "ethereum")
+            rpc_url: JSON-RPC endpoint for the network
+            config: Optional watcher settings (max_block_range, rpc_timeout)
+            session: Optional HTTP session to share with the network's quoter
+        """
+        config = config or {}
+        self.network = network
+        self.rpc_url = rpc_url
+        self.session = session or requests.Session()
+
+        # Falling further behind than this triggers a full rescan instead of getLogs
+        self.max_block_range = config.get("max_block_range", 50)
+        self.timeout = config.get("rpc_timeout", 10)
+
+        self.last_block: Optional[int] = None
+        # Pools that changed but could not be quoted; reported again by the next poll
+        self.pending_pools: Set[str] = set()
+        self._request_id = 0
+
+    def poll(self, pool_addresses: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Check for new blocks and collect the pools that changed in them.
+
+        The cursor is not advanced here; call commit() with the returned
+        block number once the changed pools have been quoted, so a failed
+        quote is retried instead of leaving its price stale.
+
+        Args:
+            pool_addresses: Addresses of the pools being monitored
+
+        Returns:
+            None if there is nothing to quote; otherwise a dictionary with
+            "block_number", "full_rescan" (True on first poll, reorg or gap)
+            and "changed_pools" (lower-case addresses with Sync/Swap logs,
+            plus pools left unquoted by the last commit)
+        """
+        head = self._get_block_number()
+        if head is None:
+            return None
+
+        if self.last_block is not None and head == self.last_block:
+            if not self.pending_pools:
+                return None
+            return {
+                "block_number": head,
+                "full_rescan": False,
+                "changed_pools": set(self.pending_pools)
+            }
+
+        reorg = self.last_block is not None and head < self.last_block
+        if reorg:
+            logger.warning(f"Chain head on {self.network} went back from {self.last_block} to {head}, "
+                           f"rescanning all pools")
+
+        from_block = None if self.last_block is None else self.last_block + 1
+        full_rescan = from_block is None or reorg or head - from_block + 1 > self.max_block_range
+
+        changed_pools: Set[str] = set()
+        if not full_rescan and pool_addresses:
+            logs = self._get_logs(from_block, head, pool_addresses)
+            if logs is None:
+                full_rescan = True
+            else:
+                changed_pools = {log["address"].lower() for log in logs if "address" in log}
+                changed_pools |= self.pending_pools
+
+        return {
+            "block_number": head,
+            "full_rescan": full_rescan,
+            "changed_pools": changed_pools
+        }
+
+    def commit(self, block_number: int, unquoted_pools: Optional[Set[str]] = None):
+        """
+        Advance past a block once the pools reported by poll() were quoted.
+
+        Args:
+            block_number: Block number returned by poll()
+            unquoted_pools: Addresses that could not be quoted; the next poll
+                reports them as changed again
+        """
+        self.last_block = block_number
+        self.pending_pools = {address.lower() for address in unquoted_pools or ()}
+
+    def _get_block_number(self) -> Optional[int]:
+        """Fetch the current chain head"""
+        result = self._call("eth_blockNumber", [])
+        if result is None:
+            return None
+        return int(result, 16)
+
+    def _get_logs(self, from_block: int, to_block: int, pool_addresses: List[str]) -> Optional[List[Dict]]:
+        """Fetch Sync and V3 Swap logs emitted by the monitored pools"""
+        return self._call("eth_getLogs", [{
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "address": pool_addresses,
+            "topics": [[SYNC_TOPIC, V3_SWAP_TOPIC]]
+        }])
+
+    def _call(self, method: str, params: List) -> Any:
+        """Send a single JSON-RPC request and return its result"""
+        self._request_id += 1
+        payload = {"jsonrpc": "2.0", "id": self._request_id, "method": method, "params": params}
+
+        try:
+            response = self.session.post(self.rpc_url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+        except Exception as e:
+            logger.error(f"{method} request to {self.network} failed: {e}")
+            return None
+
+        if "error" in body:
+            logger.error(f"{method} on {self.network} returned error: {body['error']}")
+            return None
+
+        return body.get("result")
@@ -20,7 +20,10 @@ from datetime import datetime, timedelta
 import threading
 import queue
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from backend.bot.opportunity import Opportunity
+from backend.bot.opportunity_queue import OpportunityQueue
 
 # Configure logging
 logging.basicConfig(
@@ -58,10 +61,23 @@ class BotCore:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
-        # Opportunity queue for passing data between components
-        self.opportunity_queue = queue.Queue(maxsize=100)
-        
-        # Statistics and metrics
+        # Opportunity queue for passing data between components, ordered by
+        # expected profit per gas; stale opportunities expire by block or age
+        execution_config = self.config.get("execution", {})
+        self.opportunity_queue = OpportunityQueue(
+            maxsize=execution_config.get("queue_size", 100),
+            ttl=execution_config.get("max_opportunity_age", 30),
+            max_block_age=execution_config.get("max_block_age", 2),
+            block_source=self._get_latest_block
+        )
+        
+        # Trade execution pool; a slot is held from dispatch until the trade finishes
+        self.max_concurrent_trades = execution_config.get("max_concurrent_trades", 3)
+        self._trade_slots = threading.BoundedSemaphore(self.max_concurrent_trades)
+        self._trade_pool = None
+        
+        # Statistics and metrics (updated from the scanner and trade threads)
+        self._stats_lock = threading.Lock()
         self.stats = {
             "start_time": None,
             "opportunities_found": 0,
@@ -187,7 +203,9 @@ class BotCore:
         self.paused = False
         self.stats["start_time"] = datetime.now()
         
-        # Start component threads
+        # Start the trade execution pool and component threads
+        self._trade_pool = ThreadPoolExecutor(max_workers=self.max_concurrent_trades,
+                                              thread_name_prefix="trade")
         self.scanner_thread = threading.Thread(target=self._scanner_loop)
         self.executor_thread = threading.Thread(target=self._executor_loop)
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
@@ -221,6 +239,11 @@ class BotCore:
         if hasattr(self, 'monitor_thread') and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=5)
         
+        # Let in-flight trades finish
+        if self._trade_pool is not None:
+            self._trade_pool.shutdown(wait=True)
+            self._trade_pool = None
+        
         # Save final stats
         self._save_stats()
         
@@ -272,17 +295,20 @@ class BotCore:
                     if self.config.get("ai_integration", {}).get("use_ai_predictions", False):
                         opportunities = self._filter_with_ai(opportunities)
                     
-                    # Add opportunities to queue for execution
+                    # Add opportunities to queue for execution (a full queue evicts
+                    # its least valuable entry or rejects a less valuable newcomer)
                     for opportunity in opportunities:
-                        if not self.opportunity_queue.full():
-                            self.opportunity_queue.put(opportunity)
-                            self.stats["opportunities_found"] += 1
-                        else:
-                            logger.warning("Opportunity queue is full, skipping opportunity")
+                        if self.opportunity_queue.put(Opportunity.from_dict(opportunity)):
+                            with self._stats_lock:
+                                self.stats["opportunities_found"] += 1
                     
-                    # Sleep for scan interval
-                    scan_interval = self.config.get("scan_interval", 5)
-                    time.sleep(scan_interval)
+                    # In block mode the scanner returns immediately when no new
+                    # block has arrived, so poll the chain head at a short interval
+                    if self.config.get("scan_mode", "interval") == "block":
+                        time.sleep(self.config.get("block_poll_interval", 0.5))
+                    else:
+                        scan_interval = self.config.get("scan_interval", 5)
+                        time.sleep(scan_interval)
                     
                 except Exception as e:
                     logger.error(f"Error in scanner loop: {e}")
@@ -291,8 +317,8 @@ class BotCore:
             logger.info("Scanner loop interrupted")
     
     def _executor_loop(self):
-        """Main loop for executing arbitrage trades"""
-        logger.info("Starting trade executor loop")
+        """Dispatch queued opportunities to the trade execution pool, most profitable first"""
+        logger.info(f"Starting trade executor loop with {self.max_concurrent_trades} workers")
         
         while self.running:
             try:
@@ -300,42 +326,60 @@ class BotCore:
                     time.sleep(1)
                     continue
                 
-                # Get opportunity from queue
+                # Wait for a free slot before taking an opportunity so that anything
+                # queued in the meantime is still ordered by expected profit
+                if not self._trade_slots.acquire(timeout=1):
+                    continue
+                
+                # The queue drops expired opportunities as it hands them out
                 try:
                     opportunity = self.opportunity_queue.get(timeout=1)
                 except queue.Empty:
+                    self._trade_slots.release()
                     continue
                 
-                logger.info(f"Processing opportunity: {opportunity['id']}")
+                logger.info(f"Processing opportunity: {opportunity.id}")
+                future = self._trade_pool.submit(self._execute_opportunity, opportunity)
+                future.add_done_callback(lambda _: self._trade_slots.release())
                 
-                # Execute trade
-                result = self.trade_executor.execute_trade(opportunity)
-                
-                # Update stats
+            except Exception as e:
+                logger.error(f"Error in executor loop: {e}")
+                time.sleep(5)  # Sleep on error to prevent rapid retries
+    
+    def _execute_opportunity(self, opportunity: Opportunity):
+        """Execute one trade on a pool worker and record its result"""
+        try:
+            # Execute trade
+            result = self.trade_executor.execute_trade(opportunity)
+            
+            # Update stats
+            with self._stats_lock:
                 self.stats["trades_executed"] += 1
-                if result["success"]:
+                if result.success:
                     self.stats["successful_trades"] += 1
-                    self.stats["total_profit"] += result["profit"]
-                    self.stats["total_gas_spent"] += result["gas_cost"]
-                    self.stats["net_profit"] = self.stats["total_profit"] - self.stats["total_gas_spent"]
-                    logger.info(f"Trade successful: {result['profit']} ETH profit")
+                    self.stats["total_profit"] += result.profit
+                    self.stats["total_gas_spent"] += result.gas_cost
                 else:
                     self.stats["failed_trades"] += 1
-                    self.stats["total_gas_spent"] += result.get("gas_cost", 0)
-                    self.stats["net_profit"] = self.stats["total_profit"] - self.stats["total_gas_spent"]
-                    logger.warning(f"Trade failed: {result.get('error', 'Unknown error')}")
-                
-                # Check circuit breaker
-                if self._check_circuit_breaker():
-                    logger.warning("Circuit breaker triggered, pausing bot")
-                    self.pause()
-                
-                # Mark task as done
-                self.opportunity_queue.task_done()
+                    self.stats["total_gas_spent"] += result.gas_cost or 0
+                self.stats["net_profit"] = self.stats["total_profit"] - self.stats["total_gas_spent"]
+            
+            if result.success:
+                logger.info(f"Trade successful: {result.profit} ETH profit")
+            else:
+                logger.warning(f"Trade failed: {result.error or 'Unknown error'}")
+            
+            # Check circuit breaker
+            if self._check_circuit_breaker() and not self.paused:
+                logger.warning("Circuit breaker triggered, pausing bot")
+                self.pause()
                 
-            except Exception as e:
-                logger.error(f"Error in executor loop: {e}")
-                time.sleep(5)  # Sleep on error to prevent rapid retries
+        except Exception as e:
+            logger.error(f"Error executing opportunity {opportunity.id}: {e}")
+    
+    def _get_latest_block(self, network: str) -> Optional[int]:
+        """Latest block the network scanner has seen on a network, if it scans by block"""
+        return getattr(self.network_scanner, "last_scanned_blocks", {}).get(network)
     
     def _monitor_loop(self):
         """Monitor loop for tracking competitors and system health"""
@@ -371,7 +415,7 @@ class BotCore:
         except KeyboardInterrupt:
             logger.info("Monitor loop interrupted")
     
-    def _filter_with_ai(self, opportunities: List[Dict]) -> List[Dict]:
+    def _filter_with_ai(self, opportunities: List[Opportunity]) -> List[Opportunity]:
         """Filter opportunities using AI predictions"""
         if not self.ai_strategy:
             return opportunities
@@ -412,7 +456,7 @@ class BotCore:
         # Count consecutive failures
         consecutive_failures = 0
         for trade in recent_trades:
-            if not trade["success"]:
+            if not trade.success:
                 consecutive_failures += 1
             else:
                 break  # Reset on success
@@ -423,16 +467,18 @@ class BotCore:
         """Save bot statistics to file"""
         stats_file = "bot_stats.json"
         
-        # Add runtime
-        if self.stats["start_time"]:
-            runtime = datetime.now() - self.stats["start_time"]
-            self.stats["runtime_seconds"] = runtime.total_seconds()
-            self.stats["runtime_formatted"] = str(runtime).split('.')[0]  # HH:MM:SS
+        with self._stats_lock:
+            # Add runtime
+            if self.stats["start_time"]:
+                runtime = datetime.now() - self.stats["start_time"]
+                self.stats["runtime_seconds"] = runtime.total_seconds()
+                self.stats["runtime_formatted"] = str(runtime).split('.')[0]  # HH:MM:SS
+            stats = dict(self.stats)
         
         # Save to file
         try:
             with open(stats_file, 'w') as f:
-                json.dump(self.stats, f, indent=4, default=str)
+                json.dump(stats, f, indent=4, default=str)
             logger.debug(f"Saved bot statistics to {stats_file}")
         except Exception as e:
             logger.error(f"Error saving statistics: {e}")
@@ -450,6 +496,8 @@ class BotCore:
             "paused": self.paused,
             "stats": self.stats,
             "queue_size": self.opportunity_queue.qsize(),
+            "queue_metrics": self.opportunity_queue.get_metrics(),
+            "active_trades": self.trade_executor.active_trades,
             "config": self.config
         }
 
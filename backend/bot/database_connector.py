@@ -5,14 +5,18 @@ This module handles database connections and operations for the ArbitrageX bot.
 It provides a unified interface for storing and retrieving data from MongoDB.
 """
 
+import base64
 import logging
 import os
 import json
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 import pymongo
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from bson import ObjectId, json_util
+from pymongo.errors import OperationFailure
+from backend.bot.mongo_manager import get_connection, release_connection
+from backend.bot.opportunity import Opportunity, TradeResult
+from backend.bot.write_buffer import WriteBuffer
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +29,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger("DatabaseConnector")
 
+# Newest first, with _id breaking timestamp ties; the keyset pagination order
+HISTORY_ORDER = [("timestamp", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]
+
+# Indexes for the history queries: equality filters first, then the history
+# order, then the expectedProfit range, so filtered reads walk one index range
+# in order instead of sorting in memory
+INDEXES = {
+    "arbitrageopportunities": {
+        "timestamp_id": HISTORY_ORDER,
+        "network_timestamp_id_profit":
+            [("network", pymongo.ASCENDING)] + HISTORY_ORDER + [("expectedProfit", pymongo.ASCENDING)],
+        "pair_timestamp_id_profit":
+            [("tokenA", pymongo.ASCENDING), ("tokenB", pymongo.ASCENDING)]
+            + HISTORY_ORDER + [("expectedProfit", pymongo.ASCENDING)],
+        "network_pair_timestamp_id_profit":
+            [("network", pymongo.ASCENDING), ("tokenA", pymongo.ASCENDING), ("tokenB", pymongo.ASCENDING)]
+            + HISTORY_ORDER + [("expectedProfit", pymongo.ASCENDING)]
+    },
+    "trades": {"timestamp_id": HISTORY_ORDER},
+    "arbitragetrades": {"timestamp_id": HISTORY_ORDER},
+    "marketdatas": {"timestamp_id": HISTORY_ORDER},
+    "gasprices": {"network_timestamp_id": [("network", pymongo.ASCENDING)] + HISTORY_ORDER}
+}
+
+# TTL index expiring raw opportunities by their createdAt field
+OPPORTUNITY_TTL_INDEX = "createdAt_ttl"
+
+# Summary reads leave out the embedded copy of the full record
+SUMMARY_PROJECTION = {"details": 0}
+
+
+def encode_cursor(document: Dict) -> str:
+    """
+    Encode the position of a document in history order as a page cursor.
+    
+    Args:
+        document: Last document of a page, as read from MongoDB
+        
+    Returns:
+        URL-safe cursor string
+    """
+    position = json_util.dumps({"timestamp": document.get("timestamp"), "_id": document["_id"]})
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """
+    Decode a page cursor into a filter for the documents after it.
+    
+    Args:
+        cursor: Cursor from encode_cursor
+        
+    Returns:
+        Query matching the documents that follow the cursor in history order
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        position = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+        timestamp, document_id = position["timestamp"], position["_id"]
+    except Exception as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+    
+    return {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "_id": {"$lt": document_id}}
+    ]}
+
+
+def find_page(collection, query: Dict, limit: int, cursor: Optional[str] = None,
+              projection: Optional[Dict] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Read one page of a collection in history order.
+    
+    Pages start after the position encoded in the cursor rather than at an
+    offset, so every page is one index seek whatever its depth.
+    
+    Args:
+        collection: Collection to read
+        query: Filter of the documents
+        limit: Maximum number of documents in the page
+        cursor: Cursor returned with the previous page (None for the first page)
+        projection: Fields to return (defaults to whole documents)
+        
+    Returns:
+        Tuple of (documents with _id as a string, cursor of the next page or
+        None after the last page)
+    """
+    if cursor:
+        query = {"$and": [query, decode_cursor(cursor)]} if query else decode_cursor(cursor)
+    
+    # Read one extra document to find out whether there is a next page
+    documents = list(collection.find(query, projection, sort=HISTORY_ORDER, limit=limit + 1))
+    next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    documents = documents[:limit]
+    
+    # Convert ObjectId to string for JSON serialization
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    
+    return documents, next_cursor
+
 class DatabaseConnector:
     """
     Handles database connections and operations for the ArbitrageX bot.
@@ -44,49 +151,64 @@ class DatabaseConnector:
         self.mongodb_uri = config.get("mongodb_uri", "mongodb://localhost:27017")
         self.database_name = config.get("database_name", "arbitragex")
         
-        # Initialize MongoDB client
+        # Initialize MongoDB client (shared with other components using the same URI)
+        self.connection = None
         self.client = None
         self.db = None
+        self._write_listeners: List[Callable[[List[str]], None]] = []
         
         # Connect to MongoDB
         self._connect_to_mongodb()
         
+        # Queue inserts for a background thread unless the write buffer is disabled
+        buffer_config = config.get("write_buffer", {})
+        self.write_buffer = None
+        if buffer_config.get("enabled", True):
+            # Hold batches back while the connection is down rather than time out on them
+            self.write_buffer = WriteBuffer(
+                lambda: self.db if self.is_connected() else None,
+                max_batch_size=buffer_config.get("max_batch_size", 500),
+                flush_interval=buffer_config.get("flush_interval", 1.0),
+                max_pending=buffer_config.get("max_pending", 10000),
+                overflow_policy=buffer_config.get("overflow_policy", "drop_oldest"),
+                block_timeout=buffer_config.get("block_timeout", 1.0),
+                retry_interval=buffer_config.get("retry_interval", 5.0),
+                on_flush=self._notify_writes
+            )
+        
         logger.info("Database Connector initialized")
     
     def _connect_to_mongodb(self) -> bool:
         """
-        Connect to MongoDB.
+        Connect to MongoDB through the shared connection manager.
+        
+        The client is kept even if the server is not reachable yet; it keeps
+        reconnecting in the background and is_connected() turns True once it
+        succeeds.
         
         Returns:
             True if connection successful, False otherwise
         """
         try:
-            # Connect to MongoDB with a timeout
-            self.client = MongoClient(self.mongodb_uri, serverSelectionTimeoutMS=5000)
-            
-            # Verify connection
-            self.client.admin.command('ping')
-            
-            # Get database
-            self.db = self.client[self.database_name]
+            if self.connection is None:
+                self.connection = get_connection(self.mongodb_uri, self.config.get("mongodb_client_options"))
+                self.client = self.connection.client
+                self.db = self.client[self.database_name]
+            
+            # Wait for the first successful server check
+            if not self.connection.wait_until_healthy(5.0):
+                logger.error(f"MongoDB not reachable at {self.mongodb_uri}; reconnecting in the background")
+                return False
             
             logger.info(f"Connected to MongoDB: {self.mongodb_uri}, database: {self.database_name}")
-            return True
-            
-        except ConnectionFailure as e:
-            logger.error(f"MongoDB connection failed: {e}")
-            self.client = None
-            self.db = None
-            return False
             
-        except ServerSelectionTimeoutError as e:
-            logger.error(f"MongoDB server selection timeout: {e}")
-            self.client = None
-            self.db = None
-            return False
+            if self.config.get("ensure_indexes", True):
+                self.ensure_indexes()
+            return True
             
         except Exception as e:
             logger.error(f"Error connecting to MongoDB: {e}")
+            self.connection = None
             self.client = None
             self.db = None
             return False
@@ -95,18 +217,53 @@ class DatabaseConnector:
         """
         Check if connected to MongoDB.
         
+        Uses the health cached from the client's server monitoring, so this
+        does not make a round-trip to the server.
+        
         Returns:
             True if connected, False otherwise
         """
-        if not self.client:
-            return False
+        return self.connection is not None and self.connection.is_healthy()
+    
+    def _insert(self, collection: str, document: Dict) -> bool:
+        """
+        Insert a document, through the write buffer when it is enabled.
+        
+        Args:
+            collection: Name of the collection to insert into
+            document: Document to insert
             
-        try:
-            # Verify connection
-            self.client.admin.command('ping')
-            return True
-        except Exception:
-            return False
+        Returns:
+            True if the document was inserted or queued, False if it was dropped
+        """
+        if self.write_buffer is not None:
+            return self.write_buffer.put(collection, document)
+        
+        result = self.db[collection].insert_one(document)
+        logger.debug(f"Inserted document into {collection}: {result.inserted_id}")
+        self._notify_writes([collection])
+        return True
+    
+    def add_write_listener(self, listener: Callable[[List[str]], None]):
+        """
+        Register a function to call after documents were written.
+        
+        Listeners get the names of the collections written to. With the write
+        buffer enabled they are called from its flush thread once a batch is
+        in the database, not when a document is queued.
+        
+        Args:
+            listener: Function taking a list of collection names
+        """
+        self._write_listeners.append(listener)
+    
+    def _notify_writes(self, collections: List[str]):
+        """Call the write listeners with the collections written to"""
+        for listener in self._write_listeners:
+            try:
+                listener(collections)
+            except Exception as e:
+                logger.error(f"Error in write listener: {e}")
     
     def save_market_data(self, market_data: Dict) -> bool:
         """
@@ -118,7 +275,8 @@ class DatabaseConnector:
         Returns:
             True if saved successfully, False otherwise
         """
-        if not self.is_connected():
+        # Skip the ping round-trip; failed writes surface when they are flushed
+        if self.db is None:
             logger.error("Cannot save market data: Not connected to MongoDB")
             return False
         
@@ -135,29 +293,30 @@ class DatabaseConnector:
                 market_data['timestamp'] = datetime.now()
             
             # Insert into marketdatas collection
-            result = self.db.marketdatas.insert_one(market_data)
-            
-            logger.info(f"Saved market data to MongoDB: {result.inserted_id}")
-            return True
+            return self._insert("marketdatas", market_data)
             
         except Exception as e:
             logger.error(f"Error saving market data to MongoDB: {e}")
             return False
     
-    def save_arbitrage_opportunity(self, opportunity: Dict) -> bool:
+    def save_arbitrage_opportunity(self, opportunity: Union[Dict, Opportunity]) -> bool:
         """
         Save arbitrage opportunity to MongoDB.
         
         Args:
-            opportunity: Arbitrage opportunity to save
+            opportunity: Arbitrage opportunity document or Opportunity record to save
             
         Returns:
             True if saved successfully, False otherwise
         """
-        if not self.is_connected():
+        # Skip the ping round-trip; failed writes surface when they are flushed
+        if self.db is None:
             logger.error("Cannot save arbitrage opportunity: Not connected to MongoDB")
             return False
         
+        if isinstance(opportunity, Opportunity):
+            opportunity = opportunity.to_mongo()
+        
         try:
             # Ensure required fields are present
             required_fields = ['tokenA', 'tokenB', 'route', 'expectedProfit']
@@ -175,29 +334,32 @@ class DatabaseConnector:
             opportunity['updatedAt'] = datetime.now()
             
             # Insert into arbitrageopportunities collection
-            result = self.db.arbitrageopportunities.insert_one(opportunity)
-            
-            logger.info(f"Saved arbitrage opportunity to MongoDB: {result.inserted_id}")
-            return True
+            return self._insert("arbitrageopportunities", opportunity)
             
         except Exception as e:
             logger.error(f"Error saving arbitrage opportunity to MongoDB: {e}")
             return False
     
-    def save_trade(self, trade: Dict) -> bool:
+    def save_trade(self, trade: Union[Dict, TradeResult], opportunity: Optional[Opportunity] = None) -> bool:
         """
         Save trade to MongoDB.
         
         Args:
-            trade: Trade to save
+            trade: Trade document or TradeResult record to save
+            opportunity: Executed opportunity, needed to fill in a TradeResult's
+                token and amount fields
             
         Returns:
             True if saved successfully, False otherwise
         """
-        if not self.is_connected():
+        # Skip the ping round-trip; failed writes surface when they are flushed
+        if self.db is None:
             logger.error("Cannot save trade: Not connected to MongoDB")
             return False
         
+        if isinstance(trade, TradeResult):
+            trade = trade.to_mongo(opportunity)
+        
         try:
             # Ensure required fields are present
             required_fields = ['tokenA', 'tokenB', 'amount', 'profit', 'success']
@@ -215,19 +377,122 @@ class DatabaseConnector:
             trade['updatedAt'] = datetime.now()
             
             # Insert into trades collection
-            result = self.db.trades.insert_one(trade)
+            saved = self._insert("trades", trade)
             
             # If it's an arbitrage trade, also save to arbitragetrades collection
             if trade.get('type') == 'arbitrage':
-                self.db.arbitragetrades.insert_one(trade)
+                self._insert("arbitragetrades", trade)
             
-            logger.info(f"Saved trade to MongoDB: {result.inserted_id}")
-            return True
+            return saved
             
         except Exception as e:
             logger.error(f"Error saving trade to MongoDB: {e}")
             return False
     
+    def save_gas_price(self, gas_price: Dict) -> bool:
+        """
+        Save a gas price observation to MongoDB.
+        
+        Args:
+            gas_price: Gas price record with at least network and gasPriceGwei
+            
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        if self.db is None:
+            logger.error("Cannot save gas price: Not connected to MongoDB")
+            return False
+        
+        try:
+            # Ensure required fields are present
+            for field in ['network', 'gasPriceGwei']:
+                if field not in gas_price:
+                    logger.error(f"Cannot save gas price: Missing required field '{field}'")
+                    return False
+            
+            # Add timestamp if not present
+            if 'timestamp' not in gas_price:
+                gas_price['timestamp'] = datetime.now()
+            
+            # Insert into gasprices collection
+            return self._insert("gasprices", gas_price)
+            
+        except Exception as e:
+            logger.error(f"Error saving gas price to MongoDB: {e}")
+            return False
+    
+    def ensure_indexes(self) -> Dict[str, List[str]]:
+        """
+        Create the history indexes and the opportunity TTL index, and bring
+        existing ones in line with their definitions.
+        
+        Raw opportunities expire opportunity_retention_days after createdAt
+        (default 30; 0 or None keeps them forever). Indexes are matched by
+        name: missing ones are created, ones with different keys are rebuilt
+        and a changed TTL is updated in place.
+        
+        Returns:
+            Dictionary of "created", "rebuilt", "updated", "unchanged" and
+            "failed" index names (as collection.index)
+        """
+        report = {"created": [], "rebuilt": [], "updated": [], "unchanged": [], "failed": []}
+        if self.db is None:
+            logger.error("Cannot ensure indexes: Not connected to MongoDB")
+            return report
+        
+        specs = {
+            collection: [(name, keys, {}) for name, keys in indexes.items()]
+            for collection, indexes in INDEXES.items()
+        }
+        retention_days = self.config.get("opportunity_retention_days", 30)
+        if retention_days:
+            specs["arbitrageopportunities"].append((
+                OPPORTUNITY_TTL_INDEX,
+                [("createdAt", pymongo.ASCENDING)],
+                {"expireAfterSeconds": int(retention_days * 86400)}
+            ))
+        
+        for collection_name, indexes in specs.items():
+            collection = self.db[collection_name]
+            try:
+                existing = collection.index_information()
+                if not retention_days and OPPORTUNITY_TTL_INDEX in existing:
+                    collection.drop_index(OPPORTUNITY_TTL_INDEX)
+                    logger.info(f"Dropped TTL index of {collection_name}; opportunities are kept")
+            except Exception as e:
+                logger.error(f"Error reading indexes of {collection_name}: {e}")
+                report["failed"].extend(f"{collection_name}.{name}" for name, _, _ in indexes)
+                continue
+            
+            for name, keys, options in indexes:
+                label = f"{collection_name}.{name}"
+                info = existing.get(name)
+                try:
+                    if info is None:
+                        collection.create_index(keys, name=name, **options)
+                        report["created"].append(label)
+                    elif [tuple(key) for key in info["key"]] != keys:
+                        collection.drop_index(name)
+                        collection.create_index(keys, name=name, **options)
+                        report["rebuilt"].append(label)
+                    elif info.get("expireAfterSeconds") != options.get("expireAfterSeconds"):
+                        self.db.command("collMod", collection_name, index={
+                            "name": name,
+                            "expireAfterSeconds": options["expireAfterSeconds"]
+                        })
+                        report["updated"].append(label)
+                    else:
+                        report["unchanged"].append(label)
+                except OperationFailure as e:
+                    # e.g. the same keys already indexed under another name
+                    logger.error(f"Cannot create index {label}: {e}")
+                    report["failed"].append(label)
+        
+        changed = report["created"] + report["rebuilt"] + report["updated"]
+        if changed:
+            logger.info(f"Updated MongoDB indexes: {', '.join(changed)}")
+        return report
+    
     def get_recent_market_data(self, limit: int = 10) -> List[Dict]:
         """
         Get recent market data from MongoDB.
@@ -243,16 +508,7 @@ class DatabaseConnector:
             return []
         
         try:
-            # Query marketdatas collection
-            cursor = self.db.marketdatas.find().sort('timestamp', pymongo.DESCENDING).limit(limit)
-            
-            # Convert cursor to list
-            market_data = list(cursor)
-            
-            # Convert ObjectId to string for JSON serialization
-            for item in market_data:
-                if '_id' in item:
-                    item['_id'] = str(item['_id'])
+            market_data, _ = find_page(self.db.marketdatas, {}, limit)
             
             logger.info(f"Retrieved {len(market_data)} market data records from MongoDB")
             return market_data
@@ -261,75 +517,90 @@ class DatabaseConnector:
             logger.error(f"Error getting market data from MongoDB: {e}")
             return []
     
-    def get_recent_arbitrage_opportunities(self, limit: int = 10) -> List[Dict]:
+    def get_recent_gas_prices(self, network: Optional[str] = None, limit: int = 100) -> List[Dict]:
         """
-        Get recent arbitrage opportunities from MongoDB.
+        Get recent gas price observations from MongoDB.
         
         Args:
+            network: Optional network to filter by
             limit: Maximum number of records to return
             
         Returns:
-            List of arbitrage opportunities
+            List of gas price records, newest first
         """
         if not self.is_connected():
-            logger.error("Cannot get arbitrage opportunities: Not connected to MongoDB")
+            logger.error("Cannot get gas prices: Not connected to MongoDB")
             return []
         
         try:
-            # Query arbitrageopportunities collection
-            cursor = self.db.arbitrageopportunities.find().sort('timestamp', pymongo.DESCENDING).limit(limit)
-            
-            # Convert cursor to list
-            opportunities = list(cursor)
-            
-            # Convert ObjectId to string for JSON serialization
-            for item in opportunities:
-                if '_id' in item:
-                    item['_id'] = str(item['_id'])
-            
-            logger.info(f"Retrieved {len(opportunities)} arbitrage opportunities from MongoDB")
-            return opportunities
+            gas_prices, _ = find_page(self.db.gasprices, {"network": network} if network else {}, limit)
+            return gas_prices
             
         except Exception as e:
-            logger.error(f"Error getting arbitrage opportunities from MongoDB: {e}")
+            logger.error(f"Error getting gas prices from MongoDB: {e}")
             return []
     
-    def get_recent_trades(self, limit: int = 10) -> List[Dict]:
+    def get_recent_arbitrage_opportunities(self, limit: int = 10, summary: bool = False) -> List[Dict]:
+        """
+        Get recent arbitrage opportunities from MongoDB.
+        
+        Args:
+            limit: Maximum number of records to return
+            summary: Leave out the embedded details of each opportunity
+            
+        Returns:
+            List of arbitrage opportunities
+        """
+        return self.get_opportunities_from_db(limit=limit, summary=summary)
+    
+    def get_recent_trades(self, limit: int = 10, summary: bool = False) -> List[Dict]:
         """
         Get recent trades from MongoDB.
         
         Args:
             limit: Maximum number of records to return
+            summary: Leave out the embedded details of each trade
             
         Returns:
             List of trade records
         """
+        return self.get_trades_page(limit=limit, summary=summary)["data"]
+    
+    def get_trades_page(self, limit: int = 100, cursor: Optional[str] = None,
+                        summary: bool = True) -> Dict:
+        """
+        Get one page of the trade history, newest first.
+        
+        Args:
+            limit: Maximum number of trades in the page
+            cursor: next_cursor of the previous page (None for the first page)
+            summary: Leave out the embedded details of each trade
+            
+        Returns:
+            Dictionary with the trades under "data" and the cursor of the
+            next page (None after the last page) under "next_cursor"
+        """
         if not self.is_connected():
             logger.error("Cannot get trades: Not connected to MongoDB")
-            return []
+            return {"data": [], "next_cursor": None}
         
         try:
-            # Query trades collection
-            cursor = self.db.trades.find().sort('timestamp', pymongo.DESCENDING).limit(limit)
-            
-            # Convert cursor to list
-            trades = list(cursor)
-            
-            # Convert ObjectId to string for JSON serialization
-            for item in trades:
-                if '_id' in item:
-                    item['_id'] = str(item['_id'])
+            trades, next_cursor = find_page(
+                self.db.trades, {}, limit, cursor,
+                SUMMARY_PROJECTION if summary else None
+            )
             
             logger.info(f"Retrieved {len(trades)} trades from MongoDB")
-            return trades
+            return {"data": trades, "next_cursor": next_cursor}
             
         except Exception as e:
             logger.error(f"Error getting trades from MongoDB: {e}")
-            return []
+            return {"data": [], "next_cursor": None}
     
     def get_opportunities_from_db(self, network: Optional[str] = None, limit: int = 100, 
                                  min_profit: Optional[float] = None, 
-                                 token_pair: Optional[tuple] = None) -> List[Dict]:
+                                 token_pair: Optional[tuple] = None,
+                                 summary: bool = False) -> List[Dict]:
         """
         Retrieve arbitrage opportunities from the database.
         
@@ -338,13 +609,36 @@ class DatabaseConnector:
             limit: Maximum number of opportunities to return
             min_profit: Minimum profit threshold
             token_pair: Optional token pair to filter by (tokenA, tokenB)
+            summary: Leave out the embedded details of each opportunity
             
         Returns:
             List of arbitrage opportunities from the database
         """
+        return self.get_opportunities_page(network, limit, min_profit, token_pair, summary=summary)["data"]
+    
+    def get_opportunities_page(self, network: Optional[str] = None, limit: int = 100,
+                               min_profit: Optional[float] = None,
+                               token_pair: Optional[tuple] = None,
+                               cursor: Optional[str] = None,
+                               summary: bool = True) -> Dict:
+        """
+        Get one page of the opportunity history, newest first.
+        
+        Args:
+            network: Optional network to filter by
+            limit: Maximum number of opportunities in the page
+            min_profit: Minimum profit threshold
+            token_pair: Optional token pair to filter by (tokenA, tokenB)
+            cursor: next_cursor of the previous page (None for the first page)
+            summary: Leave out the embedded details of each opportunity
+            
+        Returns:
+            Dictionary with the opportunities under "data" and the cursor of
+            the next page (None after the last page) under "next_cursor"
+        """
         if not self.is_connected():
             logger.error("Cannot retrieve opportunities: Not connected to MongoDB")
-            return []
+            return {"data": [], "next_cursor": None}
             
         try:
             # Build query
@@ -362,23 +656,17 @@ class DatabaseConnector:
                 query["tokenB"] = token_b
                 
             # Get opportunities from database
-            opportunities = list(self.db.arbitrageopportunities.find(
-                query, 
-                sort=[("timestamp", -1)],
-                limit=limit
-            ))
-            
-            # Convert MongoDB ObjectId to string for JSON serialization
-            for opp in opportunities:
-                if "_id" in opp:
-                    opp["_id"] = str(opp["_id"])
+            opportunities, next_cursor = find_page(
+                self.db.arbitrageopportunities, query, limit, cursor,
+                SUMMARY_PROJECTION if summary else None
+            )
                     
             logger.info(f"Retrieved {len(opportunities)} opportunities from database")
-            return opportunities
+            return {"data": opportunities, "next_cursor": next_cursor}
             
         except Exception as e:
             logger.error(f"Error retrieving opportunities from database: {e}")
-            return []
+            return {"data": [], "next_cursor": None}
             
     def update_opportunity_status(self, opportunity_id: str, status: str, 
                                  execution_result: Optional[Dict] = None) -> bool:
@@ -408,24 +696,63 @@ class DatabaseConnector:
                 update_doc["executionResult"] = execution_result
                 
             # Update opportunity in database
+            # Ids are returned to callers as strings
+            document_id = ObjectId(opportunity_id) if ObjectId.is_valid(opportunity_id) else opportunity_id
             result = self.db.arbitrageopportunities.update_one(
-                {"_id": opportunity_id},
+                {"_id": document_id},
                 {"$set": update_doc}
             )
             
-            if result.modified_count > 0:
-                logger.info(f"Updated opportunity {opportunity_id} status to {status}")
-                return True
-            else:
-                logger.warning(f"Opportunity {opportunity_id} not found or not updated")
+            if result.matched_count == 0:
+                logger.warning(f"Opportunity not found: {opportunity_id}")
                 return False
                 
+            logger.info(f"Updated opportunity {opportunity_id} status to {status}")
+            self._notify_writes(["arbitrageopportunities"])
+            return True
+                
         except Exception as e:
             logger.error(f"Error updating opportunity status: {e}")
             return False
     
+    def get_write_metrics(self) -> Dict:
+        """
+        Get the write buffer's batch size, flush latency and queue depth metrics.
+        
+        Returns:
+            Dictionary of write buffer metrics (empty if the buffer is disabled)
+        """
+        if self.write_buffer is None:
+            return {}
+        return self.write_buffer.get_metrics()
+    
     def close(self):
-        """Close MongoDB connection."""
-        if self.client:
-            self.client.close()
-            logger.info("Closed MongoDB connection") 
\ No newline at end of file
+        """Flush queued writes and close MongoDB connection."""
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+        
+        if self.connection is not None:
+            release_connection(self.connection)
+            self.connection = None
+            self.client = None
+            self.db = None
+            logger.info("Closed MongoDB connection")
+
+def create_database_connector(config: Dict) -> DatabaseConnector:
+    """
+    Create the storage backend selected by the "database" config section.
+    
+    Args:
+        config: Bot configuration dictionary; database.backend is "mongodb"
+            (default) or "sqlite"
+            
+    Returns:
+        Database connector of the selected backend
+    """
+    backend = config.get("database", {}).get("backend", "mongodb")
+    if backend == "sqlite":
+        from backend.bot.sqlite_store import SQLiteConnector
+        return SQLiteConnector(config)
+    if backend != "mongodb":
+        raise ValueError(f"Unknown database backend: {backend}")
+    return DatabaseConnector(config)
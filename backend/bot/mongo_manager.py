@@ -0,0 +1,216 @@
+"""
+Mongo Connection Manager Module for ArbitrageX
+
+This module keeps one pooled MongoClient per URI for the whole process, shared
+by the database connector, the API server and the AI components. Connection
+health is cached from pymongo's topology monitoring events instead of pinging
+the server on every check, and the client's monitor threads reconnect in the
+background after an outage.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from pymongo import MongoClient, monitoring
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("mongo_manager.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("MongoManager")
+
+# Pool and monitoring options of every client; callers may override them.
+# Servers are re-checked every heartbeatFrequencyMS, and as often as every
+# 500ms while an operation is waiting for one.
+DEFAULT_CLIENT_OPTIONS = {
+    "maxPoolSize": 50,
+    "minPoolSize": 2,
+    "maxIdleTimeMS": 300000,
+    "waitQueueTimeoutMS": 2000,
+    "connectTimeoutMS": 5000,
+    "serverSelectionTimeoutMS": 5000,
+    "heartbeatFrequencyMS": 10000
+}
+
+
+class _HealthListener(monitoring.TopologyListener, monitoring.ServerHeartbeatListener):
+    """Forwards topology changes and heartbeat failures to a MongoConnection"""
+
+    def __init__(self, connection: "MongoConnection"):
+        self.connection = connection
+
+    def opened(self, event):
+        pass
+
+    def description_changed(self, event):
+        self.connection._update_topology(event.new_description)
+
+    def closed(self, event):
+        self.connection._update_topology(None)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        self.connection._record_failure(event.reply)
+
+
+class MongoConnection:
+    """
+    A shared MongoClient and its cached health.
+
+    The connection is healthy while the topology has a writable server, as
+    reported by the client's monitoring events, so is_healthy() never does
+    network I/O. The client object stays valid across outages; pymongo
+    reconnects it in the background and the health flips back on its own.
+    """
+
+    def __init__(self, uri: str, options: Dict[str, Any]):
+        """
+        Create the client for a URI.
+
+        Args:
+            uri: MongoDB connection URI
+            options: MongoClient keyword options
+        """
+        self.uri = uri
+        self.options = options
+        self.references = 0
+
+        self._healthy = False
+        self._topology_type = "Unknown"
+        self._last_error = None
+        self._last_change = None
+        self._health_changed = threading.Condition()
+
+        self.client = MongoClient(uri, event_listeners=[_HealthListener(self)], **options)
+
+    def is_healthy(self) -> bool:
+        """Check whether a writable server is available, without a round-trip"""
+        return self._healthy
+
+    def wait_until_healthy(self, timeout: float) -> bool:
+        """
+        Wait for the client to find a writable server.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            True if the connection is healthy
+        """
+        with self._health_changed:
+            return self._health_changed.wait_for(lambda: self._healthy, timeout)
+
+    def get_database(self, name: str):
+        """Get a database of the shared client"""
+        return self.client[name]
+
+    def health(self) -> Dict:
+        """
+        Get the cached health of the connection.
+
+        Returns:
+            Dictionary with the health flag, topology type, the last heartbeat
+            error and the age of the last health change in seconds
+        """
+        with self._health_changed:
+            return {
+                "healthy": self._healthy,
+                "topology": self._topology_type,
+                "last_error": self._last_error,
+                "since": None if self._last_change is None else time.monotonic() - self._last_change
+            }
+
+    def _update_topology(self, description):
+        """Recompute the health flag from a new topology description"""
+        healthy = description is not None and description.has_writable_server()
+        with self._health_changed:
+            self._topology_type = "Closed" if description is None else description.topology_type_name
+            if healthy != self._healthy:
+                self._healthy = healthy
+                self._last_change = time.monotonic()
+                if healthy:
+                    self._last_error = None
+                    logger.info(f"MongoDB available ({self._topology_type})")
+                elif description is not None:
+                    logger.warning(f"MongoDB unavailable: {self._last_error or 'no writable server'}")
+                self._health_changed.notify_all()
+
+    def _record_failure(self, error):
+        """Remember the latest heartbeat failure for health reports"""
+        with self._health_changed:
+            self._last_error = str(error)
+
+
+_connections: Dict[str, MongoConnection] = {}
+_connections_lock = threading.Lock()
+
+
+def get_connection(uri: str, options: Optional[Dict[str, Any]] = None) -> MongoConnection:
+    """
+    Get the shared connection for a URI, creating it on first use.
+
+    Every call must be paired with release_connection(). Options only apply
+    when the client is created; later callers share the existing pool.
+
+    Args:
+        uri: MongoDB connection URI
+        options: MongoClient options overriding DEFAULT_CLIENT_OPTIONS
+
+    Returns:
+        The shared connection
+    """
+    with _connections_lock:
+        connection = _connections.get(uri)
+        if connection is None:
+            connection = MongoConnection(uri, {**DEFAULT_CLIENT_OPTIONS, **(options or {})})
+            _connections[uri] = connection
+            logger.info(f"Created MongoDB client for {uri}")
+        elif options and {**DEFAULT_CLIENT_OPTIONS, **options} != connection.options:
+            logger.debug(f"Reusing MongoDB client for {uri}; ignoring different client options")
+        connection.references += 1
+        return connection
+
+
+def release_connection(connection: MongoConnection):
+    """
+    Release a connection obtained from get_connection().
+
+    The client is closed once its last user releases it.
+
+    Args:
+        connection: Connection to release
+    """
+    with _connections_lock:
+        connection.references -= 1
+        if connection.references > 0 or _connections.get(connection.uri) is not connection:
+            return
+        del _connections[connection.uri]
+
+    connection.client.close()
+    logger.info(f"Closed MongoDB client for {connection.uri}")
+
+
+def close_all_connections():
+    """Close every shared client, e.g. at interpreter exit"""
+    with _connections_lock:
+        connections = list(_connections.values())
+        _connections.clear()
+
+    for connection in connections:
+        connection.client.close()
+
+
+atexit.register(close_all_connections)
@@ -0,0 +1,411 @@
+"""
+Multicall Quoter Module for ArbitrageX
+
+This module batches the on-chain reads needed to price every monitored
+token pair on every DEX of a network. Instead of one ``eth_call`` per
+(pair, dex), all pool reads are packed into Multicall3 ``aggregate3``
+calls, chunked by gas and calldata size, and the chunks are sent together
+as a single JSON-RPC batch request.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+import requests
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("multicall_quoter.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("MulticallQuoter")
+
+# Multicall3 is deployed at the same address on every supported network
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Function selectors
+AGGREGATE3_SELECTOR = "82ad56cb"    # aggregate3((address,bool,bytes)[])
+GET_RESERVES_SELECTOR = "0902f1ac"  # getReserves()
+SLOT0_SELECTOR = "3850c7bd"         # slot0()
+LIQUIDITY_SELECTOR = "1a686502"     # liquidity()
+
+# Rough gas cost of each pool read inside aggregate3 (cold SLOADs + call overhead)
+CALL_GAS_ESTIMATE = {
+    GET_RESERVES_SELECTOR: 10000,
+    SLOT0_SELECTOR: 12000,
+    LIQUIDITY_SELECTOR: 8000
+}
+
+# Encoded size of one Call3 entry: offset word + address + bool + bytes offset + length + 1 data word
+CALL_ENCODED_BYTES = 6 * 32
+
+Q96 = 2 ** 96
+
+
+def _word(value: int) -> str:
+    """Encode an unsigned integer as a 32-byte hex word"""
+    return format(value, "064x")
+
+
+def encode_aggregate3(calls: List[Tuple[str, str]]) -> str:
+    """
+    ABI-encode an aggregate3 call with allowFailure set on every entry.
+
+    Args:
+        calls: List of (target address, calldata hex without 0x) tuples
+
+    Returns:
+        Hex-encoded calldata including the 0x prefix
+    """
+    encoded_calls = []
+    for target, call_data in calls:
+        data_len = len(call_data) // 2
+        padded = call_data + "0" * ((-len(call_data)) % 64)
+        encoded_calls.append(
+            _word(int(target, 16)) +
+            _word(1) +          # allowFailure
+            _word(3 * 32) +     # offset of callData within the tuple
+            _word(data_len) +
+            padded
+        )
+
+    # Offsets are relative to the start of the array body (after the length word)
+    offsets = []
+    position = 32 * len(encoded_calls)
+    for encoded in encoded_calls:
+        offsets.append(_word(position))
+        position += len(encoded) // 2
+
+    return ("0x" + AGGREGATE3_SELECTOR +
+            _word(32) +
+            _word(len(encoded_calls)) +
+            "".join(offsets) +
+            "".join(encoded_calls))
+
+
+def decode_aggregate3(result_hex: str) -> List[Tuple[bool, bytes]]:
+    """
+    Decode the (bool success, bytes returnData)[] result of aggregate3.
+
+    Args:
+        result_hex: Hex-encoded return data from eth_call
+
+    Returns:
+        List of (success, return data) tuples in call order
+    """
+    data = bytes.fromhex(result_hex[2:] if result_hex.startswith("0x") else result_hex)
+
+    def read_word(offset: int) -> int:
+        return int.from_bytes(data[offset:offset + 32], "big")
+
+    array_start = read_word(0)
+    count = read_word(array_start)
+    body = array_start + 32
+
+    results = []
+    for i in range(count):
+        tuple_start = body + read_word(body + 32 * i)
+        success = read_word(tuple_start) != 0
+        bytes_start = tuple_start + read_word(tuple_start + 32)
+        length = read_word(bytes_start)
+        results.append((success, data[bytes_start + 32:bytes_start + 32 + length]))
+
+    return results
+
+
+class MulticallQuoter:
+    """
+    Batched quote engine for a single network.
+    Packs every (pair, dex) pool read into Multicall3 aggregate3 calls and
+    sends them as one JSON-RPC batch per scan.
+    """
+
+    def __init__(self, network: str, rpc_url: str, config: Optional[Dict] = None,
+                 session: Optional[requests.Session] = None):
+        """
+        Initialize the quoter.
+
+        Args:
+            network: Network name (e.g., "ethereum")
+            rpc_url: JSON-RPC endpoint for the network
+            config: Optional multicall settings (gas/payload limits, timeout)
+            session: Optional HTTP session to reuse across quoters
+        """
+        config = config or {}
+        self.network = network
+        self.rpc_url = rpc_url
+        self.session = session or requests.Session()
+
+        self.multicall_address = config.get("multicall_address", MULTICALL3_ADDRESS)
+        # Stay well below the node's eth_call gas cap (geth defaults to 50M)
+        self.max_gas_per_call = config.get("max_gas_per_call", 25_000_000)
+        self.max_calldata_bytes = config.get("max_calldata_bytes", 120_000)
+        # Many providers cap the number of requests in a JSON-RPC batch
+        self.max_rpc_batch_size = config.get("max_rpc_batch_size", 50)
+        self.timeout = config.get("rpc_timeout", 10)
+
+        self._request_id = 0
+        self.stats = {
+            "scans": 0,
+            "rpc_round_trips": 0,
+            "eth_calls": 0,
+            "pool_reads": 0,
+            "failed_reads": 0,
+            "last_latency": None
+        }
+
+    def get_prices(self, token_pairs: List[Tuple[str, str]], network_dexes: Dict,
+                   pool_addresses: Optional[Set[str]] = None) -> Dict[Tuple[str, str], Dict]:
+        """
+        Quote every token pair on every DEX of the network.
+
+        Args:
+            token_pairs: List of (token_a, token_b) pairs
+            network_dexes: DEX configurations for the network; each DEX lists
+                its pools under "pools" keyed by "TOKENA_TOKENB"
+            pool_addresses: Optional set of lower-case pool addresses; when
+                given, only these pools are read
+
+        Returns:
+            Dictionary mapping (token_a, token_b) to a dex_prices dict of the
+            same shape as NetworkScanner._get_prices_across_dexes
+        """
+        start_time = time.time()
+        pools = self.resolve_pools(token_pairs, network_dexes)
+        if pool_addresses is not None:
+            pools = [pool for pool in pools if pool["address"].lower() in pool_addresses]
+        reads = self._build_reads(pools)
+
+        results: Dict[Tuple[str, str], Dict] = {pair: {} for pair in token_pairs}
+        if not reads:
+            return results
+
+        calls = [(read["target"], read["selector"]) for read in reads]
+        chunks = self._chunk_calls(calls)
+        return_data = self._execute_chunks(chunks)
+
+        pool_data: Dict[int, Dict[str, bytes]] = {}
+        for read, (success, data) in zip(reads, return_data):
+            if not success or not data:
+                self.stats["failed_reads"] += 1
+                continue
+            pool_data.setdefault(read["pool_index"], {})[read["selector"]] = data
+
+        for pool_index, pool in enumerate(pools):
+            decoded = pool_data.get(pool_index)
+            if not decoded:
+                continue
+            quote = self._decode_pool(pool, decoded)
+            if quote is None:
+                continue
+            results[pool["pair"]][pool["dex"]] = quote
+
+        self.stats["scans"] += 1
+        self.stats["pool_reads"] += len(reads)
+        self.stats["last_latency"] = time.time() - start_time
+
+        logger.debug(f"Quoted {len(pools)} pools on {self.network} with "
+                     f"{len(chunks)} aggregate calls in {self.stats['last_latency']:.3f}s")
+        return results
+
+    def resolve_pools(self, token_pairs: List[Tuple[str, str]], network_dexes: Dict) -> List[Dict]:
+        """
+        Resolve the pool monitored for every (pair, dex) combination.
+
+        Args:
+            token_pairs: List of (token_a, token_b) pairs
+            network_dexes: DEX configurations for the network
+
+        Returns:
+            List of pool descriptors (pair, dex, type, address, token0, decimals, fee)
+        """
+        pools = []
+
+        for token_a, token_b in token_pairs:
+            for dex_name, dex_config in network_dexes.items():
+                if not dex_config.get("enabled", True):
+                    continue
+                dex_pools = dex_config.get("pools", {})
+                pool_config = dex_pools.get(f"{token_a}_{token_b}") or dex_pools.get(f"{token_b}_{token_a}")
+                if not pool_config:
+                    continue
+
+                pools.append({
+                    "pair": (token_a, token_b),
+                    "dex": dex_name,
+                    "type": pool_config.get("type", "v3" if "v3" in dex_name else "v2"),
+                    "address": pool_config["address"],
+                    "token0": pool_config.get("token0", token_a),
+                    "decimals0": pool_config.get("decimals0", 18),
+                    "decimals1": pool_config.get("decimals1", 18),
+                    "fee": pool_config.get("fee", dex_config.get("fee")),
+                    "router_address": dex_config.get("router_address")
+                })
+
+        return pools
+
+    def _build_reads(self, pools: List[Dict]) -> List[Dict]:
+        """List the contract reads each pool needs to be priced"""
+        reads = []
+
+        for pool_index, pool in enumerate(pools):
+            selectors = [SLOT0_SELECTOR, LIQUIDITY_SELECTOR] if pool["type"] == "v3" else [GET_RESERVES_SELECTOR]
+            for selector in selectors:
+                reads.append({
+                    "pool_index": pool_index,
+                    "target": pool["address"],
+                    "selector": selector
+                })
+
+        return reads
+
+    def _chunk_calls(self, calls: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Split calls into aggregate3 chunks bounded by gas and calldata size"""
+        chunks = []
+        current = []
+        current_gas = 0
+        current_bytes = 0
+
+        for call in calls:
+            call_gas = CALL_GAS_ESTIMATE.get(call[1], 20000)
+            if current and (current_gas + call_gas > self.max_gas_per_call or
+                            current_bytes + CALL_ENCODED_BYTES > self.max_calldata_bytes):
+                chunks.append(current)
+                current, current_gas, current_bytes = [], 0, 0
+            current.append(call)
+            current_gas += call_gas
+            current_bytes += CALL_ENCODED_BYTES
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    def _execute_chunks(self, chunks: List[List[Tuple[str, str]]]) -> List[Tuple[bool, bytes]]:
+        """
+        Send aggregate3 chunks as JSON-RPC batch requests.
+
+        Returns:
+            Flat list of (success, return data) in the original call order;
+            calls from a chunk whose eth_call failed are reported as failures
+        """
+        return_data: List[Tuple[bool, bytes]] = []
+
+        for batch_start in range(0, len(chunks), self.max_rpc_batch_size):
+            batch = chunks[batch_start:batch_start + self.max_rpc_batch_size]
+            requests_payload = []
+            for chunk in batch:
+                self._request_id += 1
+                requests_payload.append({
+                    "jsonrpc": "2.0",
+                    "id": self._request_id,
+                    "method": "eth_call",
+                    "params": [
+                        {"to": self.multicall_address, "data": encode_aggregate3(chunk)},
+                        "latest"
+                    ]
+                })
+
+            responses = self._post_batch(requests_payload)
+
+            for request, chunk in zip(requests_payload, batch):
+                response = responses.get(request["id"])
+                if response is None or "error" in response or not response.get("result"):
+                    error = response.get("error") if response else "no response"
+                    logger.warning(f"aggregate3 call failed on {self.network}: {error}")
+                    return_data.extend([(False, b"")] * len(chunk))
+                    continue
+                try:
+                    decoded = decode_aggregate3(response["result"])
+                except Exception as e:
+                    logger.warning(f"Could not decode aggregate3 result on {self.network}: {e}")
+                    decoded = []
+                if len(decoded) != len(chunk):
+                    decoded = [(False, b"")] * len(chunk)
+                return_data.extend(decoded)
+
+        return return_data
+
+    def _post_batch(self, payload: List[Dict]) -> Dict[int, Dict]:
+        """POST a JSON-RPC batch and index the responses by request id"""
+        self.stats["rpc_round_trips"] += 1
+        self.stats["eth_calls"] += len(payload)
+
+        try:
+            response = self.session.post(self.rpc_url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+        except Exception as e:
+            logger.error(f"JSON-RPC batch request to {self.network} failed: {e}")
+            return {}
+
+        # A node that rejects batching answers with a single error object
+        if isinstance(body, dict):
+            body = [body]
+
+        return {item.get("id"): item for item in body if isinstance(item, dict)}
+
+    def _decode_pool(self, pool: Dict, decoded: Dict[str, bytes]) -> Optional[Dict]:
+        """Turn raw pool reads into a price/liquidity quote for the pair"""
+        decimals0 = pool["decimals0"]
+        decimals1 = pool["decimals1"]
+
+        try:
+            if pool["type"] == "v3":
+                slot0 = decoded.get(SLOT0_SELECTOR)
+                if slot0 is None:
+                    return None
+                sqrt_price = int.from_bytes(slot0[0:32], "big") / Q96
+                if sqrt_price == 0:
+                    return None
+                price0 = sqrt_price ** 2 * 10 ** (decimals0 - decimals1)
+
+                liquidity_data = decoded.get(LIQUIDITY_SELECTOR)
+                liquidity = int.from_bytes(liquidity_data[0:32], "big") if liquidity_data else 0
+                # Virtual reserves of the active range
+                reserve0 = liquidity / sqrt_price / 10 ** decimals0
+                reserve1 = liquidity * sqrt_price / 10 ** decimals1
+            else:
+                reserves = decoded.get(GET_RESERVES_SELECTOR)
+                if reserves is None:
+                    return None
+                reserve0 = int.from_bytes(reserves[0:32], "big") / 10 ** decimals0
+                reserve1 = int.from_bytes(reserves[32:64], "big") / 10 ** decimals1
+                if reserve0 == 0 or reserve1 == 0:
+                    return None
+                price0 = reserve1 / reserve0
+        except Exception as e:
+            logger.warning(f"Could not decode pool {pool['address']} on {self.network}: {e}")
+            return None
+
+        token_a = pool["pair"][0]
+        if pool["token0"] == token_a:
+            price = price0
+            liquidity = reserve0
+        else:
+            price = 1 / price0
+            liquidity = reserve1
+
+        quote = {
+            "price": price,
+            "liquidity": liquidity,
+            "router_address": pool["router_address"],
+            "pool_address": pool["address"]
+        }
+        if pool["fee"] is not None:
+            quote["fee"] = pool["fee"]
+
+        return quote
+
+    def get_stats(self) -> Dict:
+        """
+        Get quoter statistics.
+
+        Returns:
+            Dictionary with round-trip and read counters
+        """
+        return dict(self.stats)
@@ -7,15 +7,21 @@ potential arbitrage opportunities across different DEXes and liquidity pools.
 
 import logging
 import json
+import os
 import time
 import uuid
 from typing import Dict, List, Optional, Union, Any, Tuple
-from datetime import datetime
 import asyncio
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, Future
 from web3 import Web3
 import requests
-from backend.bot.database_connector import DatabaseConnector
+from backend.bot.database_connector import create_database_connector
+from backend.bot.multicall_quoter import MulticallQuoter
+from backend.bot.block_watcher import BlockWatcher
+from backend.bot.route_graph import RouteGraph
+from backend.bot.opportunity import Opportunity
 
 # Configure logging
 logging.basicConfig(
@@ -52,6 +58,19 @@ class NetworkScanner:
         # Load DEX configurations
         self.dex_configs = self._load_dex_configs()
         
+        # Batched multicall quoters for networks with an RPC endpoint
+        self.quoters = self._init_quoters()
+        
+        # Block-driven scanning: only re-quote pools that changed in new blocks
+        self.scan_mode = config.get("scan_mode", "interval")
+        self.block_watchers = self._init_block_watchers()
+        self.pool_prices: Dict[str, Dict[tuple, Dict]] = {}
+        self.last_scanned_blocks: Dict[str, int] = {}
+        
+        # Multi-hop cycle search over each network's token graph
+        self.max_hops = config.get("max_hops", 3)
+        self.route_graphs: Dict[str, RouteGraph] = {}
+        
         # Token price cache to reduce API calls
         self.price_cache = {}
         self.price_cache_expiry = 60  # seconds
@@ -60,11 +79,28 @@ class NetworkScanner:
         # Track last scan time for each network
         self.last_scan_times = {network: 0 for network in self.networks}
         
-        # Opportunity ID counter
+        # Opportunity ID counter (shared by concurrent network scans)
         self.opportunity_counter = 0
+        self._counter_lock = threading.Lock()
+        
+        # Concurrent scan settings
+        self.concurrent_scan = config.get("concurrent_scan", True)
+        self.network_scan_timeout = config.get(
+            "network_scan_timeout",
+            config.get("scanner", {}).get("max_scan_time_seconds", 10)
+        )
+        self.max_scan_workers = config.get("max_scan_workers", max(1, len(self.networks)))
+        self._scan_executor = None
+        self._inflight_scans: Dict[str, Future] = {}
+        
+        # Per-network scan latency metrics
+        self.network_latencies = {
+            network: self._empty_latency_metrics()
+            for network in self.networks
+        }
         
         # Initialize database connector
-        self.db_connector = DatabaseConnector(config)
+        self.db_connector = create_database_connector(config)
         
         logger.info(f"Network Scanner initialized for networks: {', '.join(self.networks)}")
     
@@ -109,6 +145,51 @@ class NetworkScanner:
         
         return connections
     
+    def _get_rpc_url(self, network: str) -> Optional[str]:
+        """Get the JSON-RPC endpoint for a network from the configuration"""
+        rpc_url = self.config.get("rpc_urls", {}).get(network)
+        
+        networks = self.config.get("networks")
+        if rpc_url is None and isinstance(networks, dict):
+            rpc_url = networks.get(network, {}).get("rpc_url")
+        
+        if not rpc_url:
+            return None
+        
+        # Settings files reference endpoints as ${ENV_VAR}
+        rpc_url = os.path.expandvars(rpc_url)
+        return None if "${" in rpc_url else rpc_url
+    
+    def _init_quoters(self) -> Dict[str, MulticallQuoter]:
+        """Create a multicall quoter for each network with a configured RPC endpoint"""
+        quoters = {}
+        
+        if self.config.get("use_mock_connections", True):
+            return quoters
+        
+        multicall_config = self.config.get("multicall", {})
+        for network in self.networks:
+            rpc_url = self._get_rpc_url(network)
+            if rpc_url:
+                quoters[network] = MulticallQuoter(network, rpc_url, multicall_config)
+                logger.info(f"Using batched multicall quotes for {network}")
+        
+        return quoters
+    
+    def _init_block_watchers(self) -> Dict[str, BlockWatcher]:
+        """Create a block watcher for each quoted network when scanning per block"""
+        watchers = {}
+        
+        if self.scan_mode != "block":
+            return watchers
+        
+        watcher_config = self.config.get("block_watcher", {})
+        for network, quoter in self.quoters.items():
+            watchers[network] = BlockWatcher(network, quoter.rpc_url, watcher_config, session=quoter.session)
+            logger.info(f"Using block-driven scanning for {network}")
+        
+        return watchers
+    
     def _load_dex_configs(self) -> Dict:
         """Load DEX configurations from file"""
         try:
@@ -148,45 +229,178 @@ class NetworkScanner:
                 # Add more networks as needed
             }
     
-    def scan(self) -> List[Dict]:
+    def scan(self) -> List[Opportunity]:
         """
         Scan all configured networks for arbitrage opportunities.
         
+        Networks are scanned concurrently unless ``concurrent_scan`` is disabled,
+        in which case they are walked one after another.
+        
         Returns:
             List of arbitrage opportunities across all networks
         """
         logger.info("Starting network scan for arbitrage opportunities")
-        all_opportunities = []
         
-        # Check database connection
+        # Check database connection (cached health; the client reconnects in the background)
         if not self.db_connector.is_connected():
-            logger.warning("Database connection not available. Attempting to reconnect...")
-            # Attempt to reconnect
-            if not self.db_connector._connect_to_mongodb():
-                logger.error("Failed to connect to database. Continuing without database persistence.")
+            logger.warning("Database connection not available. Opportunities are buffered until it reconnects.")
+        
+        if self.concurrent_scan and len(self.networks) > 1:
+            all_opportunities = self._scan_networks_concurrently()
+        else:
+            all_opportunities = self._scan_networks_sequentially()
+        
+        # Clean up price cache
+        self._cleanup_price_cache()
+        
+        logger.info(f"Network scan complete. Found {len(all_opportunities)} total opportunities")
+        return all_opportunities
+    
+    def _scan_networks_sequentially(self) -> List[Opportunity]:
+        """Scan each configured network in turn"""
+        all_opportunities = []
         
-        # Scan each network
         for network in self.networks:
+            start_time = time.time()
             try:
                 logger.info(f"Scanning network: {network}")
                 network_opportunities = self._scan_network(network)
-                
-                if network_opportunities:
-                    logger.info(f"Found {len(network_opportunities)} opportunities on {network}")
-                    all_opportunities.extend(network_opportunities)
-                else:
-                    logger.info(f"No arbitrage opportunities found on {network}")
+                self._record_network_latency(network, time.time() - start_time, "ok")
+                self._log_network_result(network, network_opportunities)
+                all_opportunities.extend(network_opportunities)
             except Exception as e:
+                self._record_network_latency(network, time.time() - start_time, "error")
                 logger.error(f"Error scanning network {network}: {e}")
                 continue
         
-        # Clean up price cache
-        self._cleanup_price_cache()
+        return all_opportunities
+    
+    def _scan_networks_concurrently(self) -> List[Opportunity]:
+        """
+        Fan out _scan_network across all configured networks on a bounded
+        worker pool.
+        
+        Every network shares the same deadline (``network_scan_timeout`` seconds
+        from the start of the cycle), so the cycle time tracks the slowest
+        network rather than the sum of all of them. Networks that miss the
+        deadline are reported as timed out and their results are dropped for
+        this cycle; a network whose previous scan is still running is skipped.
+        
+        Returns:
+            Opportunities from every network that finished before the deadline
+        """
+        if self._scan_executor is None:
+            self._scan_executor = ThreadPoolExecutor(
+                max_workers=self.max_scan_workers,
+                thread_name_prefix="network-scan"
+            )
+        
+        cycle_start = time.time()
+        futures = {}
+        
+        for network in self.networks:
+            inflight = self._inflight_scans.get(network)
+            if inflight is not None and not inflight.done():
+                logger.warning(f"Previous scan of {network} still running, skipping this cycle")
+                continue
+            
+            logger.info(f"Scanning network: {network}")
+            future = self._scan_executor.submit(self._timed_scan_network, network)
+            self._inflight_scans[network] = future
+            futures[future] = network
+        
+        done, not_done = wait(futures, timeout=self.network_scan_timeout)
+        
+        all_opportunities = []
+        for future in done:
+            network = futures[future]
+            try:
+                network_opportunities, latency = future.result()
+                self._record_network_latency(network, latency, "ok")
+                self._log_network_result(network, network_opportunities)
+                all_opportunities.extend(network_opportunities)
+            except Exception as e:
+                self._record_network_latency(network, time.time() - cycle_start, "error")
+                logger.error(f"Error scanning network {network}: {e}")
+        
+        for future in not_done:
+            network = futures[future]
+            self._record_network_latency(network, time.time() - cycle_start, "timeout")
+            logger.warning(f"Scan of {network} exceeded {self.network_scan_timeout}s deadline, "
+                           f"returning partial results")
         
-        logger.info(f"Network scan complete. Found {len(all_opportunities)} total opportunities")
         return all_opportunities
     
-    def _scan_network(self, network: str) -> List[Dict]:
+    def _timed_scan_network(self, network: str) -> Tuple[List[Opportunity], float]:
+        """Run _scan_network and return its result with the elapsed time"""
+        start_time = time.time()
+        opportunities = self._scan_network(network)
+        return opportunities, time.time() - start_time
+    
+    @staticmethod
+    def _empty_latency_metrics() -> Dict:
+        """Initial latency metrics for a network that has not been scanned yet"""
+        return {
+            "last_latency": None,
+            "avg_latency": None,
+            "max_latency": 0.0,
+            "scans": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "last_status": None
+        }
+    
+    def _record_network_latency(self, network: str, latency: float, status: str):
+        """Update the latency metrics for a network after a scan attempt"""
+        metrics = self.network_latencies.setdefault(network, self._empty_latency_metrics())
+        
+        metrics["last_status"] = status
+        if status == "timeout":
+            metrics["timeouts"] += 1
+            return
+        if status == "error":
+            metrics["errors"] += 1
+        
+        metrics["scans"] += 1
+        metrics["last_latency"] = latency
+        metrics["max_latency"] = max(metrics["max_latency"], latency)
+        if metrics["avg_latency"] is None:
+            metrics["avg_latency"] = latency
+        else:
+            # Exponential moving average so recent RPC behaviour dominates
+            metrics["avg_latency"] = 0.8 * metrics["avg_latency"] + 0.2 * latency
+    
+    def _log_network_result(self, network: str, network_opportunities: List[Opportunity]):
+        """Log the outcome of a network scan"""
+        if network_opportunities:
+            logger.info(f"Found {len(network_opportunities)} opportunities on {network}")
+        else:
+            logger.info(f"No arbitrage opportunities found on {network}")
+    
+    def get_network_latencies(self) -> Dict[str, Dict]:
+        """
+        Get per-network scan latency metrics.
+        
+        Returns:
+            Dictionary mapping network name to its latency statistics
+        """
+        return {network: dict(metrics) for network, metrics in self.network_latencies.items()}
+    
+    def _next_opportunity_id(self, network: str) -> str:
+        """Allocate a unique opportunity ID (safe across scan threads)"""
+        with self._counter_lock:
+            opportunity_id = f"ARB-{network}-{self.opportunity_counter}"
+            self.opportunity_counter += 1
+        return opportunity_id
+    
+    def close(self):
+        """Shut down the scan worker pool and database connection"""
+        if self._scan_executor is not None:
+            self._scan_executor.shutdown(wait=False)
+            self._scan_executor = None
+        self.db_connector.close()
+    
+    def _scan_network(self, network: str) -> List[Opportunity]:
         """
         Scan a specific network for arbitrage opportunities.
         
@@ -198,42 +412,50 @@ class NetworkScanner:
         """
         opportunities = []
         
-        # Real implementation would:
-        # 1. Query on-chain data for token prices across different DEXes
-        # 2. Compare prices to find arbitrage opportunities
-        # 3. Calculate potential profit after gas and fees
-        # 4. Return viable opportunities
+        # Quote every pair on every DEX with batched multicall reads when
+        # an RPC endpoint is configured for this network
+        if network in self.quoters and not self.config.get("mock_mode", False):
+            network_dexes = self.dex_configs.get(network, {})
+            token_pairs = self._get_token_pairs(network)
+            
+            if network in self.block_watchers:
+                prices_by_pair = self._get_changed_prices(network, token_pairs, network_dexes)
+            else:
+                prices_by_pair = self._get_prices_for_network(network, token_pairs, network_dexes)
+            
+            block_number = self.last_scanned_blocks.get(network)
+            for (token_a, token_b), dex_prices in prices_by_pair.items():
+                for opportunity in self._find_arbitrage_in_prices(network, token_a, token_b, dex_prices):
+                    opportunity.block_number = block_number
+                    opportunities.append(opportunity)
+                    self._save_opportunity(opportunity)
+            
+            # Two-leg routes are covered above; the graph adds 3+ hop cycles
+            if self.max_hops >= 3:
+                for opportunity in self._find_multi_hop_opportunities(network, prices_by_pair, network_dexes):
+                    opportunity.block_number = block_number
+                    opportunities.append(opportunity)
         
         # For demonstration, generate mock opportunities if configured
-        if self.config.get("mock_mode", False):
+        elif self.config.get("mock_mode", False):
             # Generate random number of opportunities (0-5)
             opportunity_count = random.randint(0, 5)
             
             for _ in range(opportunity_count):
                 opportunity = self._generate_mock_opportunity(network)
                 opportunities.append(opportunity)
-                
-                # Save opportunity to database
-                if self.db_connector.is_connected():
-                    # Convert opportunity format to match database schema
-                    db_opportunity = {
-                        'tokenA': opportunity['token_a'],
-                        'tokenB': opportunity['token_b'],
-                        'route': [
-                            {'exchange': opportunity['buy_dex'], 'action': 'buy', 'price': opportunity['buy_price']},
-                            {'exchange': opportunity['sell_dex'], 'action': 'sell', 'price': opportunity['sell_price']}
-                        ],
-                        'expectedProfit': opportunity['potential_profit'],
-                        'network': opportunity['network'],
-                        'confidence': opportunity['confidence'],
-                        'timestamp': datetime.now(),
-                        'details': opportunity  # Store the full opportunity details
-                    }
-                    
-                    self.db_connector.save_arbitrage_opportunity(db_opportunity)
+                self._save_opportunity(opportunity)
         
         return opportunities
     
+    def _save_opportunity(self, opportunity: Opportunity):
+        """Queue an opportunity for the database if connected"""
+        if self.db_connector.db is None:
+            return
+        
+        # Convert opportunity format to match database schema
+        self.db_connector.save_arbitrage_opportunity(opportunity.to_mongo())
+    
     def _get_token_pairs(self, network: str) -> List[tuple]:
         """Get token pairs to monitor for the specified network"""
         # In production, this would load from a configuration file or database
@@ -267,6 +489,87 @@ class NetworkScanner:
         
         return common_pairs
     
+    def _get_prices_for_network(self, network: str, token_pairs: List[tuple],
+                                network_dexes: Dict) -> Dict[tuple, Dict]:
+        """
+        Get prices for every token pair across every DEX of a network.
+        
+        Uses the network's MulticallQuoter when available so the whole
+        pair x DEX universe costs one JSON-RPC round-trip; otherwise falls
+        back to pricing each pair separately.
+        
+        Returns:
+            Dictionary mapping (token_a, token_b) to its dex_prices dict
+        """
+        quoter = self.quoters.get(network)
+        if quoter is not None:
+            return quoter.get_prices(token_pairs, network_dexes)
+        
+        return {
+            (token_a, token_b): self._get_prices_across_dexes(network, token_a, token_b, network_dexes)
+            for token_a, token_b in token_pairs
+        }
+    
+    def _get_changed_prices(self, network: str, token_pairs: List[tuple],
+                            network_dexes: Dict) -> Dict[tuple, Dict]:
+        """
+        Re-quote only the pools that changed since the last block seen.
+        
+        Polls the network's block watcher; if there is no new block nothing is
+        read. Otherwise only pools with Sync/Swap logs in the new blocks are
+        re-quoted (all pools on the first block, after a reorg or after
+        falling too far behind) and merged into the cached pool prices.
+        The watcher only moves past the block once quotes came back; pools
+        that failed to quote are retried on the next scan.
+        
+        Returns:
+            Cached dex_prices for each pair that had at least one pool change
+        """
+        quoter = self.quoters[network]
+        watcher = self.block_watchers[network]
+        
+        pools = quoter.resolve_pools(token_pairs, network_dexes)
+        update = watcher.poll([pool["address"] for pool in pools])
+        if update is None:
+            return {}
+        
+        block_number = update["block_number"]
+        if update["full_rescan"]:
+            requested = {pool["address"].lower() for pool in pools}
+            quotes = quoter.get_prices(token_pairs, network_dexes)
+        else:
+            requested = {pool["address"].lower() for pool in pools} & update["changed_pools"]
+            if not requested:
+                watcher.commit(block_number)
+                return {}
+            quotes = quoter.get_prices(token_pairs, network_dexes, pool_addresses=requested)
+        
+        quoted = {
+            pool["address"].lower() for pool in pools
+            if pool["dex"] in quotes.get(pool["pair"], {})
+        }
+        if requested and not quoted:
+            # Keep the cursor and the cached prices; the same range is retried next scan
+            logger.warning(f"No pools could be quoted on {network} at block {block_number}")
+            return {}
+        
+        self.last_scanned_blocks[network] = block_number
+        cached_prices = self.pool_prices.setdefault(network, {})
+        if update["full_rescan"]:
+            cached_prices.clear()
+        watcher.commit(block_number, requested - quoted)
+        
+        changed_pairs = {}
+        for pair, dex_quotes in quotes.items():
+            if not dex_quotes:
+                continue
+            cached_prices.setdefault(pair, {}).update(dex_quotes)
+            changed_pairs[pair] = cached_prices[pair]
+        
+        logger.debug(f"Block {block_number} on {network}: re-quoted "
+                     f"{len(changed_pairs)} of {len(token_pairs)} pairs")
+        return changed_pairs
+    
     def _get_prices_across_dexes(self, network: str, token_a: str, token_b: str, network_dexes: Dict) -> Dict:
         """Get prices for a token pair across different DEXes"""
         # In a real implementation, this would query on-chain data
@@ -342,7 +645,8 @@ class NetworkScanner:
         
         return price
     
-    def _find_arbitrage_in_prices(self, network: str, token_a: str, token_b: str, dex_prices: Dict) -> List[Dict]:
+    def _find_arbitrage_in_prices(self, network: str, token_a: str, token_b: str,
+                                  dex_prices: Dict) -> List[Opportunity]:
         """Find arbitrage opportunities in the prices across DEXes"""
         opportunities = []
         
@@ -381,27 +685,27 @@ class NetworkScanner:
             
             # Only include if profitable after gas
             if potential_profit > 0:
-                opportunity_id = f"ARB-{network}-{self.opportunity_counter}"
-                self.opportunity_counter += 1
+                opportunity_id = self._next_opportunity_id(network)
                 
-                opportunity = {
-                    "id": opportunity_id,
-                    "network": network,
-                    "token_a": token_a,
-                    "token_b": token_b,
-                    "buy_dex": buy_dex,
-                    "sell_dex": sell_dex,
-                    "buy_price": buy_price,
-                    "sell_price": sell_price,
-                    "price_diff_pct": price_diff_pct,
-                    "trade_amount": trade_amount,
-                    "estimated_gas_cost": estimated_gas_cost,
-                    "potential_profit": potential_profit,
-                    "buy_router": dex_prices[buy_dex]["router_address"],
-                    "sell_router": dex_prices[sell_dex]["router_address"],
-                    "timestamp": datetime.now().isoformat(),
-                    "confidence": random.uniform(0.7, 0.95)  # Mock confidence score
-                }
+                opportunity = Opportunity(
+                    id=opportunity_id,
+                    network=network,
+                    token_a=token_a,
+                    token_b=token_b,
+                    buy_dex=buy_dex,
+                    sell_dex=sell_dex,
+                    buy_price=buy_price,
+                    sell_price=sell_price,
+                    price_diff_pct=price_diff_pct,
+                    trade_amount=trade_amount,
+                    estimated_gas_cost=estimated_gas_cost,
+                    potential_profit=potential_profit,
+                    buy_router=dex_prices[buy_dex]["router_address"],
+                    sell_router=dex_prices[sell_dex]["router_address"],
+                    buy_liquidity=best_buy_dex[1]["liquidity"],
+                    sell_liquidity=best_sell_dex[1]["liquidity"],
+                    confidence=random.uniform(0.7, 0.95)  # Mock confidence score
+                )
                 
                 opportunities.append(opportunity)
                 logger.info(f"Found arbitrage opportunity: {token_a}/{token_b} on {network}, "
@@ -410,6 +714,85 @@ class NetworkScanner:
         
         return opportunities
     
+    def _find_multi_hop_opportunities(self, network: str, prices_by_pair: Dict[tuple, Dict],
+                                      network_dexes: Dict) -> List[Opportunity]:
+        """
+        Find triangular and longer cycles across the network's DEX graph.
+        
+        Only the pairs in prices_by_pair are updated in the network's route
+        graph, so block-driven scans re-search just the changed part of it.
+        Routes are sized and priced in the base token, so only cycles through
+        it are reported, starting and ending there.
+        
+        Args:
+            network: Network the prices belong to
+            prices_by_pair: dex_prices dicts keyed by (token_a, token_b)
+            network_dexes: DEX configurations for the network (for fees)
+            
+        Returns:
+            List of multi-hop arbitrage opportunities
+        """
+        graph = self.route_graphs.setdefault(network, RouteGraph())
+        for (token_a, token_b), dex_prices in prices_by_pair.items():
+            for dex_name, quote in dex_prices.items():
+                fee = quote.get("fee", network_dexes.get(dex_name, {}).get("fee", 0.003))
+                graph.update_pair(token_a, token_b, dex_name, quote["price"], fee, quote.get("liquidity", 0.0))
+        
+        min_profit_threshold_pct = self.config.get("min_profit_threshold_pct", 0.5)
+        cycles = graph.find_cycles(max_hops=self.max_hops, min_hops=3, min_profit_pct=min_profit_threshold_pct)
+        
+        base_token = self.config.get("base_token", "ETH")
+        max_trade_size = self.config.get("risk_management", {}).get("max_trade_size", 10.0)
+        opportunities = []
+        
+        for cycle in cycles:
+            tokens = cycle["tokens"][:-1]
+            
+            # Size, gas and profit are in the base token, so the route must start from it
+            if base_token not in tokens:
+                continue
+            shift = tokens.index(base_token)
+            tokens = tokens[shift:] + tokens[:shift]
+            dexes = cycle["dexes"][shift:] + cycle["dexes"][:shift]
+            first_hop_liquidity = cycle["liquidities"][shift]
+            path = tokens + tokens[:1]
+            hops = len(dexes)
+            
+            trade_amount = min(first_hop_liquidity * 0.1, max_trade_size) if first_hop_liquidity else max_trade_size
+            # Gas grows roughly with the number of swaps (two-leg routes are the baseline)
+            estimated_gas_cost = self._estimate_gas_cost(network) * hops / 2
+            potential_profit = trade_amount * (cycle["rate"] - 1) - estimated_gas_cost
+            if potential_profit <= 0:
+                continue
+            
+            opportunity = Opportunity(
+                id=self._next_opportunity_id(network),
+                network=network,
+                route_type="multi_hop",
+                token_a=path[0],
+                token_b=path[1],
+                path=tuple(path),
+                dexes=tuple(dexes),
+                buy_dex=dexes[0],
+                sell_dex=dexes[-1],
+                buy_price=1.0,
+                sell_price=cycle["rate"],
+                price_diff_pct=(cycle["rate"] - 1) * 100,
+                trade_amount=trade_amount,
+                estimated_gas_cost=estimated_gas_cost,
+                potential_profit=potential_profit,
+                buy_router=network_dexes.get(dexes[0], {}).get("router_address"),
+                sell_router=network_dexes.get(dexes[-1], {}).get("router_address"),
+                confidence=random.uniform(0.7, 0.95)  # Mock confidence score
+            )
+            
+            opportunities.append(opportunity)
+            self._save_opportunity(opportunity)
+            logger.info(f"Found {hops}-hop arbitrage cycle on {network}: {' -> '.join(path)} "
+                        f"via {', '.join(dexes)}, potential profit: {potential_profit:.6f} {path[0]}")
+        
+        return opportunities
+    
     def _estimate_gas_cost(self, network: str) -> float:
         """Estimate gas cost for an arbitrage transaction on the specified network"""
         # In production, this would query the network for current gas prices
@@ -426,7 +809,7 @@ class NetworkScanner:
         
         return network_gas_costs.get(network, 0.01)  # Default to 0.01 ETH
     
-    def _generate_mock_opportunity(self, network: str) -> Dict:
+    def _generate_mock_opportunity(self, network: str) -> Opportunity:
         """Generate a mock arbitrage opportunity for testing"""
         # Token pairs to choose from
         token_pairs = [
@@ -465,37 +848,35 @@ class NetworkScanner:
         potential_profit = (trade_amount / buy_price) * (sell_price - buy_price) - estimated_gas_cost
         
         # Generate unique ID
-        opportunity_id = f"ARB-{network}-{self.opportunity_counter}"
-        self.opportunity_counter += 1
+        opportunity_id = self._next_opportunity_id(network)
         
         # Create opportunity object
-        opportunity = {
-            "id": opportunity_id,
-            "network": network,
-            "token_a": token_a,
-            "token_b": token_b,
-            "buy_dex": buy_dex,
-            "sell_dex": sell_dex,
-            "buy_price": buy_price,
-            "sell_price": sell_price,
-            "price_diff_pct": price_diff_pct,
-            "trade_amount": trade_amount,
-            "estimated_gas_cost": estimated_gas_cost,
-            "potential_profit": potential_profit,
-            "buy_router": f"0x{random.randint(0, 0xffffffff):08x}",  # Mock address
-            "sell_router": f"0x{random.randint(0, 0xffffffff):08x}",  # Mock address
-            "timestamp": datetime.now().isoformat(),
-            "confidence": random.uniform(0.7, 0.95),  # Mock confidence score
-            "status": "pending",
-            "execution_path": [
-                {"step": 1, "action": "swap", "from_token": token_a, "to_token": token_b, "dex": buy_dex},
-                {"step": 2, "action": "swap", "from_token": token_b, "to_token": token_a, "dex": sell_dex}
-            ],
-            "risk_score": random.uniform(0.1, 0.5),
-            "gas_price_gwei": random.uniform(10, 100),
-            "block_number": random.randint(10000000, 20000000),
-            "created_at": datetime.now().isoformat()
-        }
+        now = time.time()
+        opportunity = Opportunity(
+            id=opportunity_id,
+            network=network,
+            token_a=token_a,
+            token_b=token_b,
+            buy_dex=buy_dex,
+            sell_dex=sell_dex,
+            buy_price=buy_price,
+            sell_price=sell_price,
+            price_diff_pct=price_diff_pct,
+            trade_amount=trade_amount,
+            estimated_gas_cost=estimated_gas_cost,
+            potential_profit=potential_profit,
+            buy_router=f"0x{random.randint(0, 0xffffffff):08x}",  # Mock address
+            sell_router=f"0x{random.randint(0, 0xffffffff):08x}",  # Mock address
+            timestamp=now,
+            confidence=random.uniform(0.7, 0.95),  # Mock confidence score
+            status="pending",
+            # Two-leg route: buy token_a on buy_dex, sell it back on sell_dex
+            dexes=(buy_dex, sell_dex),
+            risk_score=random.uniform(0.1, 0.5),
+            gas_price_gwei=random.uniform(10, 100),
+            block_number=random.randint(10000000, 20000000),
+            created_at=now
+        )
         
         return opportunity
     
@@ -504,19 +885,21 @@ class NetworkScanner:
         current_time = time.time()
         expired_keys = []
         
-        for key, entry in self.price_cache.items():
+        # Snapshot the items since scan threads may still be writing to the cache
+        for key, entry in list(self.price_cache.items()):
             if current_time - entry["timestamp"] > self.price_cache_expiry:
                 expired_keys.append(key)
         
         for key in expired_keys:
-            del self.price_cache[key]
+            self.price_cache.pop(key, None)
             
         if expired_keys:
             logger.debug(f"Cleaned up {len(expired_keys)} expired price cache entries")
             
     def get_opportunities_from_db(self, network: Optional[str] = None, limit: int = 100, 
                                  min_profit: Optional[float] = None, 
-                                 token_pair: Optional[Tuple[str, str]] = None) -> List[Dict]:
+                                 token_pair: Optional[Tuple[str, str]] = None,
+                                 summary: bool = False) -> List[Dict]:
         """
         Retrieve arbitrage opportunities from the database.
         
@@ -525,47 +908,18 @@ class NetworkScanner:
             limit: Maximum number of opportunities to return
             min_profit: Minimum profit threshold
             token_pair: Optional token pair to filter by (tokenA, tokenB)
+            summary: Leave out the embedded details of each opportunity
             
         Returns:
             List of arbitrage opportunities from the database
         """
-        if not self.db_connector.is_connected():
-            logger.error("Cannot retrieve opportunities: Not connected to MongoDB")
-            return []
-            
-        try:
-            # Build query
-            query = {}
-            
-            if network:
-                query["network"] = network
-                
-            if min_profit:
-                query["expectedProfit"] = {"$gte": min_profit}
-                
-            if token_pair:
-                token_a, token_b = token_pair
-                query["tokenA"] = token_a
-                query["tokenB"] = token_b
-                
-            # Get opportunities from database
-            opportunities = list(self.db_connector.db.arbitrageopportunities.find(
-                query, 
-                sort=[("timestamp", -1)],
-                limit=limit
-            ))
-            
-            # Convert MongoDB ObjectId to string for JSON serialization
-            for opp in opportunities:
-                if "_id" in opp:
-                    opp["_id"] = str(opp["_id"])
-                    
-            logger.info(f"Retrieved {len(opportunities)} opportunities from database")
-            return opportunities
-            
-        except Exception as e:
-            logger.error(f"Error retrieving opportunities from database: {e}")
-            return []
+        return self.db_connector.get_opportunities_from_db(
+            network=network,
+            limit=limit,
+            min_profit=min_profit,
+            token_pair=token_pair,
+            summary=summary
+        )
             
     def update_opportunity_status(self, opportunity_id: str, status: str, 
                                  execution_result: Optional[Dict] = None) -> bool:
@@ -580,36 +934,7 @@ class NetworkScanner:
         Returns:
             True if updated successfully, False otherwise
         """
-        if not self.db_connector.is_connected():
-            logger.error("Cannot update opportunity: Not connected to MongoDB")
-            return False
-            
-        try:
-            # Build update document
-            update_doc = {
-                "status": status,
-                "updatedAt": datetime.now()
-            }
-            
-            if execution_result:
-                update_doc["executionResult"] = execution_result
-                
-            # Update opportunity in database
-            result = self.db_connector.db.arbitrageopportunities.update_one(
-                {"_id": opportunity_id},
-                {"$set": update_doc}
-            )
-            
-            if result.matched_count == 0:
-                logger.warning(f"Opportunity not found: {opportunity_id}")
-                return False
-                
-            logger.info(f"Updated opportunity {opportunity_id} status to {status}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error updating opportunity status: {e}")
-            return False
+        return self.db_connector.update_opportunity_status(opportunity_id, status, execution_result)
 
 # Example usage
 if __name__ == "__main__":
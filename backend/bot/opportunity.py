@@ -0,0 +1,467 @@
+"""
+Opportunity Module for ArbitrageX
+
+This module defines the compact records passed between the bot components
+in place of free-form dictionaries:
+- Opportunity: an arbitrage route found by the network scanner
+- TradeResult: the outcome of executing an opportunity
+
+Both are slotted dataclasses with float epoch timestamps and interned
+network, token and DEX names. They support item access (opportunity["id"],
+opportunity.get("confidence")) so code written against the dictionary
+format keeps working, and convert losslessly to and from the dictionary and
+MongoDB document schemas.
+"""
+
+import sys
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a short identifier so repeated names share one string object"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _to_epoch(value: Union[None, float, str, datetime]) -> Optional[float]:
+    """Convert an ISO string or datetime to a float epoch timestamp"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def _to_iso(value: Optional[float]) -> Optional[str]:
+    """Convert a float epoch timestamp to the ISO string used in dictionaries"""
+    return None if value is None else datetime.fromtimestamp(value).isoformat()
+
+
+def _to_datetime(value: Optional[float]) -> Optional[datetime]:
+    """Convert a float epoch timestamp to a datetime for MongoDB documents"""
+    return None if value is None else datetime.fromtimestamp(value)
+
+
+def _slotted(cls):
+    """
+    Rebuild a dataclass with ``__slots__`` for its fields.
+
+    dataclass(slots=True) needs Python 3.10; this does the same on 3.8. The
+    field defaults already live in the generated __init__, so the class
+    attributes holding them are dropped to make room for the slots.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+
+class _Record:
+    """
+    Dictionary-style access shared by the record types.
+
+    Subclasses list their timestamp fields in _TIME_FIELDS (exposed as ISO
+    strings through item access and to_dict), the fields always present in
+    the dictionary format in _REQUIRED_KEYS, and the fields holding
+    identifiers in _INTERNED_FIELDS. Fields in _HIDDEN_FIELDS are not part
+    of the dictionary format. Optional fields set to None are absent from the
+    dictionary format; unknown keys are kept in ``extra``.
+    """
+
+    __slots__ = ()
+
+    _HIDDEN_FIELDS: Tuple[str, ...] = ()
+    _TIME_FIELDS: Tuple[str, ...] = ()
+    _REQUIRED_KEYS: Tuple[str, ...] = ()
+    _INTERNED_FIELDS: Tuple[str, ...] = ()
+
+    @classmethod
+    def _field_names(cls) -> Tuple[str, ...]:
+        names = cls.__dict__.get("_FIELD_NAMES")
+        if names is None:
+            names = tuple(f.name for f in fields(cls) if f.name != "extra" and f.name not in cls._HIDDEN_FIELDS)
+            cls._FIELD_NAMES = names
+        return names
+
+    def _get_item(self, key: str) -> Any:
+        """Look up a dictionary key, raising KeyError if it is absent"""
+        if key in self._field_names():
+            value = getattr(self, key)
+            if value is None and key not in self._REQUIRED_KEYS:
+                raise KeyError(key)
+            return _to_iso(value) if key in self._TIME_FIELDS else value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._get_item(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._field_names():
+            if key in self._TIME_FIELDS:
+                value = _to_epoch(value)
+            elif key in self._INTERNED_FIELDS:
+                value = _intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self._get_item(key)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dictionary-style get"""
+        try:
+            return self._get_item(key)
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[str]:
+        """Keys of the dictionary format"""
+        return iter(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to its dictionary format"""
+        result = {}
+        for name in self._field_names():
+            value = getattr(self, name)
+            if value is None and name not in self._REQUIRED_KEYS:
+                continue
+            result[name] = _to_iso(value) if name in self._TIME_FIELDS else value
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+    @classmethod
+    def _kwargs_from_dict(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Split a dictionary into constructor arguments and extra keys"""
+        names = cls._field_names()
+        kwargs: Dict[str, Any] = {}
+        extra: Dict[str, Any] = {}
+        for key, value in data.items():
+            if key not in names:
+                extra[key] = value
+            elif key in cls._TIME_FIELDS:
+                kwargs[key] = _to_epoch(value)
+            elif key in cls._INTERNED_FIELDS:
+                kwargs[key] = _intern(value)
+            else:
+                kwargs[key] = value
+        kwargs["extra"] = extra or None
+        return kwargs
+
+
+@_slotted
+@dataclass(eq=False)
+class Opportunity(_Record):
+    """
+    An arbitrage opportunity found by the network scanner.
+
+    Two-leg routes buy token_a with token_b on buy_dex and sell it back on
+    sell_dex. Multi-hop routes also set ``path`` (closed token path) and
+    ``dexes`` (one DEX per hop); the dictionary format's execution_path is
+    generated from them instead of being stored.
+    """
+
+    id: str
+    network: str
+    token_a: str
+    token_b: str
+    buy_dex: str
+    sell_dex: str
+    buy_price: float
+    sell_price: float
+    price_diff_pct: float
+    trade_amount: float
+    estimated_gas_cost: float
+    potential_profit: float
+    buy_router: Optional[str] = None
+    sell_router: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+    confidence: Optional[float] = None
+    route_type: Optional[str] = None
+    path: Optional[Tuple[str, ...]] = None
+    dexes: Optional[Tuple[str, ...]] = None
+    buy_liquidity: Optional[float] = None
+    sell_liquidity: Optional[float] = None
+    block_number: Optional[int] = None
+    status: Optional[str] = None
+    risk_score: Optional[float] = None
+    gas_price_gwei: Optional[float] = None
+    ai_confidence: Optional[float] = None
+    created_at: Optional[float] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    _HIDDEN_FIELDS = ("dexes",)
+    _TIME_FIELDS = ("timestamp", "created_at")
+    _REQUIRED_KEYS = (
+        "id", "network", "token_a", "token_b", "buy_dex", "sell_dex", "buy_price", "sell_price",
+        "price_diff_pct", "trade_amount", "estimated_gas_cost", "potential_profit",
+        "buy_router", "sell_router", "timestamp", "confidence"
+    )
+    _INTERNED_FIELDS = (
+        "network", "token_a", "token_b", "buy_dex", "sell_dex", "buy_router", "sell_router",
+        "route_type", "status"
+    )
+
+    def __post_init__(self):
+        self.network = _intern(self.network)
+        self.token_a = _intern(self.token_a)
+        self.token_b = _intern(self.token_b)
+        self.buy_dex = _intern(self.buy_dex)
+        self.sell_dex = _intern(self.sell_dex)
+        if self.path is not None:
+            self.path = tuple(_intern(token) for token in self.path)
+        if self.dexes is not None:
+            self.dexes = tuple(_intern(dex) for dex in self.dexes)
+
+    @property
+    def execution_path(self) -> Optional[List[Dict[str, Any]]]:
+        """Swap steps of the route, or None if the route has no explicit steps"""
+        if self.dexes is None:
+            return None
+        path = self.path or (self.token_a, self.token_b, self.token_a)
+        return [
+            {"step": step + 1, "action": "swap", "from_token": path[step],
+             "to_token": path[step + 1], "dex": dex}
+            for step, dex in enumerate(self.dexes)
+        ]
+
+    @property
+    def hops(self) -> int:
+        """Number of swaps in the route"""
+        return len(self.dexes) if self.dexes is not None else 2
+
+    def _get_item(self, key: str) -> Any:
+        if key == "execution_path":
+            steps = self.execution_path
+            if steps is None:
+                if self.extra and key in self.extra:
+                    return self.extra[key]
+                raise KeyError(key)
+            return steps
+        if key == "path" and self.path is not None:
+            return list(self.path)
+        return _Record._get_item(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key == "path":
+            self.path = tuple(_intern(token) for token in value) if value is not None else None
+        elif key == "execution_path":
+            self.dexes = None
+            if self.extra:
+                self.extra.pop(key, None)
+            self._set_execution_path(value)
+        else:
+            _Record.__setitem__(self, key, value)
+
+    def _set_execution_path(self, steps: Optional[List[Dict[str, Any]]]):
+        """Store execution steps as a DEX tuple when they match the route, else verbatim"""
+        if steps is None:
+            return
+        dexes = tuple(_intern(step.get("dex")) for step in steps)
+        self.dexes = dexes
+        if self.execution_path != steps:
+            self.dexes = None
+            if self.extra is None:
+                self.extra = {}
+            self.extra["execution_path"] = steps
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the opportunity to the dictionary format used by the scanner.
+
+        Returns:
+            Dictionary with ISO-string timestamps and, for routes with
+            explicit steps, an execution_path list
+        """
+        result = _Record.to_dict(self)
+        if self.path is not None:
+            result["path"] = list(self.path)
+        if self.dexes is not None:
+            result["execution_path"] = self.execution_path
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Union[Dict[str, Any], "Opportunity"]) -> "Opportunity":
+        """
+        Create an opportunity from its dictionary format.
+
+        Args:
+            data: Opportunity dictionary (an Opportunity is returned as is)
+
+        Returns:
+            Opportunity holding every key of the dictionary
+        """
+        if isinstance(data, Opportunity):
+            return data
+
+        data = dict(data)
+        steps = data.pop("execution_path", None)
+        opportunity = cls(**cls._kwargs_from_dict(data))
+        opportunity._set_execution_path(steps)
+        return opportunity
+
+    def to_mongo(self) -> Dict[str, Any]:
+        """
+        Convert the opportunity to an arbitrageopportunities document.
+
+        Returns:
+            Document with the summary fields queried by the API and the full
+            opportunity under "details"
+        """
+        return {
+            "tokenA": self.token_a,
+            "tokenB": self.token_b,
+            "route": [
+                {"exchange": self.buy_dex, "action": "buy", "price": self.buy_price},
+                {"exchange": self.sell_dex, "action": "sell", "price": self.sell_price}
+            ],
+            "expectedProfit": self.potential_profit,
+            "network": self.network,
+            "confidence": self.confidence,
+            "timestamp": _to_datetime(self.timestamp),
+            "details": self.to_dict()
+        }
+
+    @classmethod
+    def from_mongo(cls, document: Dict[str, Any]) -> "Opportunity":
+        """
+        Create an opportunity from an arbitrageopportunities document.
+
+        Args:
+            document: MongoDB document as written by to_mongo
+
+        Returns:
+            Opportunity rebuilt from the document's details, or from its
+            summary fields for documents without details
+        """
+        if document.get("details"):
+            return cls.from_dict(document["details"])
+
+        route = document.get("route") or [{}, {}]
+        buy_leg, sell_leg = route[0], route[-1]
+        buy_price = buy_leg.get("price", 0.0)
+        sell_price = sell_leg.get("price", 0.0)
+        return cls(
+            id=str(document.get("_id", "")),
+            network=document.get("network", ""),
+            token_a=document.get("tokenA", ""),
+            token_b=document.get("tokenB", ""),
+            buy_dex=buy_leg.get("exchange", ""),
+            sell_dex=sell_leg.get("exchange", ""),
+            buy_price=buy_price,
+            sell_price=sell_price,
+            price_diff_pct=(sell_price - buy_price) / buy_price * 100 if buy_price else 0.0,
+            trade_amount=document.get("amount", 0.0),
+            estimated_gas_cost=document.get("gasCost", 0.0),
+            potential_profit=document.get("expectedProfit", 0.0),
+            timestamp=_to_epoch(document.get("timestamp")) or time.time(),
+            confidence=document.get("confidence")
+        )
+
+
+@_slotted
+@dataclass(eq=False)
+class TradeResult(_Record):
+    """
+    The outcome of executing an arbitrage opportunity.
+    """
+
+    success: bool
+    opportunity_id: Optional[str] = None
+    transaction_hash: Optional[str] = None
+    expected_profit: Optional[float] = None
+    actual_profit: Optional[float] = None
+    profit: Optional[float] = None
+    gas_cost: Optional[float] = None
+    execution_time: Optional[float] = None
+    slippage: Optional[float] = None
+    error: Optional[str] = None
+    timestamp: Optional[float] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    _TIME_FIELDS = ("timestamp",)
+    _REQUIRED_KEYS = ("success", "opportunity_id")
+    _INTERNED_FIELDS = ("error",)
+
+    @classmethod
+    def from_dict(cls, data: Union[Dict[str, Any], "TradeResult"]) -> "TradeResult":
+        """
+        Create a trade result from its dictionary format.
+
+        Args:
+            data: Trade result dictionary (a TradeResult is returned as is)
+
+        Returns:
+            TradeResult holding every key of the dictionary
+        """
+        if isinstance(data, TradeResult):
+            return data
+        return cls(**cls._kwargs_from_dict(data))
+
+    def to_mongo(self, opportunity: Optional[Opportunity] = None) -> Dict[str, Any]:
+        """
+        Convert the trade result to a trades document.
+
+        Args:
+            opportunity: Executed opportunity, for the token and amount fields
+
+        Returns:
+            Document with the summary fields of the trades collection and
+            the full result under "details"
+        """
+        document = {
+            "type": "arbitrage",
+            "success": self.success,
+            "profit": self.profit if self.profit is not None else 0.0,
+            "gasCost": self.gas_cost,
+            "txHash": self.transaction_hash,
+            "opportunityId": self.opportunity_id,
+            "timestamp": _to_datetime(self.timestamp),
+            "details": self.to_dict()
+        }
+        if opportunity is not None:
+            document.update({
+                "tokenA": opportunity.token_a,
+                "tokenB": opportunity.token_b,
+                "amount": opportunity.trade_amount,
+                "network": opportunity.network
+            })
+        return document
+
+    @classmethod
+    def from_mongo(cls, document: Dict[str, Any]) -> "TradeResult":
+        """
+        Create a trade result from a trades document.
+
+        Args:
+            document: MongoDB document as written by to_mongo
+
+        Returns:
+            TradeResult rebuilt from the document's details, or from its
+            summary fields for documents without details
+        """
+        if document.get("details"):
+            return cls.from_dict(document["details"])
+
+        return cls(
+            success=document.get("success", False),
+            opportunity_id=document.get("opportunityId"),
+            transaction_hash=document.get("txHash"),
+            profit=document.get("profit"),
+            gas_cost=document.get("gasCost"),
+            timestamp=_to_epoch(document.get("timestamp"))
+        )
@@ -0,0 +1,286 @@
+"""
+Opportunity Queue Module for ArbitrageX
+
+This module provides the bounded priority queue that hands opportunities from
+the network scanner to the trade executors. Opportunities are ordered by net
+expected profit per unit of gas, expire by age or block, are de-duplicated per
+route, and the lowest-value entry is evicted when the queue is full.
+"""
+
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from backend.bot.opportunity import Opportunity
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("opportunity_queue.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("OpportunityQueue")
+
+
+class _Entry:
+    """Queue slot for one opportunity; removed entries stay in the heaps until popped"""
+
+    __slots__ = ("score", "sequence", "key", "opportunity", "enqueued_at", "removed")
+
+    def __init__(self, score: float, sequence: int, key: Tuple, opportunity: Opportunity):
+        self.score = score
+        self.sequence = sequence
+        self.key = key
+        self.opportunity = opportunity
+        self.enqueued_at = time.time()
+        self.removed = False
+
+
+class OpportunityQueue:
+    """
+    Thread-safe bounded priority queue of arbitrage opportunities.
+
+    The best entry is found through a max-heap and the eviction candidate
+    through a min-heap over the same entries; replaced, evicted and expired
+    entries are flagged and skipped lazily when they reach the top of a heap.
+    """
+
+    def __init__(self, maxsize: int = 100, ttl: float = 30.0, max_block_age: int = 2,
+                 block_source: Optional[Callable[[str], Optional[int]]] = None):
+        """
+        Initialize the opportunity queue.
+
+        Args:
+            maxsize: Maximum number of queued opportunities
+            ttl: Seconds after which an opportunity without a known block expires
+            max_block_age: Blocks after which an opportunity tagged with a block expires
+            block_source: Function returning the latest block seen on a network
+                (or None if unknown)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_block_age = max_block_age
+        self.block_source = block_source
+
+        self._best: List[Tuple[float, int, _Entry]] = []
+        self._worst: List[Tuple[float, int, _Entry]] = []
+        self._entries: Dict[Tuple, _Entry] = {}
+        self._sequence = itertools.count()
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+
+        self.metrics = {
+            "enqueued": 0,
+            "dequeued": 0,
+            "replaced": 0,
+            "evicted": 0,
+            "rejected": 0,
+            "expired": 0,
+            "max_depth": 0,
+            "avg_wait_time": None
+        }
+
+    @staticmethod
+    def score(opportunity: Opportunity) -> float:
+        """Net expected profit per unit of gas cost"""
+        return opportunity.potential_profit / max(opportunity.estimated_gas_cost, 1e-12)
+
+    @staticmethod
+    def route_key(opportunity: Opportunity) -> Tuple:
+        """Identify the pair and route of an opportunity for de-duplication"""
+        path = opportunity.path or (opportunity.token_a, opportunity.token_b)
+        dexes = opportunity.dexes or (opportunity.buy_dex, opportunity.sell_dex)
+        return opportunity.network, path, dexes
+
+    def is_expired(self, opportunity: Opportunity, now: Optional[float] = None) -> bool:
+        """
+        Check whether an opportunity is too old to execute.
+
+        Opportunities tagged with a block expire once the latest block on
+        their network is more than max_block_age blocks newer; others once
+        they are older than ttl seconds.
+
+        Args:
+            opportunity: Opportunity to check
+            now: Current time (defaults to time.time())
+
+        Returns:
+            True if the opportunity has expired
+        """
+        if opportunity.block_number is not None and self.block_source is not None:
+            latest_block = self.block_source(opportunity.network)
+            if latest_block is not None:
+                return latest_block - opportunity.block_number > self.max_block_age
+
+        now = time.time() if now is None else now
+        return now - opportunity.timestamp > self.ttl
+
+    def put(self, opportunity: Opportunity) -> bool:
+        """
+        Add an opportunity, replacing any queued one for the same route.
+
+        Opportunities that have already expired are not queued. When the
+        queue is full, expired entries are dropped first; if it is still
+        full the lowest-value entry is evicted, unless the new opportunity
+        is worth less than it.
+
+        Args:
+            opportunity: Opportunity to queue
+
+        Returns:
+            True if the opportunity was queued
+        """
+        if self.is_expired(opportunity):
+            with self._lock:
+                self.metrics["expired"] += 1
+            return False
+
+        score = self.score(opportunity)
+        key = self.route_key(opportunity)
+
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                # Same route seen again - the newer quote supersedes the queued one
+                existing.removed = True
+                self.metrics["replaced"] += 1
+            elif len(self._entries) >= self.maxsize:
+                self._purge_expired()
+                if len(self._entries) >= self.maxsize:
+                    worst = self._peek_worst()
+                    if worst is None or score <= worst.score:
+                        self.metrics["rejected"] += 1
+                        logger.debug(f"Queue full, rejected opportunity {opportunity.id}")
+                        return False
+                    self._remove(worst)
+                    self.metrics["evicted"] += 1
+                    logger.debug(f"Queue full, evicted opportunity {worst.opportunity.id} "
+                                 f"for {opportunity.id}")
+
+            entry = _Entry(score, next(self._sequence), key, opportunity)
+            self._entries[key] = entry
+            heapq.heappush(self._best, (-score, entry.sequence, entry))
+            heapq.heappush(self._worst, (score, entry.sequence, entry))
+
+            self.metrics["enqueued"] += 1
+            self.metrics["max_depth"] = max(self.metrics["max_depth"], len(self._entries))
+            self._compact()
+            self._not_empty.notify()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Opportunity:
+        """
+        Remove and return the highest-value opportunity that has not expired.
+
+        Args:
+            timeout: Seconds to wait for an opportunity (None waits forever)
+
+        Returns:
+            The best queued opportunity
+
+        Raises:
+            queue.Empty: If no opportunity became available within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._not_empty:
+            while True:
+                now = time.time()
+                while self._best:
+                    _, _, entry = heapq.heappop(self._best)
+                    if entry.removed:
+                        continue
+                    self._remove(entry)
+                    if self.is_expired(entry.opportunity, now):
+                        self.metrics["expired"] += 1
+                        logger.debug(f"Dropped expired opportunity {entry.opportunity.id}")
+                        continue
+                    self._record_dispatch(entry, now)
+                    return entry.opportunity
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._not_empty.wait(remaining)
+
+    def qsize(self) -> int:
+        """Number of queued opportunities (expired ones included until dropped)"""
+        with self._lock:
+            return len(self._entries)
+
+    def empty(self) -> bool:
+        """Check whether the queue is empty"""
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """Check whether the queue is at capacity"""
+        return self.qsize() >= self.maxsize
+
+    def get_metrics(self) -> Dict:
+        """
+        Get queue depth, age and throughput metrics.
+
+        Returns:
+            Dictionary with the current depth, capacity, the age of the oldest
+            and average queued opportunity, and cumulative counters
+        """
+        with self._lock:
+            now = time.time()
+            ages = [now - entry.opportunity.timestamp for entry in self._entries.values()]
+            metrics = dict(self.metrics)
+
+        metrics.update({
+            "depth": len(ages),
+            "maxsize": self.maxsize,
+            "oldest_age": max(ages) if ages else None,
+            "avg_age": sum(ages) / len(ages) if ages else None
+        })
+        return metrics
+
+    def _remove(self, entry: _Entry):
+        """Take an entry out of the queue (its heap slots are skipped later)"""
+        entry.removed = True
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+
+    def _peek_worst(self) -> Optional[_Entry]:
+        """Lowest-value live entry"""
+        while self._worst:
+            _, _, entry = self._worst[0]
+            if not entry.removed:
+                return entry
+            heapq.heappop(self._worst)
+        return None
+
+    def _purge_expired(self):
+        """Drop every expired entry"""
+        now = time.time()
+        for entry in list(self._entries.values()):
+            if self.is_expired(entry.opportunity, now):
+                self._remove(entry)
+                self.metrics["expired"] += 1
+
+    def _compact(self):
+        """Rebuild the heaps when removed entries dominate them"""
+        if len(self._best) + len(self._worst) > 4 * len(self._entries) + 32:
+            self._best = [item for item in self._best if not item[2].removed]
+            self._worst = [item for item in self._worst if not item[2].removed]
+            heapq.heapify(self._best)
+            heapq.heapify(self._worst)
+
+    def _record_dispatch(self, entry: _Entry, now: float):
+        """Update dequeue counters and the average time spent queued"""
+        self.metrics["dequeued"] += 1
+        wait_time = now - entry.enqueued_at
+        if self.metrics["avg_wait_time"] is None:
+            self.metrics["avg_wait_time"] = wait_time
+        else:
+            # Exponential moving average so recent load dominates
+            self.metrics["avg_wait_time"] = 0.8 * self.metrics["avg_wait_time"] + 0.2 * wait_time
@@ -13,10 +13,13 @@ to determine their profitability, taking into account factors such as:
 import logging
 import json
 import time
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Union, Any, Tuple
 from datetime import datetime
 import random
 import math
+import numpy as np
+from backend.bot.amm_math import optimal_arbitrage_v2
+from backend.bot.opportunity import Opportunity
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +32,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ProfitAnalyzer")
 
+# Risk adjustments by network (some networks are riskier than others)
+NETWORK_RISK = {
+    "ethereum": -5,  # Less risky (more established)
+    "arbitrum": 0,
+    "polygon": 5,
+    "optimism": 0,
+    "bsc": 10  # More risky
+}
+
+# Risk adjustments by DEX (some DEXes are riskier than others)
+DEX_RISK = {
+    "uniswap_v3": -10,  # Less risky
+    "uniswap_v2": -5,
+    "sushiswap": 0,
+    "curve": -8,
+    "balancer": 0,
+    "quickswap": 5,
+    "pancakeswap": 8,
+    "biswap": 10,
+    "velodrome": 5
+}
+
+# Columns analyze_batch needs from each opportunity
+BATCH_COLUMNS = [
+    "network", "buy_dex", "sell_dex", "buy_price", "sell_price",
+    "trade_amount", "estimated_gas_cost"
+]
+
 class ProfitAnalyzer:
     """
     Analyzes arbitrage opportunities to determine profitability.
@@ -118,12 +149,12 @@ class ProfitAnalyzer:
                 "default": {"mean": 0.3, "std_dev": 0.15}
             }
     
-    def analyze_opportunity(self, opportunity: Dict) -> Dict:
+    def analyze_opportunity(self, opportunity: Union[Dict, Opportunity]) -> Dict:
         """
         Analyze an arbitrage opportunity to determine profitability.
         
         Args:
-            opportunity: Dictionary containing arbitrage opportunity details
+            opportunity: Opportunity record or dictionary with the opportunity details
             
         Returns:
             Dictionary with profitability analysis results
@@ -222,6 +253,141 @@ class ProfitAnalyzer:
         
         return result
     
+    def analyze_batch(self, batch: Any, rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+        """
+        Analyze a columnar batch of arbitrage opportunities in one vectorized pass.
+        
+        Applies the same fee, slippage, profit, ROI and risk model as
+        analyze_opportunity to every row at once. Slippage noise is drawn from
+        the same per-network/per-exchange normal distributions.
+        
+        Args:
+            batch: pandas DataFrame, NumPy structured array or dict of columns
+                with at least the fields in BATCH_COLUMNS
+            rng: Optional NumPy random generator for the slippage noise
+            
+        Returns:
+            Dictionary of NumPy arrays keyed like analyze_opportunity's result,
+            plus "slippage_exceeded". Profit, price and risk columns are NaN for
+            rows rejected on slippage, matching the fields the scalar path omits.
+        """
+        rng = rng or np.random.default_rng()
+        
+        buy_price = np.asarray(batch["buy_price"], dtype=float)
+        sell_price = np.asarray(batch["sell_price"], dtype=float)
+        trade_amount = np.asarray(batch["trade_amount"], dtype=float)
+        estimated_gas_cost = np.asarray(batch["estimated_gas_cost"], dtype=float)
+        
+        # Encode networks and exchanges once; every per-key table is indexed by these codes
+        networks, network_idx = np.unique(np.asarray(batch["network"]).astype(str), return_inverse=True)
+        dexes, dex_idx = np.unique(
+            np.concatenate([np.asarray(batch["buy_dex"]).astype(str), np.asarray(batch["sell_dex"]).astype(str)]),
+            return_inverse=True
+        )
+        network_idx = network_idx.reshape(-1)
+        buy_idx, sell_idx = np.split(dex_idx.reshape(-1), 2)
+        
+        # Calculate exchange fees
+        fee_table = np.array([self._get_exchange_fee(dex) for dex in dexes], dtype=float)
+        buy_fee = fee_table[buy_idx]
+        sell_fee = fee_table[sell_idx]
+        
+        # Calculate expected slippage
+        slippage_mean, slippage_std = self._slippage_tables(networks, dexes)
+        size_factor = self._slippage_size_factor(trade_amount)
+        buy_slippage = np.maximum(0, rng.normal(slippage_mean[network_idx, buy_idx],
+                                                slippage_std[network_idx, buy_idx]) * size_factor)
+        sell_slippage = np.maximum(0, rng.normal(slippage_mean[network_idx, sell_idx],
+                                                 slippage_std[network_idx, sell_idx]) * size_factor)
+        total_slippage_pct = buy_slippage + sell_slippage
+        slippage_exceeded = total_slippage_pct > self.max_slippage
+        
+        # Calculate effective prices after slippage
+        effective_buy_price = buy_price * (1 + buy_slippage / 100)
+        effective_sell_price = sell_price * (1 - sell_slippage / 100)
+        
+        # Amounts received after each leg, accounting for fees
+        amount_bought = (trade_amount / effective_buy_price) * (1 - buy_fee)
+        amount_received = amount_bought * effective_sell_price * (1 - sell_fee)
+        
+        gross_profit = amount_received - trade_amount
+        net_profit = gross_profit - estimated_gas_cost
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roi = np.where(trade_amount > 0, net_profit / trade_amount * 100, 0.0)
+        
+        is_profitable = (net_profit >= self.min_profit_threshold) & ~slippage_exceeded
+        
+        # Calculate risk score (same adjustments as _calculate_risk_score)
+        network_risk = np.array([NETWORK_RISK.get(net, 0) for net in networks], dtype=float)
+        dex_risk = np.array([DEX_RISK.get(dex, 0) for dex in dexes], dtype=float)
+        risk_score = 50 + network_risk[network_idx] + dex_risk[buy_idx] / 2 + dex_risk[sell_idx] / 2
+        risk_score += np.select(
+            [total_slippage_pct < 0.1, total_slippage_pct < 0.3, total_slippage_pct > 0.8, total_slippage_pct > 0.5],
+            [-10, -5, 15, 10],
+            default=0
+        )
+        risk_score += np.select([roi > 5, roi > 2, roi < 0.5], [10, 5, -5], default=0)
+        risk_score += np.select(
+            [net_profit < 0.001, net_profit < 0.005, net_profit > 0.05, net_profit > 0.02],
+            [15, 5, -10, -5],
+            default=0
+        )
+        risk_score = np.clip(risk_score, 0, 100)
+        confidence_score = 1 - (risk_score / 100)
+        
+        result = {
+            "is_profitable": is_profitable,
+            "slippage_exceeded": slippage_exceeded,
+            "gross_profit": gross_profit,
+            "net_profit": net_profit,
+            "roi_pct": roi,
+            "estimated_slippage_pct": total_slippage_pct,
+            "buy_slippage_pct": buy_slippage,
+            "sell_slippage_pct": sell_slippage,
+            "buy_fee_pct": buy_fee * 100,
+            "sell_fee_pct": sell_fee * 100,
+            "effective_buy_price": effective_buy_price,
+            "effective_sell_price": effective_sell_price,
+            "amount_bought": amount_bought,
+            "amount_received": amount_received,
+            "risk_score": risk_score,
+            "confidence_score": confidence_score
+        }
+        
+        # The scalar path stops before computing these for rejected rows
+        for key in ("gross_profit", "net_profit", "roi_pct", "effective_buy_price", "effective_sell_price",
+                    "amount_bought", "amount_received", "risk_score", "confidence_score"):
+            result[key] = np.where(slippage_exceeded, np.nan, result[key])
+        
+        logger.debug(f"Analyzed batch of {len(trade_amount)} opportunities, "
+                     f"{int(is_profitable.sum())} profitable")
+        
+        return result
+    
+    def _slippage_tables(self, networks: np.ndarray, dexes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean and std dev of historical slippage for every (network, exchange) combination"""
+        mean = np.empty((len(networks), len(dexes)))
+        std_dev = np.empty((len(networks), len(dexes)))
+        
+        for n, network in enumerate(networks):
+            network_data = self.historical_slippage.get(network, self.historical_slippage.get("default"))
+            for d, dex in enumerate(dexes):
+                exchange_data = network_data.get(dex, network_data.get("default", {"mean": 0.3, "std_dev": 0.15}))
+                mean[n, d] = exchange_data["mean"]
+                std_dev[n, d] = exchange_data["std_dev"]
+        
+        return mean, std_dev
+    
+    @staticmethod
+    def _slippage_size_factor(amount: np.ndarray) -> np.ndarray:
+        """Vectorized trade-size adjustment from _estimate_slippage"""
+        return np.select(
+            [amount <= 0.1, amount <= 1.0, amount <= 5.0],
+            [0.5, 1.0, 2.0],
+            default=3.0
+        )
+    
     def _get_exchange_fee(self, exchange: str) -> float:
         """Get the fee rate for a specific exchange"""
         return self.exchange_fees.get(exchange, self.exchange_fees.get("default", 0.003))
@@ -276,29 +442,11 @@ class ProfitAnalyzer:
         risk_score = 50
         
         # Adjust for network (some networks are riskier than others)
-        network_risk = {
-            "ethereum": -5,  # Less risky (more established)
-            "arbitrum": 0,
-            "polygon": 5,
-            "optimism": 0,
-            "bsc": 10  # More risky
-        }
-        risk_score += network_risk.get(network, 0)
+        risk_score += NETWORK_RISK.get(network, 0)
         
         # Adjust for DEXes (some DEXes are riskier than others)
-        dex_risk = {
-            "uniswap_v3": -10,  # Less risky
-            "uniswap_v2": -5,
-            "sushiswap": 0,
-            "curve": -8,
-            "balancer": 0,
-            "quickswap": 5,
-            "pancakeswap": 8,
-            "biswap": 10,
-            "velodrome": 5
-        }
-        risk_score += dex_risk.get(buy_dex, 0) / 2
-        risk_score += dex_risk.get(sell_dex, 0) / 2
+        risk_score += DEX_RISK.get(buy_dex, 0) / 2
+        risk_score += DEX_RISK.get(sell_dex, 0) / 2
         
         # Adjust for slippage (higher slippage = higher risk)
         if slippage < 0.1:
@@ -333,15 +481,20 @@ class ProfitAnalyzer:
         
         return risk_score
     
-    def estimate_optimal_trade_size(self, opportunity: Dict) -> float:
+    def estimate_optimal_trade_size(self, opportunity: Union[Dict, Opportunity]) -> float:
         """
         Estimate the optimal trade size for an arbitrage opportunity.
         
+        When the opportunity carries pool liquidity for both legs, the size
+        that maximizes profit through the two pools is solved in closed form;
+        otherwise a heuristic based on the price difference is used.
+        
         Args:
-            opportunity: Dictionary containing arbitrage opportunity details
+            opportunity: Opportunity record or dictionary with the opportunity details
             
         Returns:
-            Optimal trade size in ETH
+            Optimal trade size in ETH, measured as an amount of token_a like
+            the opportunity's trade_amount
         """
         # Extract opportunity details
         network = opportunity["network"]
@@ -353,6 +506,21 @@ class ProfitAnalyzer:
         # Get maximum trade size from config
         max_trade_size = self.config.get("risk_management", {}).get("max_trade_size", 10.0)
         
+        buy_liquidity = opportunity.get("buy_liquidity")
+        sell_liquidity = opportunity.get("sell_liquidity")
+        if buy_liquidity and sell_liquidity:
+            # Spend token_b on the buy pool for token_a, then sell token_a back
+            # into the sell pool; liquidity is the token_a side of each pool
+            optimal_input, _ = optimal_arbitrage_v2(
+                buy_liquidity * buy_price, buy_liquidity,
+                sell_liquidity, sell_liquidity * sell_price,
+                self._get_exchange_fee(buy_dex), self._get_exchange_fee(sell_dex)
+            )
+            # The optimal input is spent in token_b; size the trade in token_a
+            optimal_size = min(optimal_input / buy_price, max_trade_size)
+            logger.info(f"Estimated optimal trade size for opportunity {opportunity['id']}: {optimal_size:.4f} ETH")
+            return optimal_size
+        
         # Calculate price difference percentage
         price_diff_pct = ((sell_price - buy_price) / buy_price) * 100
         
@@ -0,0 +1,242 @@
+"""
+Route Graph Module for ArbitrageX
+
+This module finds multi-hop arbitrage cycles across the DEXes of a network.
+Tokens are nodes and pool quotes are directed edges weighted by
+-log(rate * (1 - fee)), so a profitable cycle is a negative-weight cycle.
+Cycles of up to ``max_hops`` edges are found with a vectorized, hop-bounded
+Bellman-Ford (min-plus matrix products over a NumPy adjacency matrix).
+"""
+
+import logging
+import math
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("route_graph.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("RouteGraph")
+
+
+class RouteGraph:
+    """
+    Directed token graph holding the best quote per (token_in, token_out)
+    across all DEXes, with incremental edge updates and cached cycle search.
+    """
+
+    def __init__(self, capacity: int = 32):
+        """
+        Initialize an empty route graph.
+
+        Args:
+            capacity: Initial number of token slots in the adjacency matrix
+        """
+        self.token_index: Dict[str, int] = {}
+        self.tokens: List[str] = []
+
+        # Best edge weight (-log effective rate) and its source, per token pair
+        self.weights = np.full((capacity, capacity), np.inf)
+        self.edge_dex: Dict[Tuple[int, int], str] = {}
+        self.edge_liquidity: Dict[Tuple[int, int], float] = {}
+
+        # Every DEX quote per directed edge: {(i, j): {dex: (weight, liquidity)}}
+        self.quotes: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = {}
+
+        # Nodes whose outgoing or incoming edges changed since the last search
+        self.dirty_nodes: Set[int] = set()
+        # Cycles found by previous searches, keyed by canonical node tuple
+        self.cycles: Dict[Tuple[int, ...], Dict] = {}
+        self._search_params: Optional[Tuple[int, int, float]] = None
+
+    def _get_index(self, token: str) -> int:
+        """Get the node index for a token, growing the matrix if needed"""
+        index = self.token_index.get(token)
+        if index is not None:
+            return index
+
+        index = len(self.tokens)
+        self.token_index[token] = index
+        self.tokens.append(token)
+
+        if index >= self.weights.shape[0]:
+            size = self.weights.shape[0] * 2
+            weights = np.full((size, size), np.inf)
+            weights[:index, :index] = self.weights[:index, :index]
+            self.weights = weights
+
+        return index
+
+    def update_pair(self, token_a: str, token_b: str, dex: str, price: float,
+                    fee: float, liquidity: float = 0.0):
+        """
+        Update both directed edges of a pool quote.
+
+        Args:
+            token_a: Base token of the pair
+            token_b: Quote token of the pair
+            dex: DEX the quote comes from
+            price: Price of token_a in token_b
+            fee: Pool fee as a fraction (e.g., 0.003)
+            liquidity: Available liquidity in token_a units
+        """
+        if price <= 0 or fee >= 1:
+            return
+
+        i = self._get_index(token_a)
+        j = self._get_index(token_b)
+        keep = 1 - fee
+
+        self._set_quote(i, j, dex, -math.log(price * keep), liquidity)
+        self._set_quote(j, i, dex, -math.log(keep / price), liquidity * price)
+
+    def _set_quote(self, i: int, j: int, dex: str, weight: float, liquidity: float):
+        """Store a DEX quote for edge i->j and refresh the best edge"""
+        edge_quotes = self.quotes.setdefault((i, j), {})
+        edge_quotes[dex] = (weight, liquidity)
+
+        best_dex, (best_weight, best_liquidity) = min(edge_quotes.items(), key=lambda item: item[1][0])
+        if self.weights[i, j] != best_weight or self.edge_dex.get((i, j)) != best_dex:
+            self.weights[i, j] = best_weight
+            self.edge_dex[(i, j)] = best_dex
+            self.dirty_nodes.update((i, j))
+        self.edge_liquidity[(i, j)] = best_liquidity
+
+    def find_cycles(self, max_hops: int = 3, min_hops: int = 2,
+                    min_profit_pct: float = 0.0) -> List[Dict]:
+        """
+        Find profitable cycles of min_hops..max_hops edges.
+
+        Only cycles through nodes with changed edges are re-searched; cached
+        cycles elsewhere are kept (see get_cycles) since none of their edges
+        moved, but are not returned again.
+
+        Args:
+            max_hops: Maximum number of swaps in a cycle
+            min_hops: Minimum number of swaps in a cycle
+            min_profit_pct: Minimum gross return of the cycle in percent
+
+        Returns:
+            Cycles found or re-priced by this search, best first; each has
+            "tokens" (closed path), "dexes", "rate" (output per unit input),
+            "liquidities" (per hop, in units of the hop's input token) and
+            "liquidity" (first hop)
+        """
+        n = len(self.tokens)
+        if n < 2 or max_hops < min_hops:
+            return []
+
+        params = (max_hops, min_hops, min_profit_pct)
+        if params != self._search_params:
+            self._search_params = params
+            self.cycles = {}
+            starts = list(range(n))
+        else:
+            starts = sorted(self.dirty_nodes)
+            # Cached cycles touching a changed node may no longer hold
+            self.cycles = {
+                key: cycle for key, cycle in self.cycles.items()
+                if not self.dirty_nodes.intersection(key)
+            }
+        self.dirty_nodes = set()
+
+        found: Dict[Tuple[int, ...], Dict] = {}
+        if starts:
+            threshold = -math.log(1 + min_profit_pct / 100)
+            for walk in self._search(np.array(starts), max_hops):
+                self._add_cycle(walk, min_hops, max_hops, threshold, found)
+        self.cycles.update(found)
+
+        logger.debug(f"Searched cycles from {len(starts)} of {n} tokens, found {len(found)} profitable")
+        return sorted(found.values(), key=lambda cycle: cycle["rate"], reverse=True)
+
+    def get_cycles(self) -> List[Dict]:
+        """
+        Get every profitable cycle currently cached.
+
+        Returns:
+            Cycles from the latest searches, best first
+        """
+        return sorted(self.cycles.values(), key=lambda cycle: cycle["rate"], reverse=True)
+
+    def _search(self, starts: np.ndarray, max_hops: int) -> List[List[int]]:
+        """
+        Hop-bounded Bellman-Ford from every start node at once.
+
+        dist[k][s, v] is the lowest weight of a k-edge walk from starts[s]
+        to v; each step is a min-plus product with the weight matrix.
+
+        Returns:
+            Closed walks (start ... start) with negative total weight
+        """
+        n = len(self.tokens)
+        weights = self.weights[:n, :n].copy()
+        np.fill_diagonal(weights, np.inf)
+
+        dist = weights[starts]
+        predecessors = [None]
+        walks = []
+
+        for hops in range(2, max_hops + 1):
+            candidates = dist[:, :, None] + weights[None, :, :]
+            pred = candidates.argmin(axis=1)
+            dist = np.take_along_axis(candidates, pred[:, None, :], axis=1)[:, 0, :]
+            predecessors.append(pred)
+
+            closing = dist[np.arange(len(starts)), starts]
+            for row in np.nonzero(closing < 0)[0]:
+                walks.append(self._reconstruct(row, starts[row], hops, predecessors))
+
+        return walks
+
+    @staticmethod
+    def _reconstruct(row: int, start: int, hops: int, predecessors: List) -> List[int]:
+        """Rebuild a closed walk of the given length from the predecessor tables"""
+        walk = [start]
+        node = start
+        for k in range(hops, 1, -1):
+            node = int(predecessors[k - 1][row, node])
+            walk.append(node)
+        walk.append(start)
+        walk.reverse()
+        return walk
+
+    def _add_cycle(self, walk: List[int], min_hops: int, max_hops: int, threshold: float,
+                   found: Dict[Tuple[int, ...], Dict]):
+        """Split a closed walk into simple cycles and collect the profitable ones"""
+        stack: List[int] = []
+        for node in walk:
+            if node in stack:
+                position = stack.index(node)
+                cycle_nodes = stack[position:]
+                del stack[position + 1:]
+                if min_hops <= len(cycle_nodes) <= max_hops:
+                    self._store_cycle(cycle_nodes, threshold, found)
+            else:
+                stack.append(node)
+
+    def _store_cycle(self, cycle_nodes: List[int], threshold: float, found: Dict[Tuple[int, ...], Dict]):
+        """Collect a simple cycle if its total weight beats the threshold"""
+        edges = list(zip(cycle_nodes, cycle_nodes[1:] + cycle_nodes[:1]))
+        total_weight = sum(self.weights[i, j] for i, j in edges)
+        if not total_weight < threshold:
+            return
+
+        # Canonical rotation so the same cycle is only stored once
+        rotation = cycle_nodes.index(min(cycle_nodes))
+        key = tuple(cycle_nodes[rotation:] + cycle_nodes[:rotation])
+
+        liquidities = [self.edge_liquidity.get(edge, 0.0) for edge in edges]
+        found[key] = {
+            "tokens": [self.tokens[i] for i in cycle_nodes] + [self.tokens[cycle_nodes[0]]],
+            "dexes": [self.edge_dex[edge] for edge in edges],
+            "rate": math.exp(-total_weight),
+            "liquidities": liquidities,
+            "liquidity": liquidities[0]
+        }
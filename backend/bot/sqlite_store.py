@@ -0,0 +1,499 @@
+"""
+SQLite Store Module for ArbitrageX
+
+This module provides an embedded storage backend with the DatabaseConnector
+interface, for bots running where a MongoDB server is not worth its cost.
+The database runs in WAL mode so reads never wait for the writer, and inserts
+go through the same write-behind buffer as MongoDB, one transaction per batch.
+Each record keeps its queried fields in indexed columns and the rest of the
+document as JSON, with the embedded details in a separate column that
+summary reads skip.
+"""
+
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+from backend.bot.database_connector import DatabaseConnector
+from backend.bot.write_buffer import WriteBuffer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("sqlite_store.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("SQLiteStore")
+
+# Indexed columns and indexes of each table, named after the MongoDB
+# collections. Every table also has id, timestamp (unix seconds), document and
+# details columns; SQLite appends the rowid id to every index, so indexes
+# ending in timestamp serve the newest-first (timestamp, id) keyset order.
+TABLES = {
+    "arbitrageopportunities": {
+        "columns": {
+            "network": "TEXT",
+            "tokenA": "TEXT",
+            "tokenB": "TEXT",
+            "expectedProfit": "REAL",
+            "status": "TEXT",
+            "createdAt": "REAL"
+        },
+        "indexes": [
+            ("timestamp",),
+            ("network", "timestamp"),
+            ("tokenA", "tokenB", "timestamp"),
+            ("network", "tokenA", "tokenB", "timestamp"),
+            ("createdAt",)
+        ]
+    },
+    "trades": {
+        "columns": {
+            "type": "TEXT",
+            "network": "TEXT",
+            "tokenA": "TEXT",
+            "tokenB": "TEXT",
+            "success": "INTEGER"
+        },
+        "indexes": [("timestamp",)]
+    },
+    "marketdatas": {
+        "columns": {
+            "tokenA": "TEXT",
+            "tokenB": "TEXT",
+            "exchange": "TEXT",
+            "blockNumber": "INTEGER"
+        },
+        "indexes": [("timestamp",)]
+    },
+    "gasprices": {
+        "columns": {
+            "network": "TEXT",
+            "gasPriceGwei": "REAL"
+        },
+        "indexes": [("network", "timestamp")]
+    }
+}
+
+# Seconds between deletions of opportunities past their retention
+PURGE_INTERVAL = 3600
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Convert a datetime or number to unix seconds for a column"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _encode_cursor(timestamp: float, row_id: int) -> str:
+    """Encode a (timestamp, id) keyset position as a page cursor"""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, row_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode a page cursor from _encode_cursor"""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(timestamp), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+
+
+class _Table:
+    """Collection-style view of a table, so the write buffer can batch into it"""
+
+    def __init__(self, store: "SQLiteConnector", name: str):
+        self.store = store
+        self.name = name
+
+    def insert_many(self, documents: List[Dict], ordered: bool = False):
+        self.store._insert_rows(self.name, documents)
+
+
+class SQLiteConnector(DatabaseConnector):
+    """
+    DatabaseConnector backed by an embedded SQLite database.
+
+    Saves, recent-N reads, keyset pages, summary reads and status updates
+    behave as with MongoDB; record ids are the string form of the row id.
+    Trades are stored once, in the trades table, with the arbitrage ones
+    marked by their type column instead of copied to arbitragetrades.
+    """
+
+    def __init__(self, config: Dict):
+        """
+        Open (or create) the database.
+
+        Args:
+            config: Bot configuration dictionary; the database section sets
+                sqlite_path and sqlite_synchronous (NORMAL by default)
+        """
+        logger.info("Initializing SQLite Store")
+        self.config = config
+        database_config = config.get("database", {})
+        self.path = Path(database_config.get("sqlite_path", "data/arbitragex.db"))
+        self.synchronous = database_config.get("sqlite_synchronous", "NORMAL")
+        self.connection = None
+        self.client = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = self._open(readonly=False)
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._tables = {name: _Table(self, name) for name in TABLES}
+        self._last_purge = 0.0
+        self._write_listeners: List[Callable[[List[str]], None]] = []
+
+        self.ensure_indexes()
+
+        buffer_config = config.get("write_buffer", {})
+        self.write_buffer = None
+        if buffer_config.get("enabled", True):
+            self.write_buffer = WriteBuffer(
+                lambda: self._tables if self.db is not None else None,
+                max_batch_size=buffer_config.get("max_batch_size", 500),
+                flush_interval=buffer_config.get("flush_interval", 1.0),
+                max_pending=buffer_config.get("max_pending", 10000),
+                overflow_policy=buffer_config.get("overflow_policy", "drop_oldest"),
+                block_timeout=buffer_config.get("block_timeout", 1.0),
+                retry_interval=buffer_config.get("retry_interval", 5.0),
+                # "database is locked" and I/O errors can clear up; constraint errors can't
+                retry_errors=(sqlite3.OperationalError,),
+                on_flush=self._notify_writes
+            )
+
+        logger.info(f"SQLite Store initialized: {self.path}")
+
+    def _open(self, readonly: bool) -> sqlite3.Connection:
+        """Open a connection with WAL journaling"""
+        connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={self.synchronous}")
+        if readonly:
+            connection.execute("PRAGMA query_only=ON")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        """Connection for reads on the calling thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._open(readonly=True)
+            self._local.connection = connection
+            with self._readers_lock:
+                self._readers.append(connection)
+        return connection
+
+    def _connect_to_mongodb(self) -> bool:
+        """The database is opened on creation; nothing to reconnect"""
+        return self.db is not None
+
+    def is_connected(self) -> bool:
+        """
+        Check if the database is open.
+
+        Returns:
+            True if connected, False otherwise
+        """
+        return self.db is not None
+
+    def ensure_indexes(self) -> Dict[str, List[str]]:
+        """
+        Create missing tables and indexes, and delete opportunities past
+        their retention (opportunity_retention_days, default 30).
+
+        Returns:
+            Dictionary of "created" and "unchanged" index names (as
+            table.index)
+        """
+        report = {"created": [], "unchanged": []}
+        with self._write_lock, self.db:
+            existing = {row[0] for row in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            for table, spec in TABLES.items():
+                columns = "".join(f", {column} {kind}" for column, kind in spec["columns"].items())
+                self.db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, timestamp REAL NOT NULL"
+                    f"{columns}, document TEXT NOT NULL, details TEXT)"
+                )
+                for keys in spec["indexes"]:
+                    name = f"{table}_{'_'.join(keys)}"
+                    self.db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(keys)})")
+                    report["created" if name not in existing else "unchanged"].append(f"{table}.{name}")
+
+        self._purge_expired()
+        if report["created"]:
+            logger.info(f"Created SQLite indexes: {', '.join(report['created'])}")
+        return report
+
+    def _purge_expired(self):
+        """Delete opportunities created more than opportunity_retention_days ago"""
+        self._last_purge = time.monotonic()
+        retention_days = self.config.get("opportunity_retention_days", 30)
+        if not retention_days:
+            return
+
+        cutoff = time.time() - retention_days * 86400
+        with self._write_lock, self.db:
+            deleted = self.db.execute("DELETE FROM arbitrageopportunities WHERE createdAt < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"Deleted {deleted} opportunities older than {retention_days} days")
+
+    def _row(self, table: str, document: Dict) -> Tuple:
+        """Column values of a document, in table order"""
+        timestamp = _to_epoch(document.get("timestamp"))
+        columns = [_to_epoch(document.get(column)) for column in TABLES[table]["columns"]]
+        rest = {key: value for key, value in document.items() if key not in ("_id", "details")}
+        details = document.get("details")
+        return (
+            time.time() if timestamp is None else timestamp,
+            *columns,
+            json_util.dumps(rest),
+            None if details is None else json_util.dumps(details)
+        )
+
+    def _insert_rows(self, table: str, documents: List[Dict]):
+        """Insert documents in one transaction"""
+        columns = ["timestamp", *TABLES[table]["columns"], "document", "details"]
+        statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        rows = [self._row(table, document) for document in documents]
+        with self._write_lock, self.db:
+            self.db.executemany(statement, rows)
+
+        if table == "arbitrageopportunities" and time.monotonic() - self._last_purge > PURGE_INTERVAL:
+            self._purge_expired()
+
+    def _insert(self, collection: str, document: Dict) -> bool:
+        """
+        Insert a document, through the write buffer when it is enabled.
+
+        Args:
+            collection: Name of the table to insert into
+            document: Document to insert
+
+        Returns:
+            True if the document was inserted or queued, False if it was dropped
+        """
+        if collection == "arbitragetrades":
+            # Arbitrage trades are already stored in trades
+            return True
+
+        if self.write_buffer is not None:
+            return self.write_buffer.put(collection, document)
+
+        self._insert_rows(collection, [document])
+        self._notify_writes([collection])
+        return True
+
+    def _find_page(self, table: str, filters: Dict[str, Any], limit: int,
+                   cursor: Optional[str] = None, summary: bool = False,
+                   min_profit: Optional[float] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Read one page of a table, newest first, after a keyset cursor.
+
+        Args:
+            table: Table to read
+            filters: Column to value equality filters
+            limit: Maximum number of records in the page
+            cursor: Cursor returned with the previous page (None for the first page)
+            summary: Leave out the embedded details
+            min_profit: Minimum expectedProfit (opportunities only)
+
+        Returns:
+            Tuple of (documents with _id as a string, cursor of the next page or
+            None after the last page)
+        """
+        conditions = [f"{column} = ?" for column in filters]
+        parameters = list(filters.values())
+        if min_profit:
+            conditions.append("expectedProfit >= ?")
+            parameters.append(min_profit)
+        if cursor:
+            conditions.append("(timestamp, id) < (?, ?)")
+            parameters.extend(_decode_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._reader().execute(
+            f"SELECT id, timestamp, document{'' if summary else ', details'} FROM {table} {where} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT ?",
+            parameters + [limit + 1]
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            last_id, last_timestamp = rows[limit - 1][:2]
+            next_cursor = _encode_cursor(last_timestamp, last_id)
+        documents = []
+        for row in rows[:limit]:
+            document = json_util.loads(row[2])
+            if not summary and row[3] is not None:
+                document["details"] = json_util.loads(row[3])
+            document["_id"] = str(row[0])
+            documents.append(document)
+        return documents, next_cursor
+
+    def get_recent_market_data(self, limit: int = 10) -> List[Dict]:
+        """
+        Get recent market data.
+
+        Args:
+            limit: Maximum number of records to return
+
+        Returns:
+            List of market data records
+        """
+        try:
+            market_data, _ = self._find_page("marketdatas", {}, limit)
+            return market_data
+        except Exception as e:
+            logger.error(f"Error getting market data from SQLite: {e}")
+            return []
+
+    def get_recent_gas_prices(self, network: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        Get recent gas price observations.
+
+        Args:
+            network: Optional network to filter by
+            limit: Maximum number of records to return
+
+        Returns:
+            List of gas price records, newest first
+        """
+        try:
+            gas_prices, _ = self._find_page("gasprices", {"network": network} if network else {}, limit)
+            return gas_prices
+        except Exception as e:
+            logger.error(f"Error getting gas prices from SQLite: {e}")
+            return []
+
+    def get_trades_page(self, limit: int = 100, cursor: Optional[str] = None,
+                        summary: bool = True) -> Dict:
+        """
+        Get one page of the trade history, newest first.
+
+        Args:
+            limit: Maximum number of trades in the page
+            cursor: next_cursor of the previous page (None for the first page)
+            summary: Leave out the embedded details of each trade
+
+        Returns:
+            Dictionary with the trades under "data" and the cursor of the
+            next page (None after the last page) under "next_cursor"
+        """
+        try:
+            trades, next_cursor = self._find_page("trades", {}, limit, cursor, summary)
+            return {"data": trades, "next_cursor": next_cursor}
+        except Exception as e:
+            logger.error(f"Error getting trades from SQLite: {e}")
+            return {"data": [], "next_cursor": None}
+
+    def get_opportunities_page(self, network: Optional[str] = None, limit: int = 100,
+                               min_profit: Optional[float] = None,
+                               token_pair: Optional[tuple] = None,
+                               cursor: Optional[str] = None,
+                               summary: bool = True) -> Dict:
+        """
+        Get one page of the opportunity history, newest first.
+
+        Args:
+            network: Optional network to filter by
+            limit: Maximum number of opportunities in the page
+            min_profit: Minimum profit threshold
+            token_pair: Optional token pair to filter by (tokenA, tokenB)
+            cursor: next_cursor of the previous page (None for the first page)
+            summary: Leave out the embedded details of each opportunity
+
+        Returns:
+            Dictionary with the opportunities under "data" and the cursor of
+            the next page (None after the last page) under "next_cursor"
+        """
+        filters = {}
+        if network:
+            filters["network"] = network
+        if token_pair:
+            filters["tokenA"], filters["tokenB"] = token_pair
+
+        try:
+            opportunities, next_cursor = self._find_page(
+                "arbitrageopportunities", filters, limit, cursor, summary, min_profit
+            )
+            return {"data": opportunities, "next_cursor": next_cursor}
+        except Exception as e:
+            logger.error(f"Error retrieving opportunities from SQLite: {e}")
+            return {"data": [], "next_cursor": None}
+
+    def update_opportunity_status(self, opportunity_id: str, status: str,
+                                  execution_result: Optional[Dict] = None) -> bool:
+        """
+        Update the status of an arbitrage opportunity.
+
+        Args:
+            opportunity_id: ID of the opportunity to update
+            status: New status (e.g., "pending", "executing", "completed", "failed")
+            execution_result: Optional execution result data
+
+        Returns:
+            True if updated successfully, False otherwise
+        """
+        try:
+            row_id = int(opportunity_id)
+        except (TypeError, ValueError):
+            logger.warning(f"Opportunity not found: {opportunity_id}")
+            return False
+
+        update_doc = {"status": status, "updatedAt": datetime.now()}
+        if execution_result:
+            update_doc["executionResult"] = execution_result
+
+        try:
+            with self._write_lock, self.db:
+                row = self.db.execute(
+                    "SELECT document FROM arbitrageopportunities WHERE id = ?", (row_id,)
+                ).fetchone()
+                if row is None:
+                    logger.warning(f"Opportunity not found: {opportunity_id}")
+                    return False
+
+                document = json_util.loads(row[0])
+                document.update(update_doc)
+                self.db.execute(
+                    "UPDATE arbitrageopportunities SET status = ?, document = ? WHERE id = ?",
+                    (status, json_util.dumps(document), row_id)
+                )
+
+            logger.info(f"Updated opportunity {opportunity_id} status to {status}")
+            self._notify_writes(["arbitrageopportunities"])
+            return True
+
+        except Exception as e:
+            logger.error(f"Error updating opportunity status: {e}")
+            return False
+
+    def close(self):
+        """Flush queued writes and close the database."""
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+
+        with self._readers_lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+
+        if self.db is not None:
+            with self._write_lock:
+                self.db.close()
+                self.db = None
+            logger.info("Closed SQLite database")
@@ -13,8 +13,10 @@ import os
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime
 import random
+import threading
 from web3 import Web3
 from collections import deque
+from backend.bot.opportunity import Opportunity, TradeResult
 
 # Configure logging
 logging.basicConfig(
@@ -55,12 +57,16 @@ class TradeExecutor:
         # Trade history
         self.trade_history = deque(maxlen=100)  # Keep last 100 trades
         
-        # Nonce tracking for each network
+        # Next nonce per (network, wallet address); trades run on several
+        # threads, so nonces are handed out under a lock instead of being
+        # read from the node for each transaction
         self.nonces = {}
+        self._nonce_lock = threading.Lock()
         
         # Track concurrent trades
         self.active_trades = 0
         self.max_concurrent_trades = config.get("execution", {}).get("max_concurrent_trades", 3)
+        self._lock = threading.Lock()
         
         logger.info("Trade Executor initialized")
     
@@ -182,34 +188,38 @@ class TradeExecutor:
                 "private_key": None
             }
     
-    def execute_trade(self, opportunity: Dict) -> Dict:
+    def execute_trade(self, opportunity: Union[Dict, Opportunity]) -> TradeResult:
         """
         Execute an arbitrage trade based on the identified opportunity.
         
         Args:
-            opportunity: Dictionary containing arbitrage opportunity details
+            opportunity: Opportunity record or dictionary with the opportunity details
             
         Returns:
-            Dictionary with trade execution results
+            TradeResult with trade execution results
         """
-        # Check if we can execute more trades
-        if self.active_trades >= self.max_concurrent_trades:
-            logger.warning(f"Maximum concurrent trades ({self.max_concurrent_trades}) reached, skipping opportunity")
-            return {
-                "success": False,
-                "error": "Maximum concurrent trades reached",
-                "opportunity_id": opportunity.get("id")
-            }
+        opportunity = Opportunity.from_dict(opportunity)
         
-        # Increment active trades
-        self.active_trades += 1
+        # Reserve a trade slot if we can execute more trades
+        with self._lock:
+            slot_available = self.active_trades < self.max_concurrent_trades
+            if slot_available:
+                self.active_trades += 1
+        
+        if not slot_available:
+            logger.warning(f"Maximum concurrent trades ({self.max_concurrent_trades}) reached, skipping opportunity")
+            return TradeResult(
+                success=False,
+                error="Maximum concurrent trades reached",
+                opportunity_id=opportunity.id
+            )
         
         try:
             # Log trade execution
-            logger.info(f"Executing trade for opportunity {opportunity['id']}")
-            logger.info(f"Network: {opportunity['network']}, "
-                       f"Tokens: {opportunity['token_a']}/{opportunity['token_b']}, "
-                       f"Buy on: {opportunity['buy_dex']}, Sell on: {opportunity['sell_dex']}")
+            logger.info(f"Executing trade for opportunity {opportunity.id}")
+            logger.info(f"Network: {opportunity.network}, "
+                       f"Tokens: {opportunity.token_a}/{opportunity.token_b}, "
+                       f"Buy on: {opportunity.buy_dex}, Sell on: {opportunity.sell_dex}")
             
             # For testing/development, use mock execution
             if self.config.get("use_mock_execution", True):
@@ -218,32 +228,34 @@ class TradeExecutor:
                 result = self._execute_real_trade(opportunity)
             
             # Add to trade history
-            self.trade_history.appendleft({
-                "timestamp": datetime.now().isoformat(),
-                "opportunity": opportunity,
-                "result": result
-            })
+            with self._lock:
+                self.trade_history.appendleft({
+                    "timestamp": time.time(),
+                    "opportunity": opportunity,
+                    "result": result
+                })
             
             # Log result
-            if result["success"]:
-                logger.info(f"Trade successful: {result['profit']} ETH profit")
+            if result.success:
+                logger.info(f"Trade successful: {result.profit} ETH profit")
             else:
-                logger.warning(f"Trade failed: {result.get('error', 'Unknown error')}")
+                logger.warning(f"Trade failed: {result.error or 'Unknown error'}")
             
             return result
             
         except Exception as e:
             logger.error(f"Error executing trade: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "opportunity_id": opportunity.get("id")
-            }
+            return TradeResult(
+                success=False,
+                error=str(e),
+                opportunity_id=opportunity.id
+            )
         finally:
-            # Decrement active trades
-            self.active_trades -= 1
+            # Release the trade slot
+            with self._lock:
+                self.active_trades -= 1
     
-    def _execute_mock_trade(self, opportunity: Dict) -> Dict:
+    def _execute_mock_trade(self, opportunity: Opportunity) -> TradeResult:
         """Execute a mock trade for testing/development"""
         # Simulate network latency
         execution_time = random.uniform(0.5, 2.0)
@@ -255,25 +267,25 @@ class TradeExecutor:
         if success:
             # Simulate some slippage (0-10%)
             slippage = random.uniform(0, 0.1)
-            expected_profit = opportunity["potential_profit"]
+            expected_profit = opportunity.potential_profit
             actual_profit = expected_profit * (1 - slippage)
             
             # Simulate gas cost variation (±20%)
             gas_variation = random.uniform(0.8, 1.2)
-            gas_cost = opportunity["estimated_gas_cost"] * gas_variation
+            gas_cost = opportunity.estimated_gas_cost * gas_variation
             
-            return {
-                "success": True,
-                "opportunity_id": opportunity["id"],
-                "transaction_hash": f"0x{random.randint(0, 0xffffffffffffffff):016x}",
-                "expected_profit": expected_profit,
-                "actual_profit": actual_profit,
-                "profit": actual_profit,  # For consistency with real execution
-                "gas_cost": gas_cost,
-                "execution_time": execution_time,
-                "slippage": slippage * 100,  # as percentage
-                "timestamp": datetime.now().isoformat()
-            }
+            return TradeResult(
+                success=True,
+                opportunity_id=opportunity.id,
+                transaction_hash=f"0x{random.randint(0, 0xffffffffffffffff):016x}",
+                expected_profit=expected_profit,
+                actual_profit=actual_profit,
+                profit=actual_profit,  # For consistency with real execution
+                gas_cost=gas_cost,
+                execution_time=execution_time,
+                slippage=slippage * 100,  # as percentage
+                timestamp=time.time()
+            )
         else:
             # Simulate different failure reasons
             failure_reasons = [
@@ -287,52 +299,85 @@ class TradeExecutor:
             error = random.choice(failure_reasons)
             
             # Simulate gas cost for failed transaction (usually lower)
-            gas_cost = opportunity["estimated_gas_cost"] * random.uniform(0.1, 0.5)
+            gas_cost = opportunity.estimated_gas_cost * random.uniform(0.1, 0.5)
             
-            return {
-                "success": False,
-                "opportunity_id": opportunity["id"],
-                "error": error,
-                "gas_cost": gas_cost,
-                "execution_time": execution_time,
-                "timestamp": datetime.now().isoformat()
-            }
+            return TradeResult(
+                success=False,
+                opportunity_id=opportunity.id,
+                error=error,
+                gas_cost=gas_cost,
+                execution_time=execution_time,
+                timestamp=time.time()
+            )
     
-    def _execute_real_trade(self, opportunity: Dict) -> Dict:
+    def _execute_real_trade(self, opportunity: Opportunity) -> TradeResult:
         """Execute a real trade on the blockchain"""
-        network = opportunity["network"]
+        network = opportunity.network
         web3 = self.web3_connections.get(network)
         
         if not web3:
-            return {
-                "success": False,
-                "error": f"No Web3 connection for network {network}",
-                "opportunity_id": opportunity["id"]
-            }
+            return TradeResult(
+                success=False,
+                error=f"No Web3 connection for network {network}",
+                opportunity_id=opportunity.id
+            )
         
         try:
             # Get wallet address
             wallet_address = self.wallet["address"]
+            nonce = self._allocate_nonce(web3, network, wallet_address)
             
             # Determine execution strategy
             use_flash_loan = self.config.get("execution", {}).get("use_flashloans", True)
             
             if use_flash_loan:
                 # Execute with flash loan
-                return self._execute_with_flash_loan(web3, opportunity, wallet_address)
+                return self._execute_with_flash_loan(web3, opportunity, wallet_address, nonce)
             else:
                 # Execute direct swap
-                return self._execute_direct_swap(web3, opportunity, wallet_address)
+                return self._execute_direct_swap(web3, opportunity, wallet_address, nonce)
                 
         except Exception as e:
             logger.error(f"Error in real trade execution: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "opportunity_id": opportunity["id"]
-            }
+            # The allocated nonce may not have been used; re-read it from the node next time
+            self._resync_nonce(network, self.wallet["address"])
+            return TradeResult(
+                success=False,
+                error=str(e),
+                opportunity_id=opportunity.id
+            )
+    
+    def _allocate_nonce(self, web3: Web3, network: str, wallet_address: str) -> int:
+        """
+        Allocate the next transaction nonce for a wallet on a network.
+        
+        The first allocation reads the pending transaction count from the
+        node; later ones increment locally so concurrent trades never reuse
+        a nonce.
+        
+        Args:
+            web3: Web3 connection for the network
+            network: Network the transaction is sent on
+            wallet_address: Sending wallet address
+            
+        Returns:
+            Nonce to use for the transaction
+        """
+        key = (network, wallet_address)
+        with self._nonce_lock:
+            nonce = self.nonces.get(key)
+            if nonce is None:
+                nonce = web3.eth.get_transaction_count(wallet_address, "pending")
+            self.nonces[key] = nonce + 1
+        return nonce
+    
+    def _resync_nonce(self, network: str, wallet_address: str):
+        """Forget the local nonce so the next allocation re-reads it from the node"""
+        with self._nonce_lock:
+            self.nonces.pop((network, wallet_address), None)
     
-    def _execute_with_flash_loan(self, web3: Web3, opportunity: Dict, wallet_address: str) -> Dict:
+    def _execute_with_flash_loan(self, web3: Web3, opportunity: Opportunity, wallet_address: str,
+                                 nonce: int) -> TradeResult:
         """Execute arbitrage using a flash loan"""
         # In a real implementation, this would:
         # 1. Load the flash loan contract
@@ -345,7 +390,8 @@ class TradeExecutor:
         logger.warning("Flash loan execution not fully implemented, returning mock result")
         return self._execute_mock_trade(opportunity)
     
-    def _execute_direct_swap(self, web3: Web3, opportunity: Dict, wallet_address: str) -> Dict:
+    def _execute_direct_swap(self, web3: Web3, opportunity: Opportunity, wallet_address: str,
+                             nonce: int) -> TradeResult:
         """Execute arbitrage using direct swaps"""
         # In a real implementation, this would:
         # 1. Load the router contracts
@@ -358,7 +404,7 @@ class TradeExecutor:
         logger.warning("Direct swap execution not fully implemented, returning mock result")
         return self._execute_mock_trade(opportunity)
     
-    def get_recent_trades(self, count: int = 10) -> List[Dict]:
+    def get_recent_trades(self, count: int = 10) -> List[TradeResult]:
         """
         Get recent trade history.
         
@@ -368,7 +414,8 @@ class TradeExecutor:
         Returns:
             List of recent trades
         """
-        return [trade["result"] for trade in list(self.trade_history)[:count]]
+        with self._lock:
+            return [trade["result"] for trade in list(self.trade_history)[:count]]
     
     def get_trade_stats(self) -> Dict:
         """
@@ -377,7 +424,11 @@ class TradeExecutor:
         Returns:
             Dictionary with trade statistics
         """
-        if not self.trade_history:
+        # Snapshot the history since trades may complete on other threads
+        with self._lock:
+            results = [trade["result"] for trade in self.trade_history]
+        
+        if not results:
             return {
                 "total_trades": 0,
                 "successful_trades": 0,
@@ -390,16 +441,16 @@ class TradeExecutor:
             }
         
         # Calculate statistics
-        total_trades = len(self.trade_history)
-        successful_trades = sum(1 for trade in self.trade_history if trade["result"]["success"])
+        total_trades = len(results)
+        successful_trades = sum(1 for result in results if result.success)
         failed_trades = total_trades - successful_trades
         success_rate = (successful_trades / total_trades) * 100 if total_trades > 0 else 0
         
-        total_profit = sum(trade["result"].get("profit", 0) for trade in self.trade_history if trade["result"]["success"])
-        total_gas_spent = sum(trade["result"].get("gas_cost", 0) for trade in self.trade_history)
+        total_profit = sum(result.profit or 0 for result in results if result.success)
+        total_gas_spent = sum(result.gas_cost or 0 for result in results)
         net_profit = total_profit - total_gas_spent
         
-        execution_times = [trade["result"].get("execution_time", 0) for trade in self.trade_history]
+        execution_times = [result.execution_time or 0 for result in results]
         average_execution_time = sum(execution_times) / len(execution_times) if execution_times else 0
         
         return {
@@ -450,13 +501,13 @@ if __name__ == "__main__":
     result = executor.execute_trade(opportunity)
     
     # Print result
-    print(f"Trade execution result: {'Success' if result['success'] else 'Failed'}")
-    if result["success"]:
-        print(f"Profit: {result['profit']} ETH")
-        print(f"Gas cost: {result['gas_cost']} ETH")
-        print(f"Net profit: {result['profit'] - result['gas_cost']} ETH")
+    print(f"Trade execution result: {'Success' if result.success else 'Failed'}")
+    if result.success:
+        print(f"Profit: {result.profit} ETH")
+        print(f"Gas cost: {result.gas_cost} ETH")
+        print(f"Net profit: {result.profit - result.gas_cost} ETH")
     else:
-        print(f"Error: {result.get('error', 'Unknown error')}")
+        print(f"Error: {result.error or 'Unknown error'}")
     
     # Get trade stats
     stats = executor.get_trade_stats()
@@ -0,0 +1,359 @@
+"""
+Write Buffer Module for ArbitrageX
+
+This module provides the write-behind buffer that takes document inserts off
+the scanner and executor threads. Documents are queued per collection and a
+background thread writes them with unordered insert_many calls, either once a
+collection has a full batch or when the flush interval elapses. The buffer
+holds a bounded number of documents and applies an overflow policy when full.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Type
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("write_buffer.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("WriteBuffer")
+
+# What put() does when the buffer already holds max_pending documents
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_new")
+
+
+class WriteBuffer:
+    """
+    Thread-safe write-behind buffer of MongoDB inserts.
+
+    Documents count against max_pending from the time they are queued until
+    their batch has been written, so the memory bound also covers batches in
+    flight. Batches that fail with a connection or server error are put back
+    at the front of their collection's queue and retried after retry_interval;
+    documents rejected by the server (e.g. duplicate keys) are dropped, which
+    also makes a retried, partially written batch safe, since insert_many has
+    already assigned the _id of every document.
+
+    The database is looked up for every flush, so the buffer keeps working
+    across reconnects. Any object whose collections have a pymongo-style
+    insert_many(documents, ordered=False) works, e.g.
+    WriteBuffer(lambda: mongomock.MongoClient().arbitragex) in tests.
+    """
+
+    def __init__(self, get_database: Callable[[], Any], max_batch_size: int = 500,
+                 flush_interval: float = 1.0, max_pending: int = 10000,
+                 overflow_policy: str = "drop_oldest", block_timeout: float = 1.0,
+                 retry_interval: float = 5.0,
+                 retry_errors: Tuple[Type[Exception], ...] = (PyMongoError,),
+                 on_flush: Optional[Callable[[List[str]], None]] = None):
+        """
+        Initialize the write buffer and start its flush thread.
+
+        Args:
+            get_database: Function returning the database to write to (or None
+                while disconnected)
+            max_batch_size: Maximum documents per insert_many; a collection
+                with this many queued documents is flushed immediately
+            flush_interval: Seconds between flushes of partial batches
+            max_pending: Maximum documents queued or in flight
+            overflow_policy: "block" to wait up to block_timeout for space,
+                "drop_oldest" to drop the oldest queued document of the
+                collection (or of the longest queue when the collection has
+                none queued), or "drop_new" to drop the new document
+            block_timeout: Seconds put() waits for space under the "block" policy
+            retry_interval: Seconds to wait before retrying a failed flush
+            retry_errors: Errors after which a batch is retried; batches failing
+                with any other error are dropped
+            on_flush: Function called from the flush thread with the names of
+                the collections a flush wrote to, e.g. to invalidate caches
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy!r}, expected one of {OVERFLOW_POLICIES}")
+
+        self.get_database = get_database
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.retry_interval = retry_interval
+        self.retry_errors = retry_errors
+        self.on_flush = on_flush
+
+        self._pending: Dict[str, Deque[Dict]] = {}
+        # Documents queued or in flight
+        self._size = 0
+        self._closed = False
+        self._flush_requested = False
+        self._retry_at = 0.0
+        self._last_flush_failed = False
+        self._cycles_started = 0
+        self._cycles_completed = 0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._flushed = threading.Condition(self._lock)
+
+        self.metrics = {
+            "enqueued": 0,
+            "written": 0,
+            "rejected": 0,
+            "dropped": 0,
+            "batches": 0,
+            "flush_errors": 0,
+            "max_depth": 0,
+            "largest_batch": 0,
+            "avg_batch_size": None,
+            "avg_flush_latency": None,
+            "max_flush_latency": None
+        }
+
+        self._thread = threading.Thread(target=self._run, name="WriteBuffer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, collection: str, document: Dict) -> bool:
+        """
+        Queue a document for insertion.
+
+        Args:
+            collection: Name of the collection to insert into
+            document: Document to insert; it must not be modified afterwards
+
+        Returns:
+            True if the document was queued, False if it was dropped because
+            the buffer is full or closed
+        """
+        with self._lock:
+            if self._closed:
+                self.metrics["dropped"] += 1
+                return False
+
+            if self._size >= self.max_pending and not self._make_room(collection):
+                self.metrics["dropped"] += 1
+                logger.debug(f"Write buffer full, dropped document for {collection}")
+                return False
+
+            queue = self._pending.setdefault(collection, deque())
+            queue.append(document)
+            self._size += 1
+            self.metrics["enqueued"] += 1
+            self.metrics["max_depth"] = max(self.metrics["max_depth"], self._size)
+            if len(queue) >= self.max_batch_size:
+                self._wakeup.notify()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write every document queued so far, without waiting for the interval.
+
+        Args:
+            timeout: Seconds to wait for the flush (None waits forever)
+
+        Returns:
+            True if a flush that started after this call wrote everything it
+            took within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            if self._closed:
+                return not self._thread.is_alive()
+
+            target = self._cycles_started + 1
+            self._flush_requested = True
+            self._wakeup.notify()
+            while self._cycles_completed < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+            return not self._last_flush_failed
+
+    def close(self, timeout: float = 10.0):
+        """
+        Write the remaining documents and stop the flush thread.
+
+        Args:
+            timeout: Seconds to wait for the final flush
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+            self._not_full.notify_all()
+
+        atexit.unregister(self.close)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Write buffer still flushing after {timeout}s")
+        elif self._size:
+            logger.error(f"Write buffer closed with {self._size} documents not written")
+
+    def get_metrics(self) -> Dict:
+        """
+        Get batch size, flush latency and queue depth metrics.
+
+        Returns:
+            Dictionary with the current depth (overall and per collection),
+            capacity and cumulative counters; latencies are in seconds
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics.update({
+                "depth": self._size,
+                "max_pending": self.max_pending,
+                "queued": {name: len(queue) for name, queue in self._pending.items() if queue}
+            })
+        return metrics
+
+    def _make_room(self, collection: str) -> bool:
+        """Apply the overflow policy to a full buffer; True if there is now space"""
+        if self.overflow_policy == "drop_oldest":
+            # With nothing of this collection queued, make room in the longest queue; documents
+            # in flight can't be dropped, so the new one is dropped when every queue is empty
+            queue = self._pending.get(collection) or max(self._pending.values(), key=len, default=None)
+            if not queue:
+                return False
+            queue.popleft()
+            self._size -= 1
+            self.metrics["dropped"] += 1
+            return True
+
+        if self.overflow_policy == "block":
+            deadline = time.monotonic() + self.block_timeout
+            while self._size >= self.max_pending and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._not_full.wait(remaining)
+            return not self._closed
+
+        return False
+
+    def _run(self):
+        """Flush thread: write queued documents on a full batch, the interval or a request"""
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            with self._lock:
+                while not self._closed and not self._flush_requested:
+                    now = time.monotonic()
+                    if now >= next_flush or (now >= self._retry_at and self._has_full_batch()):
+                        break
+                    self._wakeup.wait(next_flush - now)
+
+                closing = self._closed
+                self._flush_requested = False
+                self._cycles_started += 1
+                batches = [(name, list(queue)) for name, queue in self._pending.items() if queue]
+                for name, _ in batches:
+                    self._pending[name].clear()
+
+            failed = self._write(batches)
+            self._notify_flush(batches, failed)
+
+            with self._lock:
+                for name, documents in failed:
+                    self._pending.setdefault(name, deque()).extendleft(reversed(documents))
+                if failed:
+                    self._retry_at = time.monotonic() + self.retry_interval
+                    next_flush = self._retry_at
+                else:
+                    next_flush = time.monotonic() + self.flush_interval
+                self._last_flush_failed = bool(failed)
+                self._cycles_completed += 1
+                self._flushed.notify_all()
+                if closing:
+                    return
+
+    def _notify_flush(self, batches: List[Tuple[str, List[Dict]]], failed: List[Tuple[str, List[Dict]]]):
+        """Pass the collections that got at least one document to on_flush"""
+        if self.on_flush is None:
+            return
+
+        requeued = {name: len(documents) for name, documents in failed}
+        collections = [name for name, documents in batches if requeued.get(name, 0) < len(documents)]
+        if not collections:
+            return
+        try:
+            self.on_flush(collections)
+        except Exception as e:
+            logger.error(f"Error in flush listener: {e}")
+
+    def _has_full_batch(self) -> bool:
+        """Check whether any collection has a full batch queued"""
+        return any(len(queue) >= self.max_batch_size for queue in self._pending.values())
+
+    def _write(self, batches: List[Tuple[str, List[Dict]]]) -> List[Tuple[str, List[Dict]]]:
+        """
+        Insert queued documents in batches of at most max_batch_size.
+
+        Args:
+            batches: Collection names and the documents taken from their queues
+
+        Returns:
+            The documents left unwritten by a connection or server error, to
+            be requeued
+        """
+        if not batches:
+            return []
+
+        database = self.get_database()
+        if database is None:
+            return batches
+
+        for index, (name, documents) in enumerate(batches):
+            for start in range(0, len(documents), self.max_batch_size):
+                batch = documents[start:start + self.max_batch_size]
+                started = time.perf_counter()
+                try:
+                    database[name].insert_many(batch, ordered=False)
+                    written = len(batch)
+                except BulkWriteError as e:
+                    # Unordered inserts report every rejected document; retrying them can't succeed
+                    written = e.details.get("nInserted", 0)
+                    logger.error(f"Rejected {len(batch) - written} of {len(batch)} documents for {name}: "
+                                 f"{e.details.get('writeErrors', [])[:1]}")
+                except self.retry_errors as e:
+                    logger.warning(f"Error writing {len(batch)} documents to {name}, retrying in "
+                                   f"{self.retry_interval}s: {e}")
+                    with self._lock:
+                        self.metrics["flush_errors"] += 1
+                    return [(name, documents[start:])] + batches[index + 1:]
+                except Exception as e:
+                    # e.g. a document that can't be encoded; it would fail the same way again
+                    written = 0
+                    logger.error(f"Rejected {len(batch)} documents for {name}: {e}")
+
+                self._record_batch(len(batch), written, time.perf_counter() - started)
+                logger.debug(f"Wrote {written} documents to {name}")
+        return []
+
+    def _record_batch(self, size: int, written: int, latency: float):
+        """Release a finished batch's slots and update the batch metrics"""
+        with self._lock:
+            self._size -= size
+            self._not_full.notify_all()
+
+            self.metrics["written"] += written
+            self.metrics["rejected"] += size - written
+            self.metrics["batches"] += 1
+            self.metrics["largest_batch"] = max(self.metrics["largest_batch"], size)
+            self.metrics["max_flush_latency"] = max(self.metrics["max_flush_latency"] or 0.0, latency)
+            # Exponential moving averages so recent load dominates
+            for key, value in (("avg_batch_size", size), ("avg_flush_latency", latency)):
+                if self.metrics[key] is None:
+                    self.metrics[key] = value
+                else:
+                    self.metrics[key] = 0.8 * self.metrics[key] + 0.2 * value
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bot's storage backends.
+
+Inserts synthetic arbitrage opportunities through each backend's
+DatabaseConnector (write buffer included) and reports insert throughput and
+the latency of the history queries the bot and API run. MongoDB is skipped if
+no server answers at the given URI.
+
+Usage:
+    python scripts/benchmark_storage.py --count 100000 --mongodb-uri mongodb://localhost:27017
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from backend.bot.database_connector import create_database_connector
+
+NETWORKS = ["ethereum", "arbitrum", "polygon", "optimism", "base"]
+TOKEN_PAIRS = [("WETH", "USDC"), ("WETH", "USDT"), ("WBTC", "USDC"), ("WETH", "DAI")]
+DEXES = ["uniswap_v3", "sushiswap", "curve", "balancer"]
+
+
+def make_opportunity(timestamp: datetime) -> Dict:
+    """Synthetic opportunity document shaped like Opportunity.to_mongo()"""
+    token_a, token_b = random.choice(TOKEN_PAIRS)
+    buy_dex, sell_dex = random.sample(DEXES, 2)
+    buy_price = random.uniform(1000, 4000)
+    sell_price = buy_price * random.uniform(1.0, 1.02)
+    network = random.choice(NETWORKS)
+    profit = random.uniform(0, 200)
+    return {
+        "tokenA": token_a,
+        "tokenB": token_b,
+        "route": [
+            {"exchange": buy_dex, "action": "buy", "price": buy_price},
+            {"exchange": sell_dex, "action": "sell", "price": sell_price}
+        ],
+        "expectedProfit": profit,
+        "network": network,
+        "confidence": random.random(),
+        "timestamp": timestamp,
+        "details": {
+            "network": network, "token_a": token_a, "token_b": token_b,
+            "buy_dex": buy_dex, "sell_dex": sell_dex,
+            "buy_price": buy_price, "sell_price": sell_price,
+            "potential_profit": profit, "trade_amount": random.uniform(0.1, 10),
+            "estimated_gas_cost": random.uniform(1, 50), "timestamp": timestamp.isoformat()
+        }
+    }
+
+
+def time_query(query: Callable, repeats: int) -> Dict[str, float]:
+    """Median and 95th percentile latency of a query in milliseconds"""
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        query()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    }
+
+
+def run_benchmark(name: str, config: Dict, count: int, repeats: int) -> Dict:
+    """Insert count opportunities and time the history queries of one backend"""
+    connector = create_database_connector(config)
+    if not connector.is_connected():
+        connector.close()
+        return None
+
+    start = datetime.now() - timedelta(days=7)
+    step = timedelta(days=7) / count
+    documents = [make_opportunity(start + step * i) for i in range(count)]
+
+    started = time.perf_counter()
+    for document in documents:
+        connector.save_arbitrage_opportunity(document)
+    connector.write_buffer.flush()
+    insert_seconds = time.perf_counter() - started
+
+    def deep_page():
+        cursor = None
+        for _ in range(10):
+            cursor = connector.get_opportunities_page(limit=50, cursor=cursor)["next_cursor"]
+
+    queries = {
+        "recent 100": lambda: connector.get_recent_arbitrage_opportunities(100),
+        "recent 100 summary": lambda: connector.get_recent_arbitrage_opportunities(100, summary=True),
+        "network filter": lambda: connector.get_opportunities_from_db(network="arbitrum", limit=100),
+        "pair + min profit": lambda: connector.get_opportunities_from_db(
+            network="ethereum", token_pair=("WETH", "USDC"), min_profit=150, limit=100, summary=True),
+        "10 keyset pages": deep_page
+    }
+    results = {
+        "backend": name,
+        "inserts_per_second": count / insert_seconds,
+        "metrics": connector.get_write_metrics(),
+        "queries": {label: time_query(query, repeats) for label, query in queries.items()}
+    }
+    connector.close()
+    return results
+
+
+def main():
+    """Run the benchmark for every available backend and print a comparison"""
+    parser = argparse.ArgumentParser(description="Benchmark the ArbitrageX storage backends")
+    parser.add_argument("--count", type=int, default=50000, help="Opportunities to insert")
+    parser.add_argument("--repeats", type=int, default=50, help="Runs of each query")
+    parser.add_argument("--mongodb-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--sqlite-path", default=None, help="SQLite file (defaults to a temporary file)")
+    args = parser.parse_args()
+
+    random.seed(42)
+    temp_dir = tempfile.TemporaryDirectory(prefix="arbitragex_benchmark_")
+    database_name = f"arbitragex_benchmark_{int(time.time())}"
+    backends = {
+        "sqlite": {
+            "database": {
+                "backend": "sqlite",
+                "sqlite_path": args.sqlite_path or os.path.join(temp_dir.name, "benchmark.db")
+            },
+            "opportunity_retention_days": 0
+        },
+        "mongodb": {
+            "database": {"backend": "mongodb"},
+            "mongodb_uri": args.mongodb_uri,
+            "database_name": database_name,
+            "opportunity_retention_days": 0
+        }
+    }
+
+    results: List[Dict] = []
+    for name, config in backends.items():
+        print(f"Benchmarking {name} with {args.count} opportunities...")
+        try:
+            result = run_benchmark(name, config, args.count, args.repeats)
+        except Exception as e:
+            print(f"  {name} failed: {e}")
+            continue
+        if result is None:
+            print(f"  {name} not available, skipped")
+            continue
+        results.append(result)
+
+        if name == "mongodb":
+            from backend.bot.mongo_manager import get_connection, release_connection
+            connection = get_connection(args.mongodb_uri)
+            connection.client.drop_database(database_name)
+            release_connection(connection)
+
+    temp_dir.cleanup()
+    if not results:
+        return
+
+    print()
+    print(f"{'':32}" + "".join(f"{result['backend']:>22}" for result in results))
+    print(f"{'inserts/s':32}" + "".join(f"{result['inserts_per_second']:>22,.0f}" for result in results))
+    print(f"{'avg batch size':32}" + "".join(f"{result['metrics']['avg_batch_size'] or 0:>22.0f}" for result in results))
+    for label in results[0]["queries"]:
+        row = "".join(
+            f"{result['queries'][label]['p50']:>11.2f}/{result['queries'][label]['p95']:<10.2f}"
+            for result in results
+        )
+        print(f"{label + ' p50/p95 ms':32}{row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""SubgraphFetcher against a local fake GraphQL server"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.ai.subgraph_fetcher import SubgraphFetcher
+
+QUERY_PATTERN = re.compile(r"(\w+)\(first: (\d+), orderBy: (\w+), orderDirection: asc, where: \{(.*?)\}\)")
+RANGE_PATTERN = re.compile(r"timestamp_gte: (\d+), timestamp_lte: (\d+)")
+SECOND_PATTERN = re.compile(r'timestamp: (\d+), id_gt: (".*")')
+
+
+class FakeSubgraph:
+    """Serves swaps the way a subgraph does, with scripted failures"""
+
+    def __init__(self, swaps):
+        self.swaps = sorted(swaps, key=lambda swap: (swap["timestamp"], swap["id"]))
+        self.failures = []
+        self.fail_after = None
+        self.queries = []
+
+    def respond(self, payload):
+        """Return (status, body) for a GraphQL request"""
+        if self.failures:
+            failure = self.failures.pop(0)
+            if failure == "graphql":
+                return 200, {"errors": [{"message": "indexer timeout"}]}
+            return failure, {}
+        if self.fail_after is not None:
+            if self.fail_after == 0:
+                return 503, {}
+            self.fail_after -= 1
+
+        entity, first, order_by, where = QUERY_PATTERN.search(payload["query"]).groups()
+        self.queries.append(where)
+        if order_by == "timestamp":
+            start, end = map(int, RANGE_PATTERN.search(where).groups())
+            rows = [swap for swap in self.swaps if start <= swap["timestamp"] <= end]
+        else:
+            second, last_id = SECOND_PATTERN.search(where).groups()
+            rows = sorted((swap for swap in self.swaps
+                           if swap["timestamp"] == int(second) and swap["id"] > json.loads(last_id)),
+                          key=lambda swap: swap["id"])
+        page = [dict(swap, timestamp=str(swap["timestamp"])) for swap in rows[:int(first)]]
+        return 200, {"data": {entity: page}}
+
+
+@pytest.fixture
+def subgraph():
+    """A fake subgraph with a second holding more swaps than one page"""
+    swaps = [{"id": f"0x{n:04d}", "timestamp": 100 + (n > 1) + (n > 8)} for n in range(11)]
+    fake = FakeSubgraph(swaps)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            status, body = fake.respond(payload)
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def _task(subgraph):
+    return {"key": "swaps", "url": subgraph.url, "entity": "swaps", "fields": "id timestamp",
+            "start": 100, "end": 102}
+
+
+def _fetcher(tmp_path, **kwargs):
+    return SubgraphFetcher(str(tmp_path), max_workers=1, page_size=3, backoff_factor=0.0, **kwargs)
+
+
+def _ids(rows):
+    return sorted(row["id"] for row in rows)
+
+
+def test_pages_through_a_second_larger_than_a_page(subgraph, tmp_path):
+    fetcher = _fetcher(tmp_path)
+    rows = fetcher.fetch([_task(subgraph)])["swaps"]
+    fetcher.close()
+
+    assert _ids(rows) == [swap["id"] for swap in subgraph.swaps]
+    assert len(rows) == len(subgraph.swaps)
+    assert any("id_gt" in where for where in subgraph.queries)
+    assert not list(tmp_path.iterdir())
+
+
+def test_retries_unavailable_server_and_graphql_errors(subgraph, tmp_path):
+    subgraph.failures = [503, "graphql", 503]
+    fetcher = _fetcher(tmp_path, max_retries=3)
+    rows = fetcher.fetch([_task(subgraph)])["swaps"]
+    fetcher.close()
+
+    assert not subgraph.failures
+    assert _ids(rows) == [swap["id"] for swap in subgraph.swaps]
+
+
+def test_resumes_from_checkpoint(subgraph, tmp_path):
+    subgraph.fail_after = 3
+    fetcher = _fetcher(tmp_path, max_retries=1)
+    assert fetcher.fetch([_task(subgraph)])["swaps"] is None
+    fetcher.close()
+    first_run_queries = list(subgraph.queries)
+
+    subgraph.fail_after = None
+    subgraph.queries = []
+    fetcher = _fetcher(tmp_path, max_retries=1)
+    rows = fetcher.fetch([_task(subgraph)])["swaps"]
+    fetcher.close()
+
+    assert _ids(rows) == [swap["id"] for swap in subgraph.swaps]
+    assert len(rows) == len(subgraph.swaps)
+    # The second run continues from the checkpointed cursor instead of the start
+    assert subgraph.queries[0] != first_run_queries[0]
+    assert subgraph.queries[0] not in first_run_queries
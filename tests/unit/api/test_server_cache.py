@@ -0,0 +1,76 @@
+"""Response cache invalidation wiring of the API server"""
+
+import json
+from datetime import datetime
+
+import mongomock
+import pytest
+
+import backend.bot.bot_core
+import backend.bot.database_connector as database_connector
+import backend.bot.network_scanner
+from backend.api import server
+
+
+class _HealthyConnection:
+    """Stands in for a MongoConnection whose server is reachable"""
+
+    def __init__(self):
+        self.client = mongomock.MongoClient()
+
+    def wait_until_healthy(self, timeout):
+        return True
+
+    def is_healthy(self):
+        return True
+
+
+class _Scanner:
+    def __init__(self, config):
+        self.db_connector = database_connector.DatabaseConnector(config)
+
+
+class _BotCore:
+    def __init__(self, config_path):
+        with open(config_path) as f:
+            self.network_scanner = _Scanner(json.load(f))
+
+
+@pytest.fixture
+def bot_components(tmp_path, monkeypatch):
+    config_path = tmp_path / "bot_settings.json"
+    config_path.write_text(json.dumps({"ensure_indexes": False, "write_buffer": {"enabled": False}}))
+    monkeypatch.setenv("BOT_CONFIG_PATH", str(config_path))
+    monkeypatch.setattr(database_connector, "get_connection", lambda uri, options=None: _HealthyConnection())
+    monkeypatch.setattr(database_connector, "release_connection", lambda connection: None)
+    monkeypatch.setattr(backend.bot.bot_core, "BotCore", _BotCore)
+    monkeypatch.setattr(backend.bot.network_scanner, "NetworkScanner", _Scanner)
+    monkeypatch.setattr(server, "db", None)
+    assert server.init_bot_components()
+    yield server.bot_core
+    monkeypatch.setattr(server, "bot_core", None)
+    monkeypatch.setattr(server, "network_scanner", None)
+
+
+def test_bot_scanner_write_invalidates_cached_opportunities(bot_components):
+    client = server.app.test_client()
+    path = "/api/v1/arbitrage/opportunities?test=invalidation"
+    metrics = server.response_cache.metrics
+
+    client.get(path)
+    hits = metrics["hits"]
+    client.get(path)
+    assert metrics["hits"] == hits + 1
+
+    bot_components.network_scanner.db_connector.save_arbitrage_opportunity({
+        "tokenA": "WETH",
+        "tokenB": "USDC",
+        "route": [{"exchange": "uniswap_v3", "action": "buy", "price": 2000.0},
+                  {"exchange": "sushiswap", "action": "sell", "price": 2010.0}],
+        "expectedProfit": 0.01,
+        "timestamp": datetime.now()
+    })
+
+    misses = metrics["misses"]
+    client.get(path)
+    assert metrics["misses"] == misses + 1
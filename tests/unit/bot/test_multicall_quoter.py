@@ -0,0 +1,160 @@
+"""MulticallQuoter against a local stub JSON-RPC node"""
+
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import eth_abi
+import pytest
+
+from backend.bot.multicall_quoter import (
+    GET_RESERVES_SELECTOR, LIQUIDITY_SELECTOR, MULTICALL3_ADDRESS, Q96, SLOT0_SELECTOR,
+    MulticallQuoter, decode_aggregate3, encode_aggregate3
+)
+
+# eth-abi renamed encode_abi/decode_abi to encode/decode in 3.0
+abi_encode = getattr(eth_abi, "encode", None) or eth_abi.encode_abi
+abi_decode = getattr(eth_abi, "decode", None) or eth_abi.decode_abi
+
+V2_POOL = "0x" + "11" * 20
+V3_POOL = "0x" + "22" * 20
+BROKEN_POOL = "0x" + "33" * 20
+
+V3_LIQUIDITY = 10 ** 18
+# USDC (6 decimals) per WETH (18 decimals) at 2000 USDC/WETH
+V3_SQRT_PRICE_X96 = int(math.sqrt(2000 * 10 ** (6 - 18)) * Q96)
+
+
+class StubNode:
+    """Answers aggregate3 eth_calls from canned pool return data"""
+
+    def __init__(self):
+        self.returns = {
+            (V2_POOL, GET_RESERVES_SELECTOR): abi_encode(["uint112", "uint112", "uint32"],
+                                                         [2_000_000 * 10 ** 6, 1000 * 10 ** 18, 0]),
+            (V3_POOL, SLOT0_SELECTOR): abi_encode(["uint160"] + ["int24"] + ["uint16"] * 3 + ["uint8", "bool"],
+                                                  [V3_SQRT_PRICE_X96, 0, 0, 0, 0, 0, True]),
+            (V3_POOL, LIQUIDITY_SELECTOR): abi_encode(["uint128"], [V3_LIQUIDITY]),
+        }
+        self.failing_call_ids = set()
+        self.batches = []
+
+    def handle(self, batch):
+        self.batches.append(batch)
+        return [self._eth_call(request) for request in batch]
+
+    def _eth_call(self, request):
+        call = request["params"][0]
+        assert call["to"] == MULTICALL3_ADDRESS
+        if request["id"] in self.failing_call_ids:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "out of gas"}}
+
+        (calls,) = abi_decode(["(address,bool,bytes)[]"], bytes.fromhex(call["data"][10:]))
+        results = []
+        for target, allow_failure, call_data in calls:
+            assert allow_failure
+            data = self.returns.get((target.lower(), call_data.hex()))
+            results.append((data is not None, data or b""))
+        result = abi_encode(["(bool,bytes)[]"], [results])
+        return {"jsonrpc": "2.0", "id": request["id"], "result": "0x" + result.hex()}
+
+
+@pytest.fixture
+def node():
+    stub = StubNode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            batch = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            data = json.dumps(stub.handle(batch)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+NETWORK_DEXES = {
+    "sushiswap": {
+        "router_address": "0xrouter2",
+        "fee": 0.003,
+        "pools": {
+            "USDC_ETH": {"address": V2_POOL, "type": "v2", "token0": "USDC", "decimals0": 6, "decimals1": 18},
+            "DAI_ETH": {"address": BROKEN_POOL, "type": "v2", "token0": "DAI"}
+        }
+    },
+    "uniswap_v3": {
+        "router_address": "0xrouter3",
+        "fee": 0.0005,
+        "pools": {
+            "ETH_USDC": {"address": V3_POOL, "token0": "ETH", "decimals0": 18, "decimals1": 6}
+        }
+    }
+}
+TOKEN_PAIRS = [("ETH", "USDC"), ("ETH", "DAI")]
+
+
+def test_aggregate3_encoding_matches_the_abi():
+    calls = [(V2_POOL, GET_RESERVES_SELECTOR), (V3_POOL, "a9059cbb" + "00" * 40)]
+    encoded = encode_aggregate3(calls)
+
+    assert encoded.startswith("0x82ad56cb")
+    (decoded,) = abi_decode(["(address,bool,bytes)[]"], bytes.fromhex(encoded[10:]))
+    assert [(target.lower(), allow, data.hex()) for target, allow, data in decoded] == [
+        (target, True, call_data) for target, call_data in calls
+    ]
+
+    results = [(True, b"\x01" * 40), (False, b"")]
+    assert decode_aggregate3("0x" + abi_encode(["(bool,bytes)[]"], [results]).hex()) == results
+
+
+def test_quotes_v2_and_v3_pools_in_one_round_trip(node):
+    quoter = MulticallQuoter("ethereum", node.url)
+    prices = quoter.get_prices(TOKEN_PAIRS, NETWORK_DEXES)
+
+    v2_quote = prices[("ETH", "USDC")]["sushiswap"]
+    assert v2_quote["price"] == pytest.approx(2000.0)
+    assert v2_quote["liquidity"] == pytest.approx(1000.0)
+    assert v2_quote["fee"] == 0.003
+    assert v2_quote["router_address"] == "0xrouter2"
+
+    v3_quote = prices[("ETH", "USDC")]["uniswap_v3"]
+    sqrt_price = V3_SQRT_PRICE_X96 / Q96
+    assert v3_quote["price"] == pytest.approx(2000.0)
+    assert v3_quote["liquidity"] == pytest.approx(V3_LIQUIDITY / sqrt_price / 10 ** 18)
+
+    assert quoter.get_stats()["rpc_round_trips"] == 1
+    assert len(node.batches) == 1
+
+
+def test_failed_calls_only_drop_their_pools(node):
+    quoter = MulticallQuoter("ethereum", node.url)
+    prices = quoter.get_prices(TOKEN_PAIRS, NETWORK_DEXES)
+
+    # The broken pool's getReserves reverts inside aggregate3
+    assert prices[("ETH", "DAI")] == {}
+    assert set(prices[("ETH", "USDC")]) == {"sushiswap", "uniswap_v3"}
+    assert quoter.get_stats()["failed_reads"] == 1
+
+
+def test_failed_eth_call_only_drops_its_chunk(node):
+    # One read per aggregate3 call: getReserves, slot0, liquidity, getReserves
+    quoter = MulticallQuoter("ethereum", node.url, {"max_calldata_bytes": 6 * 32})
+    first_id = quoter._request_id + 1
+    node.failing_call_ids = {first_id + 1}
+
+    prices = quoter.get_prices(TOKEN_PAIRS, NETWORK_DEXES)
+
+    assert len(node.batches) == 1 and len(node.batches[0]) == 4
+    assert set(prices[("ETH", "USDC")]) == {"sushiswap"}
@@ -0,0 +1,47 @@
+"""Multi-hop opportunity construction in NetworkScanner"""
+
+import threading
+
+import pytest
+
+from backend.bot.network_scanner import NetworkScanner
+
+
+def _quote(price, liquidity):
+    return {"price": price, "liquidity": liquidity, "fee": 0.003}
+
+
+@pytest.fixture
+def scanner():
+    scanner = NetworkScanner.__new__(NetworkScanner)
+    scanner.config = {"base_token": "ETH", "risk_management": {"max_trade_size": 10.0}}
+    scanner.max_hops = 3
+    scanner.route_graphs = {}
+    scanner.opportunity_counter = 0
+    scanner._counter_lock = threading.Lock()
+    scanner._estimate_gas_cost = lambda network: 0.001
+    scanner._save_opportunity = lambda opportunity: None
+    return scanner
+
+
+def test_multi_hop_routes_start_from_base_token_and_use_its_liquidity(scanner):
+    # USDC is indexed first, so the graph reports the cycle starting from USDC
+    prices_by_pair = {
+        ("USDC", "DAI"): {"curve": _quote(1.02, 1_000_000.0)},
+        ("DAI", "ETH"): {"sushiswap": _quote(0.0005, 1_000_000.0)},
+        ("ETH", "USDC"): {"uniswap_v3": _quote(2000.0, 20.0)},
+        # Profitable stablecoin cycle that never touches ETH
+        ("DAI", "USDT"): {"curve": _quote(1.0, 1_000_000.0)},
+        ("USDT", "USDC"): {"curve": _quote(1.0, 1_000_000.0)},
+    }
+
+    opportunities = scanner._find_multi_hop_opportunities("ethereum", prices_by_pair, {})
+
+    assert len(opportunities) == 1
+    opportunity = opportunities[0]
+    assert opportunity.path == ("ETH", "USDC", "DAI", "ETH")
+    assert opportunity.dexes == ("uniswap_v3", "curve", "sushiswap")
+    # 10% of the ETH->USDC pool's 20 ETH, not of the USDC->DAI pool
+    assert opportunity.trade_amount == pytest.approx(2.0)
+    rate = 1.02 * 0.997 ** 3
+    assert opportunity.potential_profit == pytest.approx(2.0 * (rate - 1) - 0.001 * 3 / 2)
@@ -0,0 +1,156 @@
+"""WriteBuffer batching, retries and overflow policies on mongomock"""
+
+import threading
+import time
+
+import mongomock
+import pytest
+from pymongo.errors import AutoReconnect
+
+from backend.bot.write_buffer import WriteBuffer
+
+
+@pytest.fixture
+def database():
+    return mongomock.MongoClient().arbitragex
+
+
+@pytest.fixture
+def make_buffer():
+    buffers = []
+
+    def make(get_database, **kwargs):
+        # A long interval keeps queued documents in place until flush() or close()
+        kwargs.setdefault("flush_interval", 60.0)
+        buffer = WriteBuffer(get_database, **kwargs)
+        buffers.append(buffer)
+        return buffer
+
+    yield make
+    for buffer in buffers:
+        buffer.close()
+
+
+class FlakyDatabase:
+    """Fails the first insert_many calls with a retryable error"""
+
+    def __init__(self, database, failures):
+        self.database = database
+        self.failures = failures
+        self.attempts = 0
+
+    def __getitem__(self, name):
+        return self
+
+    def insert_many(self, documents, ordered=True):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("connection reset")
+        return self.database.trades.insert_many(documents, ordered=ordered)
+
+
+def _ids(collection):
+    return sorted(document["n"] for document in collection.find())
+
+
+def test_flush_writes_in_batches_of_max_batch_size(database, make_buffer):
+    flushed = []
+    buffer = make_buffer(lambda: database, max_batch_size=3, on_flush=flushed.append)
+    for n in range(7):
+        assert buffer.put("trades", {"n": n})
+
+    assert buffer.flush(timeout=5)
+    assert _ids(database.trades) == list(range(7))
+    metrics = buffer.get_metrics()
+    # Full batches may be flushed as soon as they are queued, so only the bound is fixed
+    assert metrics["batches"] >= 3
+    assert metrics["largest_batch"] == 3
+    assert metrics["written"] == 7
+    assert metrics["depth"] == 0
+    assert flushed and all(collections == ["trades"] for collections in flushed)
+
+
+def test_full_batch_is_written_without_waiting_for_the_interval(database, make_buffer):
+    buffer = make_buffer(lambda: database, max_batch_size=3)
+    for n in range(3):
+        buffer.put("trades", {"n": n})
+
+    deadline = time.monotonic() + 5
+    while database.trades.count_documents({}) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _ids(database.trades) == [0, 1, 2]
+
+
+def test_retry_errors_requeue_the_batch(database, make_buffer):
+    flaky = FlakyDatabase(database, failures=1)
+    buffer = make_buffer(lambda: flaky, retry_interval=60.0)
+    for n in range(4):
+        buffer.put("trades", {"n": n})
+
+    assert not buffer.flush(timeout=5)
+    assert buffer.get_metrics()["flush_errors"] == 1
+    assert buffer.get_metrics()["depth"] == 4
+
+    assert buffer.flush(timeout=5)
+    assert flaky.attempts == 2
+    assert _ids(database.trades) == [0, 1, 2, 3]
+
+
+def test_other_errors_drop_the_batch(database, make_buffer):
+    class BrokenDatabase:
+        def __getitem__(self, name):
+            return self
+
+        def insert_many(self, documents, ordered=True):
+            raise ValueError("cannot encode object")
+
+    buffer = make_buffer(lambda: BrokenDatabase())
+    buffer.put("trades", {"n": 0})
+
+    assert buffer.flush(timeout=5)
+    metrics = buffer.get_metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["depth"] == 0
+
+
+def test_drop_oldest_makes_room_in_the_collection_then_the_longest_queue(database, make_buffer):
+    buffer = make_buffer(lambda: database, max_pending=3, overflow_policy="drop_oldest")
+    for n in range(4):
+        assert buffer.put("opportunities", {"n": n})
+    assert buffer.put("trades", {"n": 10})
+
+    assert buffer.flush(timeout=5)
+    assert _ids(database.opportunities) == [2, 3]
+    assert _ids(database.trades) == [10]
+    assert buffer.get_metrics()["dropped"] == 2
+
+
+def test_drop_new_rejects_the_new_document(database, make_buffer):
+    buffer = make_buffer(lambda: database, max_pending=2, overflow_policy="drop_new")
+    assert buffer.put("trades", {"n": 0})
+    assert buffer.put("trades", {"n": 1})
+    assert not buffer.put("trades", {"n": 2})
+
+    assert buffer.flush(timeout=5)
+    assert _ids(database.trades) == [0, 1]
+
+
+def test_block_waits_for_space_up_to_block_timeout(database, make_buffer):
+    buffer = make_buffer(lambda: database, max_pending=2, overflow_policy="block", block_timeout=0.1)
+    buffer.put("trades", {"n": 0})
+    buffer.put("trades", {"n": 1})
+
+    started = time.monotonic()
+    assert not buffer.put("trades", {"n": 2})
+    assert time.monotonic() - started >= 0.1
+
+    # A flush frees the slots and releases the waiting put()
+    buffer.block_timeout = 5.0
+    flusher = threading.Timer(0.1, buffer.flush)
+    flusher.start()
+    assert buffer.put("trades", {"n": 3})
+    flusher.join()
+
+    assert buffer.flush(timeout=5)
+    assert _ids(database.trades) == [0, 1, 3]